@@ -0,0 +1,253 @@
+"""
+ASGI
+~~~~
+
+ASGI application adapter allowing an API interface to be served directly
+by an ASGI server (eg uvicorn, hypercorn, daphne) without a framework. eg::
+
+    >>> api = AsyncApiInterfaceBase(
+    ...     ApiVersion(user_api),
+    ...     path_prefix='/api',
+    ... )
+    >>> app = AsgiApplication(api)
+
+Both the :class:`odinweb3.async_containers.AsyncApiInterfaceBase` and the
+synchronous :class:`odinweb3.containers.ApiInterfaceBase` are supported,
+although a synchronous interface will block the event loop while a request
+is dispatched.
+
+"""
+from inspect import isawaitable
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from .bases import HttpRequestBase
+from .constants import Method
+from .containers import ApiInterfaceBase
+from .data_structures import HttpResponse, MultiValueDict
+from .helpers import parse_content_type, parse_cookies
+
+__all__ = ('AsgiRequest', 'AsgiApplication')
+
+Scope = Dict[str, Any]
+Message = Dict[str, Any]
+Receive = Callable[[], Awaitable[Message]]
+Send = Callable[[Message], Awaitable[None]]
+
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+
+class AsgiRequest(HttpRequestBase):
+    """
+    Request proxy for an ASGI HTTP connection scope.
+
+    Values are only parsed from the scope on first access.
+    """
+    __slots__ = ('scope', '_body', '_method', '_query', '_headers', '_cookies', '_post')
+
+    def __init__(self, scope: Scope, body: bytes=b'') -> None:
+        super().__init__()
+        self.scope = scope
+        self._body = body
+        self._method = None
+        self._query = None
+        self._headers = None
+        self._cookies = None
+        self._post = None
+
+    @property
+    def scheme(self) -> str:
+        return self.scope.get('scheme', 'http')
+
+    @property
+    def host(self) -> str:
+        host = self.headers.get('host')
+        if host:
+            return host
+        server = self.scope.get('server')
+        if server:
+            return '{}:{}'.format(*server)
+        return ''
+
+    @property
+    def method(self) -> Method:
+        method = self._method
+        if method is None:
+            method = self._method = Method(self.scope['method'].lower())
+        return method
+
+    @property
+    def path(self) -> str:
+        return self.scope['path']
+
+    @property
+    def query(self) -> MultiValueDict:
+        query = self._query
+        if query is None:
+            query_string = self.scope.get('query_string')
+            query = self._query = MultiValueDict(
+                parse_qsl(query_string.decode('latin-1'), keep_blank_values=True) if query_string else None
+            )
+        return query
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = self._headers
+        if headers is None:
+            headers = self._headers = {}
+            for name, value in self.scope.get('headers', ()):
+                name = name.decode('latin-1').lower()
+                value = value.decode('latin-1')
+                if name in headers:
+                    # Combine repeated headers as per RFC 7230
+                    value = headers[name] + ('; ' if name == 'cookie' else ', ') + value
+                headers[name] = value
+        return headers
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        cookies = self._cookies
+        if cookies is None:
+            cookies = self._cookies = parse_cookies(self.headers.get('cookie'))
+        return cookies
+
+    @property
+    def post(self) -> MultiValueDict:
+        post = self._post
+        if post is None:
+            if self._body and parse_content_type(self.headers.get('content-type')) == FORM_CONTENT_TYPE:
+                post = MultiValueDict(parse_qsl(self._body.decode('latin-1'), keep_blank_values=True))
+            else:
+                post = MultiValueDict()
+            self._post = post
+        return post
+
+    @property
+    def body(self) -> bytes:
+        return self._body
+
+
+async def read_body(receive: Receive) -> Optional[bytes]:
+    """
+    Read the complete request body from an ASGI receive channel.
+
+    Bodies received in a single message are returned as is, chunked bodies
+    are buffered and joined once all chunks have been received (operations
+    are passed the complete body, request bodies are not streamed).
+
+    Returns ``None`` if the client disconnects before the body is complete.
+    """
+    message = await receive()
+    if message['type'] == 'http.disconnect':
+        return None
+    body = message.get('body', b'')
+    if not message.get('more_body', False):
+        return body
+
+    chunks = [body]  # type: List[bytes]
+    while message.get('more_body', False):
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+    return b''.join(chunks)
+
+
+def response_start(response: HttpResponse) -> Tuple[Message, bytes]:
+    """
+    Generate the ASGI response start message and encoded body for a response.
+    """
+    body = response.body
+    if body is None:
+        body = b''
+    elif isinstance(body, str):
+        body = body.encode('UTF8')
+
+    headers = [
+        (name.lower().encode('latin-1'), str(value).encode('latin-1'))
+        for name, value in response.headers.items()
+    ]
+    if 'Content-Length' not in response.headers:
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+
+    return {
+        'type': 'http.response.start',
+        'status': int(response.status),
+        'headers': headers,
+    }, body
+
+
+class AsgiApplication:
+    """
+    ASGI (version 3) application that dispatches requests to an API
+    interface.
+
+    :param api_interface: The API interface to dispatch requests to.
+
+    """
+    __slots__ = ('api_interface',)
+
+    request_class = AsgiRequest
+
+    def __init__(self, api_interface: ApiInterfaceBase) -> None:
+        self.api_interface = api_interface
+
+    def __repr__(self):
+        return "<{} {!r}>".format(self.__class__.__name__, self.api_interface)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        scope_type = scope['type']
+        if scope_type == 'http':
+            await self.handle_http(scope, receive, send)
+        elif scope_type == 'lifespan':
+            await self.handle_lifespan(scope, receive, send)
+        else:
+            raise ValueError("Unsupported ASGI scope type: {}".format(scope_type))
+
+    async def handle_http(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle a HTTP request.
+        """
+        body = await read_body(receive)
+        if body is None:
+            # Client disconnected; there is no one to respond to.
+            return
+
+        request = self.request_class(scope, body)
+
+        try:
+            method = request.method
+        except ValueError:
+            # Not a method known to the API (eg PROPFIND)
+            method, response = None, self.api_interface.canned_response('not_implemented')
+        else:
+            response = self.api_interface.dispatch_request(request)
+            if isawaitable(response):
+                response = await response
+
+        start, body = response_start(response)
+        await send(start)
+        await send({
+            'type': 'http.response.body',
+            'body': b'' if method is Method.Head else body,
+        })
+
+    async def handle_lifespan(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """
+        Handle lifespan events, the router (and precomputed responses) are
+        built on startup so the first request does not pay for them.
+        """
+        while True:
+            message = await receive()
+            message_type = message['type']
+            if message_type == 'lifespan.startup':
+                try:
+                    self.api_interface.router  # pylint:disable=pointless-statement
+                except Exception as ex:  # noqa - Report failure to the server
+                    await send({'type': 'lifespan.startup.failed', 'message': str(ex)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+
+            elif message_type == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,381 @@
+"""
+Async API Containers
+~~~~~~~~~~~~~~~~~~~~
+
+API interface that dispatches requests on an asyncio event loop.
+
+Operation callbacks and middleware hooks can be coroutine functions, plain
+(synchronous) callbacks and hooks are still supported.
+
+"""
+import asyncio
+import logging
+
+from functools import partial
+from inspect import isawaitable
+from time import monotonic
+from typing import Any, Dict, Optional, Tuple, Union
+
+from odin.utils.decorators import lazy_property
+
+from .bases import HttpRequestBase
+from .batch import SubRequest, parse_batch, batch_groups, batch_response
+from .coalescing import AsyncSingleFlight, coalesce_key
+from .constants import Method, HTTPStatus
+from .containers import ApiInterfaceBase, PreparedOperation
+from .data_structures import HttpResponse, ImmediateResponse
+from .decorators import Operation
+from .exceptions import DeadlineExceeded, ServiceUnavailable
+from .executors import (
+    DEFAULT_EXECUTOR, DEFAULT_PROCESS_EXECUTOR, Executors, ProcessExecutorGroup, RequestSnapshot,
+    call_operation, operation_reference
+)
+from .helpers import check_deadline
+from .limits import acquire_all_async, release_all
+
+__all__ = ('AsyncApiInterfaceBase',)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncApiInterfaceBase(ApiInterfaceBase):
+    """
+    Base class for asyncio based API interfaces.
+
+    The dispatch methods of this interface are coroutines eg::
+
+        >>> response = await api.dispatch_request(request)
+
+    Operations marked as blocking (or process) are run in the executor
+    group they specify, see :mod:`odinweb3.executors`.
+
+    :param executors: Executor groups used to run blocking operations.
+
+    """
+    process_operations = True
+
+    def __init__(self, *containers, executors: Executors=None, **kwargs):
+        super().__init__(*containers, **kwargs)
+        self.executors = executors or Executors()
+
+    def prepare_operation(self, operation: Operation) -> PreparedOperation:
+        """
+        Prepare an operation to be dispatched by this interface, checking the
+        executor group of blocking and process operations is defined.
+        """
+        if operation.process:
+            group = operation.executor or DEFAULT_PROCESS_EXECUTOR
+            if not isinstance(self.executors.groups.get(group), ProcessExecutorGroup):
+                raise ValueError("Process executor group {!r} used by {} is not defined".format(group, operation))
+            operation_reference(operation)
+
+        elif operation.blocking and (operation.executor or DEFAULT_EXECUTOR) not in self.executors:
+            raise ValueError("Executor group {!r} used by {} is not defined".format(operation.executor, operation))
+
+        return super().prepare_operation(operation)
+
+    async def handle_500(self, request: HttpRequestBase, exception: Exception) -> Any:
+        """
+        Handle an *un-handled* exception.
+        """
+        # Let middleware attempt to handle exception
+        try:
+            for middleware in self.middleware.handle_500:
+                resource = middleware(request, exception)
+                if isawaitable(resource):
+                    resource = await resource
+                # Middleware can be inserted to return a resource to represent
+                # an error response.
+                if resource:
+                    return resource
+
+        except Exception as ex:  # noqa - This is a top level handler
+            exception = ex
+
+        # Fallback to generic error
+        logger.exception('Internal Server Error: %s', exception, extra={
+            'status_code': 500,
+            'request': request
+        })
+        return self.canned_response('server_error', request.response_codec)
+
+    async def execute_operation(self, operation: Operation, request: HttpRequestBase,
+                                path_args: Dict[str, Any]) -> Any:
+        """
+        Execute an operation callback, awaiting the result of coroutine
+        callbacks. Blocking callbacks are run in an executor.
+        """
+        if operation.process:
+            module_name, qualname = operation_reference(operation)
+            return await self.executors.run(
+                operation.executor or DEFAULT_PROCESS_EXECUTOR,
+                partial(call_operation, module_name, qualname, RequestSnapshot.from_request(request), path_args)
+            )
+
+        if operation.blocking:
+            return await self.executors.run(operation.executor, partial(operation.execute, request, **path_args))
+
+        resource = operation.execute(request, **path_args)
+        if isawaitable(resource):
+            resource = await resource
+        return resource
+
+    async def _execute(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any]) -> Any:
+        """
+        Execute an operation within the deadline of the request, an operation
+        that overruns the deadline is cancelled.
+        """
+        deadline = request.deadline
+        if deadline is None:
+            return await self.execute_operation(operation, request, path_args)
+
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+
+        try:
+            return await asyncio.wait_for(self.execute_operation(operation, request, path_args), remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded()
+
+    async def pre_dispatch_operation(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                                     prepared: PreparedOperation=None
+                                     ) -> Optional[Tuple[Any, Optional[HTTPStatus], Optional[Dict[str, str]]]]:
+        """
+        Run the pre-dispatch middleware of an operation, returns a result if
+        the request is answered by the middleware (eg not authorised).
+
+        :param prepared: The operation prepared by this interface (see
+            :meth:`prepared`).
+
+        """
+        chain = (prepared or self.prepared(operation)).chain
+
+        try:
+            check_deadline(request)
+
+            # path_args is passed by ref so changes can be made.
+            for middleware in chain.pre_dispatch:
+                result = middleware(request, path_args)
+                if isawaitable(result):
+                    result = await result
+                if isinstance(result, ImmediateResponse):
+                    return result.resource, result.status, result.headers
+
+        except Exception as e:
+            result = self._exception_result(request, e)
+            if result is not None:
+                return result
+
+            if self.debug_enabled:
+                # If debug is enabled then fallback to the frameworks default
+                # error processing, this often provides convenience features
+                # to aid in the debugging process.
+                raise
+
+            # Fallback to the default handler
+            resource = await self.handle_500(request, e)
+            return resource, resource.status, None
+
+    async def dispatch_operation(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                                 pre_dispatched: bool=False, prepared: PreparedOperation=None
+                                 ) -> Tuple[Any, Optional[HTTPStatus], Optional[Dict[str, str]]]:
+        """
+        Dispatch and handle exceptions from operation.
+
+        :param pre_dispatched: The pre-dispatch middleware has already been
+            run (see :meth:`pre_dispatch_operation`).
+        :param prepared: The operation prepared by this interface (see
+            :meth:`prepared`).
+
+        """
+        chain = (prepared or self.prepared(operation)).chain
+
+        try:
+            check_deadline(request)
+
+            # An ImmediateResponse can be returned from middleware or the
+            # operation to return a response immediately (without raising)
+            if chain.has_dispatch_middleware:
+                # path_args is passed by ref so changes can be made.
+                if not pre_dispatched:
+                    for middleware in chain.pre_dispatch:
+                        result = middleware(request, path_args)
+                        if isawaitable(result):
+                            result = await result
+                        if isinstance(result, ImmediateResponse):
+                            return result.resource, result.status, result.headers
+
+                resource = await self._execute(operation, request, path_args)
+                if isinstance(resource, ImmediateResponse):
+                    return resource.resource, resource.status, resource.headers
+
+                for middleware in chain.post_dispatch:
+                    resource = middleware(request, resource)
+                    if isawaitable(resource):
+                        resource = await resource
+                    if isinstance(resource, ImmediateResponse):
+                        return resource.resource, resource.status, resource.headers
+
+            else:
+                resource = await self._execute(operation, request, path_args)
+                if isinstance(resource, ImmediateResponse):
+                    return resource.resource, resource.status, resource.headers
+
+        except Exception as e:
+            result = self._exception_result(request, e)
+            if result is not None:
+                return result
+
+            if self.debug_enabled:
+                # If debug is enabled then fallback to the frameworks default
+                # error processing, this often provides convenience features
+                # to aid in the debugging process.
+                raise
+
+            # Fallback to the default handler
+            resource = await self.handle_500(request, e)
+            return resource, resource.status, None
+
+        else:
+            return resource, None, None
+
+    async def _dispatch(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                        prepared: PreparedOperation):
+        """
+        Wrapped dispatch method, prepare request and generate a HTTP Response.
+        """
+        response = self.negotiate(operation, request, prepared)
+        if response is not None:
+            return response
+
+        if operation.coalesce and request.method is Method.Get:
+            # Pre-dispatch middleware (eg authorisation) is run for each
+            # request before sharing the response of an identical request
+            # that is in flight; a copy is returned so headers can be modified.
+            result = await self.pre_dispatch_operation(operation, request, path_args, prepared)
+            if result is not None:
+                return self._create_response(request, *result)
+
+            deadline = request.deadline
+            try:
+                response, _ = await self.single_flight.do(
+                    coalesce_key(operation, request, path_args),
+                    partial(self._respond, operation, request, path_args, prepared, True),
+                    None if deadline is None else deadline - monotonic()
+                )
+            except DeadlineExceeded as ex:
+                return self._exception_result(request, ex)[0]
+            return response.copy()
+
+        return await self._respond(operation, request, path_args, prepared)
+
+    @lazy_property
+    def single_flight(self) -> AsyncSingleFlight:
+        """
+        Coalesces identical requests to operations with coalesce enabled.
+        """
+        return AsyncSingleFlight()
+
+    async def _respond(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                       prepared: PreparedOperation, pre_dispatched: bool=False) -> HttpResponse:
+        """
+        Dispatch an operation (within any concurrency limits) and generate a
+        HTTP Response.
+        """
+        bulkheads = prepared.bulkheads
+        if bulkheads:
+            try:
+                tokens = await acquire_all_async(bulkheads, request.deadline)
+            except (ServiceUnavailable, DeadlineExceeded) as ex:
+                # Shed load (or give up waiting) without dispatching the operation
+                return self._exception_result(request, ex)[0]
+
+            try:
+                resource, status, headers = await self.dispatch_operation(
+                    operation, request, path_args, pre_dispatched, prepared)
+            finally:
+                release_all(bulkheads, tokens)
+        else:
+            resource, status, headers = await self.dispatch_operation(
+                operation, request, path_args, pre_dispatched, prepared)
+
+        return self._create_response(request, resource, status, headers)
+
+    async def dispatch(self, operation: Operation, request: HttpRequestBase, **path_args):
+        """
+        Dispatch incoming request and capture top level exceptions.
+        """
+        # Add current operation to the request (for convenience in middleware methods)
+        request.current_operation = operation
+
+        timeout = self.request_timeout(operation, request)
+        if timeout is not None:
+            request.set_timeout(timeout)
+
+        # Resolved once and passed down through the dispatch methods
+        prepared = self.prepared(operation)
+        chain = prepared.chain
+
+        try:
+            for middleware in chain.pre_request:
+                result = middleware(request, path_args)
+                if isawaitable(result):
+                    await result
+
+            response = await self._dispatch(operation, request, path_args, prepared)
+
+            for middleware in chain.post_request:
+                response = middleware(request, response)
+                if isawaitable(response):
+                    response = await response
+
+        except Exception as ex:
+            if self.debug_enabled:
+                # If debug is enabled then fallback to the frameworks default
+                # error processing, this often provides convenience features
+                # to aid in the debugging process.
+                raise
+            return await self.handle_500(request, ex)
+
+        else:
+            return response
+
+    async def execute_batch(self, request: HttpRequestBase) -> ImmediateResponse:
+        """
+        Execute the items of a batch request and generate a multi-status
+        response.
+        """
+        requests = parse_batch(request, self.batch_max_items)
+        responses = list(requests)
+
+        for group in batch_groups(requests):
+            results = await asyncio.gather(*(self.dispatch_sub_request(requests[idx]) for idx in group))
+            for idx, response in zip(group, results):
+                responses[idx] = response
+
+        return ImmediateResponse(batch_response(responses), HTTPStatus.MULTI_STATUS)
+
+    async def dispatch_sub_request(self, request: SubRequest) -> HttpResponse:
+        """
+        Route and dispatch an item of a batch request.
+        """
+        result = self.route_request(request)
+        if isinstance(result, HttpResponse):
+            return result
+
+        operation, path_args = result
+        if operation is self.batch_operation:
+            return HttpResponse("Batch requests can not be nested.", HTTPStatus.BAD_REQUEST)
+        return await self.dispatch(operation, request, **path_args)
+
+    async def dispatch_request(self, request: HttpRequestBase) -> HttpResponse:
+        """
+        Route an incoming request to an operation and dispatch it.
+        """
+        result = self.route_request(request)  # type: Union[HttpResponse, Tuple[Operation, Dict[str, Any]]]
+        if isinstance(result, HttpResponse):
+            return result
+
+        operation, path_args = result
+        return await self.dispatch(operation, request, **path_args)
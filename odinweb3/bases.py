@@ -2,7 +2,8 @@
 Base classes to be populated by
 """
 from abc import ABCMeta, abstractmethod
-from typing import AnyStr
+from time import monotonic
+from typing import AnyStr, Optional
 
 from odin.bases import Codec
 
@@ -15,12 +16,13 @@ class HttpRequestBase(metaclass=ABCMeta):
     """
     Base class for implementation specific HTTP Request objects
     """
-    __slots__ = ('_request_codec', '_response_codec', '_current_operation')
+    __slots__ = ('_request_codec', '_response_codec', '_current_operation', '_deadline')
 
     def __init__(self):
         self._current_operation = None
         self._request_codec = None
         self._response_codec = None
+        self._deadline = None
 
     @property
     @abstractmethod
@@ -96,6 +98,26 @@ class HttpRequestBase(metaclass=ABCMeta):
     def current_operation(self, operation: 'Operation') -> None:
         self._current_operation = operation
 
+    @property
+    def deadline(self) -> Optional[float]:
+        """
+        Time (from :func:`time.monotonic`) this request must be completed by.
+        """
+        return self._deadline
+
+    @deadline.setter
+    def deadline(self, value: Optional[float]) -> None:
+        self._deadline = value
+
+    def set_timeout(self, timeout: float) -> None:
+        """
+        Set the deadline of this request as a timeout (in seconds) from now,
+        an existing deadline is only ever shortened.
+        """
+        deadline = monotonic() + timeout
+        if self._deadline is None or deadline < self._deadline:
+            self._deadline = deadline
+
     @property
     def request_codec(self) -> Codec:
         """
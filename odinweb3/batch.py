@@ -0,0 +1,226 @@
+"""
+Batch
+~~~~~
+
+Batch requests, many operations executed within a single HTTP request.
+
+A batch endpoint is enabled on an API interface by supplying a path eg::
+
+    >>> api = ApiInterfaceBase(
+    ...     ApiVersion(user_api),
+    ...     path_prefix='/api',
+    ...     batch_path='batch',
+    ... )
+
+The body of a batch request is a JSON list of items eg::
+
+    [
+        {"method": "GET", "path": "/api/v1/user/1"},
+        {"method": "POST", "path": "/api/v1/user", "body": {"name": "Dave"}}
+    ]
+
+Each item is routed and dispatched internally as a sub request (with all
+middleware applied), sub requests inherit the headers of the batch request.
+Consecutive safe (eg GET) items are executed concurrently, other items
+are executed in order. The response is a multi-status envelope of the
+status, headers and body of each item.
+
+"""
+import json
+
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+from urllib.parse import parse_qsl
+
+from .bases import HttpRequestBase
+from .constants import Method, Status
+from .data_structures import HttpResponse, MultiValueDict
+from .exceptions import HttpError
+
+__all__ = ('SubRequest', 'PassthroughCodec', 'parse_batch', 'batch_groups', 'batch_result', 'batch_response')
+
+SAFE_METHODS = frozenset((Method.Get, Method.Head, Method.Options))
+"""
+Methods that are safe to execute concurrently.
+"""
+
+
+class PassthroughCodec:
+    """
+    Codec that does not encode responses; used by sub requests so the
+    responses of all items are encoded once (by the batch response).
+    """
+    CONTENT_TYPE = None
+
+    @staticmethod
+    def dumps(resource: Any) -> Any:
+        return resource
+
+
+class SubRequest(HttpRequestBase):
+    """
+    Request for an item of a batch request.
+
+    The scheme, host, cookies and deadline are those of the batch request,
+    headers are the headers of the batch request updated with any headers
+    defined by the item.
+    """
+    __slots__ = ('parent', '_method', '_path', '_query', '_headers', '_body')
+
+    def __init__(self, parent: HttpRequestBase, method: Method, path: str,
+                 headers: Dict[str, str]=None, body: str='') -> None:
+        super().__init__()
+        self.parent = parent
+        self._method = method
+        self._path, _, query_string = path.partition('?')
+        self._query = MultiValueDict(parse_qsl(query_string, keep_blank_values=True) if query_string else None)
+        self._headers = request_headers = dict(parent.headers.items())
+        request_headers.pop('content-length', None)
+        if headers:
+            request_headers.update((name.lower(), value) for name, value in headers.items())
+        self._body = body
+        self._deadline = parent.deadline
+
+    def __repr__(self):
+        return "<{} {} {}>".format(self.__class__.__name__, self._method.value.upper(), self._path)
+
+    @property
+    def scheme(self) -> str:
+        return self.parent.scheme
+
+    @property
+    def host(self) -> str:
+        return self.parent.host
+
+    @property
+    def method(self) -> Method:
+        return self._method
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def query(self) -> MultiValueDict:
+        return self._query
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return self._headers
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        return self.parent.cookies
+
+    @property
+    def post(self) -> MultiValueDict:
+        return MultiValueDict()
+
+    @property
+    def body(self) -> str:
+        return self._body
+
+    @property
+    def response_codec(self):
+        """
+        Sub requests are not encoded (see :class:`PassthroughCodec`).
+        """
+        return PassthroughCodec
+
+    @response_codec.setter
+    def response_codec(self, codec) -> None:
+        pass
+
+
+def _item_error(message: str) -> HttpResponse:
+    return HttpResponse(message, Status.BAD_REQUEST)
+
+
+def parse_batch(request: HttpRequestBase, max_items: int) -> List[Union[SubRequest, HttpResponse]]:
+    """
+    Parse the body of a batch request into sub requests. Any invalid items
+    are returned as an error response.
+
+    :raises HttpError: If the batch is not a list of items or has too many
+        items.
+
+    """
+    body = request.body
+    if isinstance(body, (bytes, memoryview)):
+        try:
+            body = str(body, 'UTF8')
+        except UnicodeDecodeError as ude:
+            raise HttpError(Status.BAD_REQUEST, 99, "Unable to decode request body.", str(ude))
+    try:
+        items = json.loads(body)
+    except ValueError as ex:
+        raise HttpError(Status.BAD_REQUEST, 1, "Unable to decode batch.", str(ex))
+
+    if not isinstance(items, list):
+        raise HttpError(Status.BAD_REQUEST, 2, "Expected a list of batch items.")
+    if len(items) > max_items:
+        raise HttpError(Status.BAD_REQUEST, 3, "Batch exceeds the limit of {} items.".format(max_items))
+
+    requests = []
+    for item in items:
+        if not isinstance(item, dict):
+            requests.append(_item_error("Batch item must be an object."))
+            continue
+
+        method, path, headers = item.get('method', 'GET'), item.get('path'), item.get('headers')
+        if not isinstance(path, str) or not path.startswith('/'):
+            requests.append(_item_error("Batch item requires an absolute path."))
+            continue
+        if headers is not None and not isinstance(headers, dict):
+            requests.append(_item_error("Batch item headers must be an object."))
+            continue
+        try:
+            method = Method(str(method).lower())
+        except ValueError:
+            requests.append(_item_error("Unknown method {!r}.".format(method)))
+            continue
+
+        body = item.get('body')
+        requests.append(SubRequest(request, method, path, headers, '' if body is None else json.dumps(body)))
+
+    return requests
+
+
+def batch_groups(requests: Sequence[Union[SubRequest, HttpResponse]]) -> Iterator[List[int]]:
+    """
+    Group the indexes of sub requests that can be executed concurrently.
+
+    Consecutive sub requests with safe methods are grouped together, all
+    other sub requests are in a group of their own (and executed in order).
+    """
+    group = []
+    for idx, request in enumerate(requests):
+        if isinstance(request, HttpResponse):
+            continue
+        if request.method in SAFE_METHODS:
+            group.append(idx)
+        else:
+            if group:
+                yield group
+                group = []
+            yield [idx]
+    if group:
+        yield group
+
+
+def batch_result(response: HttpResponse) -> Dict[str, Any]:
+    """
+    Item of a multi-status envelope generated from the response of a sub
+    request.
+    """
+    return {
+        'status': response.status,
+        'headers': {name: value for name, value in response.headers.items() if value is not None},
+        'body': response.body,
+    }
+
+
+def batch_response(responses: Sequence[Optional[HttpResponse]]) -> List[Dict[str, Any]]:
+    """
+    Generate a multi-status envelope from the responses of sub requests.
+    """
+    return [batch_result(response) for response in responses]
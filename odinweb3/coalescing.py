@@ -0,0 +1,152 @@
+"""
+Coalescing
+~~~~~~~~~~
+
+Single-flight request coalescing, concurrent identical requests share a
+single execution of an operation and its encoded response.
+
+Coalescing is enabled per operation and only applies to GET requests eg::
+
+    >>> @operation('user/{resource_id}', coalesce=True, vary=('Accept-Language',))
+    ... def get_user(request, resource_id):
+    ...     ...
+
+Requests are identical if they are for the same operation with the same
+path arguments, query (ignoring the order of keys), response codec and
+values of the *vary* headers. The credential headers (see
+:data:`DEFAULT_VARY`) are always included, any other header that changes
+the response must be included in *vary*.
+
+The pre-dispatch middleware (eg authorisation) is run for every request
+before joining a call in flight, and a request only waits for the shared
+call until its own deadline.
+
+"""
+import asyncio
+import threading
+
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from .bases import HttpRequestBase
+from .exceptions import DeadlineExceeded
+
+__all__ = ('DEFAULT_VARY', 'coalesce_key', 'SingleFlight', 'AsyncSingleFlight')
+
+DEFAULT_VARY = ('authorization', 'cookie')
+"""
+Headers that identify the caller, requests with different credentials
+never share a response.
+"""
+
+
+def coalesce_key(operation, request: HttpRequestBase, path_args: Dict[str, Any]) -> Hashable:
+    """
+    Generate the key that identifies identical requests.
+    """
+    headers = request.headers
+    return (
+        id(operation),
+        tuple(sorted(path_args.items())),
+        tuple(sorted((key, tuple(values)) for key, values in request.query.lists())),
+        tuple(headers.get(header) for header in operation.vary),
+        request.response_codec,
+    )
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'exception')
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key (for threaded dispatching).
+    """
+    __slots__ = ('_calls', '_lock')
+
+    def __init__(self) -> None:
+        self._calls = {}  # type: Dict[Hashable, _Call]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def do(self, key: Hashable, func: Callable[[], Any], timeout: float=None) -> Tuple[Any, bool]:
+        """
+        Call ``func``, unless a call with the same key is in flight in which
+        case wait for, and share, the result of that call.
+
+        Returns a tuple of the result and if the result was shared.
+
+        :param timeout: Maximum time (in seconds) to wait for a call in flight.
+        :raises DeadlineExceeded: If the timeout expires.
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if not call.event.wait(timeout):
+                raise DeadlineExceeded()
+            if call.exception is not None:
+                raise call.exception
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as ex:
+            call.exception = ex
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce concurrent calls with the same key (for asyncio dispatching).
+
+    The shared call is run as a task, cancelling one of the callers does
+    not cancel the call for other callers.
+    """
+    __slots__ = ('_calls',)
+
+    def __init__(self) -> None:
+        self._calls = {}  # type: Dict[Hashable, asyncio.Future]
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]], timeout: float=None) -> Tuple[Any, bool]:
+        """
+        Await ``func``, unless a call with the same key is in flight in which
+        case await, and share, the result of that call.
+
+        Returns a tuple of the result and if the result was shared.
+
+        :param timeout: Maximum time (in seconds) to wait for the call, the
+            call continues for any other callers.
+        :raises DeadlineExceeded: If the timeout expires.
+
+        """
+        calls = self._calls
+        task = calls.get(key)
+        shared = task is not None
+        if not shared:
+            task = calls[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda _: calls.pop(key, None))
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout), shared
+        except asyncio.TimeoutError:
+            if task.done():
+                raise  # Raised by the call
+            raise DeadlineExceeded()
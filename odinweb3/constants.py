@@ -46,7 +46,7 @@ class Style(enum.Enum):
     Parameter specification style
     """
     def __new__(cls, value: str, locations: Tuple[Location, ...]) -> 'Style':
-        obj = int.__new__(cls, value)
+        obj = object.__new__(cls)
         obj._value_ = value
         obj.locations = locations
         return obj
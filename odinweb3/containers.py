@@ -5,23 +5,35 @@ API Containers
 Containers that provide structure to an API.
 
 """
+import hashlib
+import json
 import logging
 
 from collections import OrderedDict
-from typing import Union, Tuple, Any, Generator, Dict, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import monotonic
+from typing import Union, Tuple, Any, Iterable, Iterator, Dict, Optional, Sequence, List, IO
 
 from odin import Resource, getmeta
 from odin.codecs.json import codec as json_codec
 from odin.exceptions import ValidationError
+from odin.utils.decorators import lazy_property
 
 from . import content_type_resolvers
 from .bases import HttpRequestBase
+from .batch import SubRequest, parse_batch, batch_groups, batch_response
+from .coalescing import SingleFlight, coalesce_key
 from .constants import Method, HTTPStatus
-from .data_structures import UrlPath, NoPath, HttpResponse, MiddlewareList
+from .data_structures import UrlPath, NoPath, HttpResponse, ImmediateResponse, MiddlewareList, MiddlewareChain
 from .decorators import Operation
-from .exceptions import ImmediateHttpResponse
-from .helpers import resolve_content_type, create_response
+from .exceptions import ImmediateHttpResponse, ServiceUnavailable, DeadlineExceeded
+from .helpers import create_response, encode_response, check_deadline
+from .limits import Bulkhead, AdaptiveLimiter, acquire_all, release_all
+from .negotiation import CodecTable, available_codecs
 from .resources import Error
+from .routing import Router, UrlTemplate, dump_path, load_path
+from .utils import sort_by_priority
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +53,78 @@ except ImportError:
     pass
 
 
+ROUTES_SNAPSHOT_VERSION = 1
+"""
+Version of the route table snapshot format.
+"""
+
+
+def _middleware_names(operation: Operation) -> List[str]:
+    """
+    Names of middleware applied to an operation (in priority order).
+    """
+    return [
+        "{}.{}".format(m.__class__.__module__, m.__class__.__qualname__)
+        for m in sort_by_priority(operation.middleware)
+    ]
+
+
+def _walk_operations(child, signature, operations: List[Operation]) -> None:
+    """
+    Walk an API tree collecting operations (in the same order as
+    ``operation_items``) and a signature of the structure of the tree
+    (without building any paths).
+    """
+    if isinstance(child, Operation):
+        operations.append(child)
+        signature.update(json.dumps([
+            child.operation_id, str(child.path), [m.value for m in child.methods], _middleware_names(child)
+        ]).encode())
+
+    elif isinstance(child, ResourceApi):
+        signature.update(json.dumps(['resource_api', str(child.path_prefix)]).encode())
+        for operation in child._operations:  # pylint:disable=protected-access
+            _walk_operations(operation, signature, operations)
+
+    else:
+        signature.update(json.dumps(['container', str(child.path_prefix)]).encode())
+        for sub_child in child.children:
+            _walk_operations(sub_child, signature, operations)
+
+
+def _url_templates(items: Iterable[Tuple[UrlPath, Operation]]) -> Dict[str, UrlTemplate]:
+    """
+    Index of operation ID to a compiled URL template.
+
+    :raises ValueError: If an operation ID is used by multiple operations.
+
+    """
+    templates = {}
+    operations = {}
+    for path, operation in items:
+        operation_id = operation.operation_id
+        if operations.setdefault(operation_id, operation) is not operation:
+            raise ValueError("Operation ID {!r} is used by multiple operations.".format(operation_id))
+        templates.setdefault(operation_id, UrlTemplate(path))
+    return templates
+
+
+CANNED_ERRORS = {
+    'not_implemented': (HTTPStatus.NOT_IMPLEMENTED, "The method has not been implemented", None),
+    'server_error': (HTTPStatus.INTERNAL_SERVER_ERROR, "An unhandled error has been caught.", None),
+    'service_unavailable': (HTTPStatus.SERVICE_UNAVAILABLE, "The service is at capacity, please try again later.", None),
+    'gateway_timeout': (HTTPStatus.GATEWAY_TIMEOUT, "The request did not complete before its deadline.", None),
+}
+"""
+Fixed error responses that are encoded once for each registered codec.
+"""
+
+# Fixed responses that are not dependent on a codec
+NOT_FOUND_RESPONSE = HttpResponse.from_status(HTTPStatus.NOT_FOUND)
+UNPROCESSABLE_ENTITY_RESPONSE = HttpResponse.from_status(HTTPStatus.UNPROCESSABLE_ENTITY)
+NOT_ACCEPTABLE_RESPONSE = HttpResponse.from_status(HTTPStatus.NOT_ACCEPTABLE)
+
+
 class ResourceApiMeta(type):
     """
     Meta class that resolves endpoints to routes.
@@ -117,10 +201,24 @@ class ResourceApi(metaclass=ResourceApiMeta):
     Parent container this object is bound to.
     """
 
+    max_concurrency = None  # type: int
+    """
+    Maximum number of requests (to all operations of this API) that are
+    processed at once; further requests are rejected with a 503.
+    """
+
+    max_queue = 0
+    """
+    Maximum number of requests waiting for the concurrency limit before
+    requests are rejected.
+    """
+
     def __init__(self):
         if not self.api_name:
             self.api_name = getmeta(self.resource).name.lower()
 
+        self.bulkhead = Bulkhead(self.max_concurrency, self.max_queue) if self.max_concurrency else None
+
         # Append APIs name to path prefix
         self.path_prefix += self.api_name
 
@@ -134,14 +232,14 @@ class ResourceApi(metaclass=ResourceApiMeta):
         self.parent = parent
 
     def operation_items(self, path_base):
-        # type: (Union[str, UrlPath]) -> Generator[Tuple[UrlPath, Operation]]
+        # type: (Union[str, UrlPath]) -> Iterator[Tuple[UrlPath, Operation]]
         """
         Return all operations stored in containers.
         """
         path_base += self.path_prefix
 
         for operation in self._operations:
-            for op_path in operation.op_paths(path_base):
+            for op_path in operation.operation_items(path_base):
                 yield op_path
 
 
@@ -182,7 +280,10 @@ class ApiContainer:
 
     def operation(self, path: UrlPath=NoPath, methods: Union[Method, Sequence[Method]]=Method.Get,
                   resource: Resource=None, tags: Sequence[str]=None, summary: str=None,
-                  middleware: Sequence[Any]=None) -> Operation:
+                  middleware: Sequence[Any]=None, *, blocking: bool=False, process: bool=False,
+                  executor: str=None, timeout: float=None, max_concurrency: int=None, max_queue: int=0,
+                  coalesce: bool=False, vary: Sequence[str]=None, consumes: Union[str, Sequence[str]]=None,
+                  produces: Union[str, Sequence[str]]=None) -> Operation:
         """
         Decorator for creating an operation from a simple method. eg::
 
@@ -191,16 +292,20 @@ class ApiContainer:
             ... def my_operation(request):
             ...     pass
 
+        Accepts the same arguments as :func:`odinweb3.decorators.operation`.
         The `doc` decorators can be used in conjunction with this decorator.
 
         """
         def inner(callback):
-            operation = Operation(callback, path, methods, resource, tags, summary, middleware)
+            operation = Operation(callback, path, methods, resource, tags, summary, middleware,
+                                  blocking=blocking, process=process, executor=executor, timeout=timeout,
+                                  max_concurrency=max_concurrency, max_queue=max_queue, coalesce=coalesce,
+                                  vary=vary, consumes=consumes, produces=produces)
             self.children.append(operation)
             return operation
         return inner
 
-    def operation_items(self, path_base: Union[str, UrlPath]=None) -> Generator[Tuple[UrlPath, Operation]]:
+    def operation_items(self, path_base: Union[str, UrlPath]=None) -> Iterator[Tuple[UrlPath, Operation]]:
         """
         Yields operation item tuples made up of the path and Operation entries.
         """
@@ -227,6 +332,29 @@ class ApiVersion(ApiContainer):
         super(ApiVersion, self).__init__(*containers, **options)
 
 
+class PreparedOperation:
+    """
+    An operation prepared to be dispatched by a specific API interface.
+
+    The same operation can be used by multiple interfaces (eg different API
+    versions or a sync and async interface), state that depends on the
+    interface is held here rather than on the operation.
+    """
+    __slots__ = ('operation', 'chain', 'codecs', 'bulkheads', 'middleware_versions')
+
+    def __init__(self, operation: Operation, chain: MiddlewareChain, codecs: CodecTable,
+                 bulkheads: Tuple[Any, ...], middleware_versions: Optional[Tuple[int, int]]) -> None:
+        self.operation = operation
+        self.chain = chain  # Merged interface and operation middleware
+        self.codecs = codecs  # Codec lookup table
+        self.bulkheads = bulkheads  # Concurrency limits applied to the operation
+        # Versions of the middleware lists merged into chain (None if both are frozen)
+        self.middleware_versions = middleware_versions
+
+    def __repr__(self):
+        return "<{} {!r}>".format(self.__class__.__name__, self.operation)
+
+
 class ApiInterfaceBase(ApiContainer):
     """
     Base class for API interfaces.
@@ -250,6 +378,7 @@ class ApiInterfaceBase(ApiContainer):
     """
 
     response_type_resolvers = [
+        content_type_resolvers.accept_header(),
         content_type_resolvers.accepts_header(),
         content_type_resolvers.content_type_header(),
         content_type_resolvers.specific_default(json_codec.CONTENT_TYPE),
@@ -265,11 +394,38 @@ class ApiInterfaceBase(ApiContainer):
     Remap certain codecs commonly mistakenly used.
     """
 
+    negotiation_cache_size = 256
+    """
+    Number of distinct request/response type values (eg content-type and
+    accept headers) to memoize the negotiated codecs of, for each operation.
+    """
+
+    timeout_header = 'x-request-timeout'
+    """
+    Header a client can use to specify a timeout (in seconds) for a request;
+    set to ``None`` to ignore timeouts supplied by clients.
+    """
+
+    process_operations = False
+    """
+    Interface can dispatch process operations (operations are otherwise
+    called in the thread handling the request so process operations are
+    rejected); see :mod:`odinweb3.executors`.
+    """
+
     def __init__(self, *containers, name: str='api', path_prefix: Union[str, UrlPath]=None,
-                 debug_enabled: bool=False, middleware: list=None, options: bool=True):
+                 debug_enabled: bool=False, middleware: list=None, options: bool=True, timeout: float=None,
+                 limiter: AdaptiveLimiter=None, batch_path: Union[str, UrlPath]=None, batch_max_items: int=50,
+                 batch_concurrency: int=4):
         self.debug_enabled = debug_enabled
         self.middleware = MiddlewareList(middleware or [])
         self.options = options
+        self.timeout = timeout
+        self.limiter = limiter
+        self.batch_path = batch_path
+        self.batch_max_items = batch_max_items
+        self.batch_concurrency = batch_concurrency
+        self._prepared = {}  # type: Dict[int, PreparedOperation]
         super().__init__(*containers, name=name, path_prefix=path_prefix or name)
 
         if not self.path_prefix.is_absolute:
@@ -296,98 +452,320 @@ class ApiInterfaceBase(ApiContainer):
             'status_code': 500,
             'request': request
         })
-        return Error.from_status(HTTPStatus.INTERNAL_SERVER_ERROR, 0,
-                                 "An unhandled error has been caught.")
+        return self.canned_response('server_error', request.response_codec)
 
-    def dispatch_operation(self, operation: Operation, request: HttpRequestBase,
-                           path_args: Dict[str, Any]) -> Tuple[Any, Optional[HTTPStatus], Optional[Dict[str, str]]]:
+    @lazy_property
+    def canned_responses(self) -> Dict[Any, Dict[str, HttpResponse]]:
         """
-        Dispatch and handle exceptions from operation.
+        Fixed error responses (see :data:`CANNED_ERRORS`) pre-encoded for
+        each registered codec.
+        """
+        return {
+            codec: {
+                key: encode_response(codec, Error.from_status(status, 0, message), status, headers)
+                for key, (status, message, headers) in CANNED_ERRORS.items()
+            }
+            for codec in set(self.registered_codecs.values())
+        }
+
+    def canned_response(self, key: str, codec=None) -> HttpResponse:
+        """
+        Get a pre-encoded error response.
+
+        :param key: Key of the error from :data:`CANNED_ERRORS`.
+        :param codec: Codec used to encode the response; defaults to JSON.
+
         """
+        codec = codec or json_codec
         try:
-            # path_args is passed by ref so changes can be made.
-            for middleware in self.middleware.pre_dispatch:
-                middleware(request, path_args)
+            response = self.canned_responses[codec][key]
+        except KeyError:
+            # Codec was not registered, encode the response on demand.
+            status, message, headers = CANNED_ERRORS[key]
+            return encode_response(codec, Error.from_status(status, 0, message), status, headers)
+        else:
+            return response.copy()
 
-            resource = operation(request, path_args)
+    def pre_dispatch_operation(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                               prepared: PreparedOperation=None
+                               ) -> Optional[Tuple[Any, Optional[HTTPStatus], Optional[Dict[str, str]]]]:
+        """
+        Run the pre-dispatch middleware of an operation, returns a result if
+        the request is answered by the middleware (eg not authorised).
 
-            for middleware in self.middleware.post_dispatch:
-                resource = middleware(request, resource)
+        :param prepared: The operation prepared by this interface (see
+            :meth:`prepared`).
 
-        except ImmediateHttpResponse as e:
-            # An exception used to return a response immediately, skipping any
-            # further processing.
-            return e.resource, e.status, e.headers
+        """
+        chain = (prepared or self.prepared(operation)).chain
 
-        except ValidationError as e:
-            # A validation error was raised by a resource.
-            if hasattr(e, 'message_dict'):
-                resource = Error.from_status(HTTPStatus.BAD_REQUEST, 0, "Failed validation", meta=e.message_dict)
-            else:
-                resource = Error.from_status(HTTPStatus.BAD_REQUEST, 0, str(e))
-            return resource, resource.status, None
+        try:
+            check_deadline(request)
 
-        except NotImplementedError:
-            resource = Error.from_status(HTTPStatus.NOT_IMPLEMENTED, 0, "The method has not been implemented")
-            return resource, resource.status, None
+            # path_args is passed by ref so changes can be made.
+            for middleware in chain.pre_dispatch:
+                result = middleware(request, path_args)
+                if isinstance(result, ImmediateResponse):
+                    return result.resource, result.status, result.headers
 
         except Exception as e:
+            result = self._exception_result(request, e)
+            if result is not None:
+                return result
+
             if self.debug_enabled:
                 # If debug is enabled then fallback to the frameworks default
                 # error processing, this often provides convenience features
                 # to aid in the debugging process.
                 raise
 
-            resource = None
             # Fallback to the default handler
-            if resource is None:
-                resource = self.handle_500(request, e)
+            resource = self.handle_500(request, e)
+            return resource, resource.status, None
+
+    def dispatch_operation(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                           pre_dispatched: bool=False, prepared: PreparedOperation=None
+                           ) -> Tuple[Any, Optional[HTTPStatus], Optional[Dict[str, str]]]:
+        """
+        Dispatch and handle exceptions from operation.
+
+        :param pre_dispatched: The pre-dispatch middleware has already been
+            run (see :meth:`pre_dispatch_operation`).
+        :param prepared: The operation prepared by this interface (see
+            :meth:`prepared`).
+
+        """
+        chain = (prepared or self.prepared(operation)).chain
+
+        try:
+            check_deadline(request)
+
+            # An ImmediateResponse can be returned from middleware or the
+            # operation to return a response immediately (without raising)
+            if chain.has_dispatch_middleware:
+                # path_args is passed by ref so changes can be made.
+                if not pre_dispatched:
+                    for middleware in chain.pre_dispatch:
+                        result = middleware(request, path_args)
+                        if isinstance(result, ImmediateResponse):
+                            return result.resource, result.status, result.headers
+
+                check_deadline(request)
+                resource = operation.execute(request, **path_args)
+                if isinstance(resource, ImmediateResponse):
+                    return resource.resource, resource.status, resource.headers
+
+                for middleware in chain.post_dispatch:
+                    resource = middleware(request, resource)
+                    if isinstance(resource, ImmediateResponse):
+                        return resource.resource, resource.status, resource.headers
+
+            else:
+                resource = operation.execute(request, **path_args)
+                if isinstance(resource, ImmediateResponse):
+                    return resource.resource, resource.status, resource.headers
+
+        except Exception as e:
+            result = self._exception_result(request, e)
+            if result is not None:
+                return result
+
+            if self.debug_enabled:
+                # If debug is enabled then fallback to the frameworks default
+                # error processing, this often provides convenience features
+                # to aid in the debugging process.
+                raise
 
+            # Fallback to the default handler
+            resource = self.handle_500(request, e)
             return resource, resource.status, None
 
         else:
             return resource, None, None
 
-    def _dispatch(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any]):
+    def _exception_result(self, request: HttpRequestBase,
+                          exception: Exception) -> Optional[Tuple[Any, Optional[HTTPStatus], Optional[Dict[str, str]]]]:
         """
-        Wrapped dispatch method, prepare request and generate a HTTP Response.
+        Convert an exception raised while dispatching an operation into a
+        result; returns ``None`` for an un-handled exception.
         """
-        # Determine the request and response types. Ensure API supports the requested types
-        request_type = resolve_content_type(self.request_type_resolvers, request)
-        request_type = self.remap_codecs.get(request_type, request_type)
-        try:
-            request.request_codec = self.registered_codecs[request_type]
-        except KeyError:
-            return HttpResponse.from_status(HTTPStatus.UNPROCESSABLE_ENTITY)
+        if isinstance(exception, ImmediateHttpResponse):
+            # An exception used to return a response immediately, skipping any
+            # further processing.
+            return exception.resource, exception.status, exception.headers
 
-        response_type = resolve_content_type(self.response_type_resolvers, request)
-        response_type = self.remap_codecs.get(response_type, response_type)
-        try:
-            request.response_codec = self.registered_codecs[response_type]
-        except KeyError:
-            return HttpResponse.from_status(HTTPStatus.NOT_ACCEPTABLE)
+        if isinstance(exception, ValidationError):
+            # A validation error was raised by a resource.
+            if hasattr(exception, 'message_dict'):
+                resource = Error.from_status(HTTPStatus.BAD_REQUEST, 0, "Failed validation",
+                                             meta=exception.message_dict)
+            else:
+                resource = Error.from_status(HTTPStatus.BAD_REQUEST, 0, str(exception))
+            return resource, resource.status, None
+
+        if isinstance(exception, NotImplementedError):
+            response = self.canned_response('not_implemented', request.response_codec)
+            return response, response.status, None
+
+        if isinstance(exception, DeadlineExceeded):
+            response = self.canned_response('gateway_timeout', request.response_codec)
+            return response, response.status, None
+
+        if isinstance(exception, ServiceUnavailable):
+            response = self.canned_response('service_unavailable', request.response_codec)
+            if exception.retry_after is not None:
+                response['Retry-After'] = str(exception.retry_after)
+            return response, response.status, None
+
+    def request_timeout(self, operation: Operation, request: HttpRequestBase) -> Optional[float]:
+        """
+        Determine the timeout (in seconds) of a request, this is the shortest
+        of the interface, operation and client (header) timeouts.
+        """
+        interface_timeout, timeout = self.timeout, operation.timeout
+        if timeout is None or (interface_timeout is not None and interface_timeout < timeout):
+            timeout = interface_timeout
+
+        timeout_header = self.timeout_header
+        if timeout_header:
+            value = request.headers.get(timeout_header)
+            if value:
+                try:
+                    value = float(value)
+                except ValueError:
+                    pass  # Ignore invalid values
+                else:
+                    if value > 0 and (timeout is None or value < timeout):
+                        timeout = value
+
+        return timeout
+
+    def negotiate(self, operation: Operation, request: HttpRequestBase,
+                  prepared: PreparedOperation=None) -> Optional[HttpResponse]:
+        """
+        Check the request method and determine the request and response
+        codecs. Returns an error response if the request cannot be handled.
+
+        :param prepared: The operation prepared by this interface (see
+            :meth:`prepared`).
 
+        """
         # Check if method is in our allowed method list
         if request.method not in operation.methods:
-            return HttpResponse.from_status(
-                HTTPStatus.METHOD_NOT_ALLOWED,
-                {'Allow': ','.join(m.value for m in operation.methods)}
-            )
+            return HttpResponse.from_status(HTTPStatus.METHOD_NOT_ALLOWED, {'Allow': operation.allow})
 
-        # Response types
-        resource, status, headers = self.dispatch_operation(operation, request, path_args)
+        # Determine the request and response codecs. Ensure API supports the requested types
+        request_codec, response_codec = (prepared or self.prepared(operation)).codecs(request)
 
-        # Convert status into an integer
-        if isinstance(status, HTTPStatus):
-            status = status.value
+        if request_codec is None:
+            return UNPROCESSABLE_ENTITY_RESPONSE.copy()
+        request.request_codec = request_codec
+
+        if response_codec is None:
+            return NOT_ACCEPTABLE_RESPONSE.copy()
+        request.response_codec = response_codec
+
+    def codec_table(self, operation: Operation) -> CodecTable:
+        """
+        Build the lookup table of request and response codecs for an
+        operation from the registered (and remapped) codecs and any content
+        types declared by the operation.
 
+        :raises ValueError: If the operation declares a content type without
+            a registered codec.
+
+        """
+        consumes, produces = operation.consumes, operation.produces
+        return CodecTable(
+            available_codecs(self.registered_codecs, consumes),
+            available_codecs(self.registered_codecs, produces),
+            self.request_type_resolvers,
+            self.response_type_resolvers,
+            request_type=consumes[0] if consumes else None,
+            response_type=produces[0] if produces else None,
+            skip_single=bool(consumes and produces),
+            maxsize=self.negotiation_cache_size,
+            remap_codecs=self.remap_codecs,
+        )
+
+    @staticmethod
+    def _create_response(request: HttpRequestBase, resource: Any, status: Optional[HTTPStatus],
+                         headers: Optional[Dict[str, str]]) -> HttpResponse:
+        """
+        Generate a response from the result of dispatching an operation.
+        """
         # Return a HttpResponse and just send it!
         if isinstance(resource, HttpResponse):
             return resource
 
+        # Convert status into an integer
+        if isinstance(status, HTTPStatus):
+            status = status.value
+
         # Encode the response
         return create_response(request, resource, status, headers)
 
+    def _dispatch(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                  prepared: PreparedOperation):
+        """
+        Wrapped dispatch method, prepare request and generate a HTTP Response.
+        """
+        response = self.negotiate(operation, request, prepared)
+        if response is not None:
+            return response
+
+        if operation.coalesce and request.method is Method.Get:
+            # Pre-dispatch middleware (eg authorisation) is run for each
+            # request before sharing the response of an identical request
+            # that is in flight; a copy is returned so headers can be modified.
+            result = self.pre_dispatch_operation(operation, request, path_args, prepared)
+            if result is not None:
+                return self._create_response(request, *result)
+
+            deadline = request.deadline
+            try:
+                response, _ = self.single_flight.do(
+                    coalesce_key(operation, request, path_args),
+                    partial(self._respond, operation, request, path_args, prepared, True),
+                    None if deadline is None else deadline - monotonic()
+                )
+            except DeadlineExceeded as ex:
+                return self._exception_result(request, ex)[0]
+            return response.copy()
+
+        return self._respond(operation, request, path_args, prepared)
+
+    @lazy_property
+    def single_flight(self) -> SingleFlight:
+        """
+        Coalesces identical requests to operations with coalesce enabled.
+        """
+        return SingleFlight()
+
+    def _respond(self, operation: Operation, request: HttpRequestBase, path_args: Dict[str, Any],
+                 prepared: PreparedOperation, pre_dispatched: bool=False) -> HttpResponse:
+        """
+        Dispatch an operation (within any concurrency limits) and generate a
+        HTTP Response.
+        """
+        bulkheads = prepared.bulkheads
+        if bulkheads:
+            try:
+                tokens = acquire_all(bulkheads, request.deadline)
+            except (ServiceUnavailable, DeadlineExceeded) as ex:
+                # Shed load (or give up waiting) without dispatching the operation
+                return self._exception_result(request, ex)[0]
+
+            try:
+                resource, status, headers = self.dispatch_operation(
+                    operation, request, path_args, pre_dispatched, prepared)
+            finally:
+                release_all(bulkheads, tokens)
+        else:
+            resource, status, headers = self.dispatch_operation(operation, request, path_args, pre_dispatched, prepared)
+
+        return self._create_response(request, resource, status, headers)
+
     def dispatch(self, operation: Operation, request: HttpRequestBase, **path_args):
         """
         Dispatch incoming request and capture top level exceptions.
@@ -395,13 +773,21 @@ class ApiInterfaceBase(ApiContainer):
         # Add current operation to the request (for convenience in middleware methods)
         request.current_operation = operation
 
+        timeout = self.request_timeout(operation, request)
+        if timeout is not None:
+            request.set_timeout(timeout)
+
+        # Resolved once and passed down through the dispatch methods
+        prepared = self.prepared(operation)
+        chain = prepared.chain
+
         try:
-            for middleware in self.middleware.pre_request:
+            for middleware in chain.pre_request:
                 middleware(request, path_args)
 
-            response = self._dispatch(operation, request, path_args)
+            response = self._dispatch(operation, request, path_args, prepared)
 
-            for middleware in self.middleware.post_request:
+            for middleware in chain.post_request:
                 response = middleware(request, response)
 
         except Exception as ex:
@@ -415,6 +801,287 @@ class ApiInterfaceBase(ApiContainer):
         else:
             return response
 
+    def prepare_operation(self, operation: Operation) -> PreparedOperation:
+        """
+        Prepare an operation to be dispatched by this interface, merging the
+        interface and operation middleware into a single chain.
+
+        This is called for every operation when the route table is built, or
+        on first dispatch of an operation not dispatched via the router. The
+        operation is prepared again if either middleware list is modified.
+
+        The concurrency limits of the interface (bound to the operation so
+        it has its own latency baseline), the ``ResourceApi`` the operation
+        is bound to and the operation are also collected and the codec
+        lookup table of the operation is built.
+
+        :raises ValueError: If the operation is a process operation and this
+            interface does not support them.
+
+        """
+        if operation.process and not self.process_operations:
+            raise ValueError("{} is a process operation; use an async interface to dispatch it".format(operation))
+
+        interface_middleware, operation_middleware = self.middleware, operation.middleware
+        prepared = self._prepared[id(operation)] = PreparedOperation(
+            operation,
+            MiddlewareChain(interface_middleware, operation_middleware),
+            self.codec_table(operation),
+            tuple(b for b in (
+                self.limiter and self.limiter.bind(),
+                getattr(operation.parent, 'bulkhead', None),
+                operation.bulkhead,
+            ) if b is not None),
+            None if interface_middleware.frozen and operation_middleware.frozen
+            else (interface_middleware.version, operation_middleware.version),
+        )
+        return prepared
+
+    def prepared(self, operation: Operation) -> PreparedOperation:
+        """
+        Get an operation prepared by this interface, preparing the operation
+        if required (or if the middleware has changed since it was prepared).
+
+        Once the middleware is frozen (see :meth:`freeze`) it can no longer
+        change so the versions are not checked.
+        """
+        prepared = self._prepared.get(id(operation))
+        if prepared is None:
+            return self.prepare_operation(operation)
+
+        middleware_versions = prepared.middleware_versions
+        if middleware_versions is not None and \
+                middleware_versions != (self.middleware.version, operation.middleware.version):
+            return self.prepare_operation(operation)
+        return prepared
+
+    def freeze(self) -> None:
+        """
+        Freeze the middleware of this interface and all of its operations,
+        any further changes raise a :class:`TypeError`. The route table is
+        also built (and all operations prepared).
+
+        This is intended to be called once startup is complete.
+        """
+        self.middleware.freeze()
+        for _, operation in self.operation_items():
+            operation.middleware.freeze()
+            self.prepare_operation(operation)
+        self.router  # noqa - Build router
+
+    def _prepare_router(self, router: Router) -> Router:
+        self.canned_responses  # noqa - Pre-encode responses at startup
+        for node in router.nodes():
+            for operation in node.operations.values():
+                self.prepared(operation)
+        return router
+
+    def dispatch_request(self, request: HttpRequestBase) -> HttpResponse:
+        """
+        Route an incoming request to an operation and dispatch it.
+
+        This is intended for web frameworks where routing is not performed by
+        the framework itself.
+        """
+        result = self.route_request(request)
+        if isinstance(result, HttpResponse):
+            return result
+
+        operation, path_args = result
+        return self.dispatch(operation, request, **path_args)
+
+    def operation_items(self, path_base: Union[str, UrlPath]=None) -> Iterator[Tuple[UrlPath, Operation]]:
+        """
+        Return all operations stored in containers (including the batch
+        operation if enabled).
+        """
+        yield from super().operation_items(path_base)
+
+        batch_operation = self.batch_operation
+        if batch_operation is not None:
+            yield from batch_operation.operation_items(path_base + self.path_prefix if path_base else self.path_prefix)
+
+    @lazy_property
+    def batch_operation(self) -> Optional[Operation]:
+        """
+        Operation that executes batch requests (see :mod:`odinweb3.batch`);
+        ``None`` if batch requests are not enabled.
+        """
+        if self.batch_path:
+            operation = Operation(self.execute_batch, self.batch_path, Method.Post, summary="Batch request")
+            operation.bind_to_container(self)
+            return operation
+
+    @lazy_property
+    def batch_executor(self) -> ThreadPoolExecutor:
+        """
+        Executor used to execute the safe items of a batch concurrently.
+        """
+        return ThreadPoolExecutor(self.batch_concurrency, thread_name_prefix='odinweb3-batch')
+
+    def execute_batch(self, request: HttpRequestBase) -> ImmediateResponse:
+        """
+        Execute the items of a batch request and generate a multi-status
+        response.
+        """
+        requests = parse_batch(request, self.batch_max_items)
+        responses = list(requests)
+
+        for group in batch_groups(requests):
+            if len(group) == 1:
+                responses[group[0]] = self.dispatch_sub_request(requests[group[0]])
+            else:
+                results = self.batch_executor.map(self.dispatch_sub_request, [requests[idx] for idx in group])
+                for idx, response in zip(group, results):
+                    responses[idx] = response
+
+        return ImmediateResponse(batch_response(responses), HTTPStatus.MULTI_STATUS)
+
+    def dispatch_sub_request(self, request: SubRequest) -> HttpResponse:
+        """
+        Route and dispatch an item of a batch request.
+        """
+        result = self.route_request(request)
+        if isinstance(result, HttpResponse):
+            return result
+
+        operation, path_args = result
+        if operation is self.batch_operation:
+            return HttpResponse("Batch requests can not be nested.", HTTPStatus.BAD_REQUEST)
+        return self.dispatch(operation, request, **path_args)
+
+    def route_request(self, request: HttpRequestBase) -> Union[HttpResponse, Tuple[Operation, Dict[str, Any]]]:
+        """
+        Route a request to an operation.
+
+        Returns either the operation and path arguments, or a response if the
+        request cannot be routed (eg not found or an OPTIONS request).
+        """
+        match = self.router.match(request.path)
+        if match is None:
+            return NOT_FOUND_RESPONSE.copy()
+
+        node, path_args = match
+        operation = node.operations.get(request.method)
+        if operation is None:
+            # Answer from precomputed responses (prior to any negotiation or middleware)
+            if request.method is Method.Options and node.options_response is not None:
+                return node.options_response.copy()
+            return node.not_allowed_response.copy()
+
+        return operation, path_args
+
+    @lazy_property
+    def router(self) -> Router:
+        """
+        Router compiled from all operations registered with this interface.
+
+        The router is compiled on first access so should be accessed once
+        all operations have been registered (eg at application startup).
+        """
+        return self._prepare_router(Router(self.operation_items(), self.options))
+
+    @lazy_property
+    def url_templates(self) -> Dict[str, UrlTemplate]:
+        """
+        Index of operation ID to a compiled URL template.
+
+        :raises ValueError: If an operation ID is used by multiple operations.
+
+        """
+        return _url_templates(self.operation_items())
+
+    def url_for(self, operation_id: str, **path_args: Any) -> str:
+        """
+        Build the URL for an operation. eg::
+
+            >>> api.url_for('myapp.apis.get_user', resource_id=1)
+            '/api/v1/user/1'
+
+        Raises a :class:`KeyError` if the operation ID is not known or a
+        path argument is not supplied, and a :class:`ValueError` if the
+        operation ID is used by multiple operations.
+        """
+        return self.url_templates[operation_id].format(**path_args)
+
+    def routes_signature(self) -> Tuple[str, List[Operation]]:
+        """
+        Generate a signature of the current API structure along with all
+        operations (in the order they are yielded by :meth:`operation_items`).
+
+        This walks the API tree but does not build any paths.
+        """
+        signature = hashlib.sha1()
+        signature.update(json.dumps([ROUTES_SNAPSHOT_VERSION, str(self.path_prefix)]).encode())
+        operations = []
+        for child in self.children:
+            _walk_operations(child, signature, operations)
+
+        batch_operation = self.batch_operation
+        if batch_operation is not None:
+            _walk_operations(batch_operation, signature, operations)
+
+        return signature.hexdigest(), operations
+
+    def dump_routes(self, fp: IO[str]) -> None:
+        """
+        Dump a snapshot of the resolved route table to a file.
+
+        This is intended to be run at build time, the snapshot can then be
+        loaded at startup with :meth:`load_routes`.
+        """
+        signature, _ = self.routes_signature()
+        json.dump({
+            'version': ROUTES_SNAPSHOT_VERSION,
+            'signature': signature,
+            'routes': [{
+                'operation_id': operation.operation_id,
+                'path': dump_path(path),
+                'methods': [m.value for m in operation.methods],
+                'middleware': _middleware_names(operation),
+            } for path, operation in self.operation_items()],
+        }, fp, separators=(',', ':'))
+
+    def load_routes(self, fp: IO[str]) -> bool:
+        """
+        Load the route table from a snapshot generated by :meth:`dump_routes`.
+
+        The snapshot is checked against the current API structure, if it does
+        not match (or cannot be read) the route table is built normally.
+
+        Returns ``True`` if the snapshot was used.
+        """
+        try:
+            snapshot = json.load(fp)
+        except ValueError:
+            snapshot = None
+
+        signature, operations = self.routes_signature()
+        routes = snapshot.get('routes') if isinstance(snapshot, dict) else None
+        if not (isinstance(snapshot, dict)
+                and snapshot.get('version') == ROUTES_SNAPSHOT_VERSION
+                and snapshot.get('signature') == signature
+                and isinstance(routes, list) and len(routes) == len(operations)
+                and all(r.get('operation_id') == o.operation_id for r, o in zip(routes, operations))):
+            logger.info("Route snapshot does not match API; building routes.")
+            self.router  # noqa - Build router
+            return False
+
+        # Routes are matched to operations by position (operation IDs are not unique)
+        router = Router(options=self.options)
+        items = []
+        for route, operation in zip(routes, operations):
+            path = load_path(route['path'])
+            router.add(path, operation)
+            items.append((path, operation))
+
+        self.router = self._prepare_router(router)
+        try:
+            self.url_templates = _url_templates(items)
+        except ValueError:
+            pass  # Raised on first use of ``url_for``
+        return True
+
     def method_collated_operations(self, path_base: Union[str, UrlPath]=None
                                    ) -> OrderedDict[UrlPath, Dict[str, Operation]]:
         """
@@ -9,9 +9,22 @@ from .bases import HttpRequestBase
 from .typing import StringResolver
 
 
+def accept_header() -> StringResolver:
+    """
+    Resolve content type from the accept header.
+
+    The header is a list of acceptable media ranges, it is expected to be
+    negotiated against the available content types (see
+    :class:`odinweb3.negotiation.CodecTable`).
+    """
+    def resolver(request: HttpRequestBase):
+        return request.headers.get('accept')
+    return resolver
+
+
 def accepts_header() -> StringResolver:
     """
-    Resolve content type from the accepts header.
+    Resolve content type from the (non-standard) accepts header.
     """
     def resolver(request: HttpRequestBase):
         return request.headers.get('accepts')
@@ -33,7 +46,12 @@ def specific_default(content_type: str) -> StringResolver:
     
     :param content_type: The content type to use.
 
+    The resolver is marked as a default (with a ``default_type`` attribute)
+    so an operation that declares the types it consumes or produces can
+    substitute its own default.
+
     """
     def resolver(_):
         return content_type
+    resolver.default_type = content_type
     return resolver
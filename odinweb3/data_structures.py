@@ -1,13 +1,16 @@
 import re
+import weakref
 
+from functools import lru_cache
+from itertools import groupby
 from odin import Resource, getmeta
 from odin.utils.collections import force_tuple
-from odin.utils.decorators import lazy_property
 from typing import Type, NamedTuple, Union, Optional, Dict, Any, Iterable, Tuple, Hashable, List, Callable, Iterator
 
 from .bases import HttpRequestBase, SpecificationExtendable
 from .constants import Status, Location, DataType
 from .exceptions import MultiValueDictKeyError
+from .resources import Error
 from .typing import StringMap, OpenApiObject
 from .utils import sort_by_priority, dict_filter
 
@@ -47,6 +50,17 @@ class HttpResponse:
     def __repr__(self):
         return "<{} {!r}>".format(self.__class__.__name__, self.status)
 
+    def copy(self) -> 'HttpResponse':
+        """
+        Copy of this response, headers are copied so they can be modified
+        without effecting the original.
+        """
+        response = HttpResponse.__new__(self.__class__)
+        response.body = self.body
+        response.status = self.status
+        response.headers = self.headers.copy()
+        return response
+
     @property
     def content_type(self) -> str:
         """
@@ -62,6 +76,41 @@ class HttpResponse:
         self.headers['Content-Type'] = value
 
 
+class ImmediateResponse:
+    """
+    A response that should be returned immediately.
+
+    This is the return value equivalent of raising an
+    :class:`odinweb3.exceptions.ImmediateHttpResponse` or
+    :class:`odinweb3.exceptions.HttpError`, it can be returned by pre or
+    post dispatch middleware or an operation to skip any further processing
+    without the cost of raising an exception. eg::
+
+        >>> class AuthMiddleware:
+        ...     def pre_dispatch(self, request, path_args):
+        ...         if not request.headers.get('authorization'):
+        ...             return ImmediateResponse.from_status(Status.UNAUTHORIZED)
+
+    """
+    __slots__ = ('resource', 'status', 'headers')
+
+    @classmethod
+    def from_status(cls, status: Status, code_index: int=0, message: str=None, developer_message: str=None,
+                    meta: Any=None, headers: StringMap=None) -> 'ImmediateResponse':
+        """
+        Immediate error response built from the HTTP Status code.
+        """
+        return cls(Error.from_status(status, code_index, message, developer_message, meta), status, headers)
+
+    def __init__(self, resource: Any, status: Status=Status.OK, headers: StringMap=None) -> None:
+        self.resource = resource
+        self.status = status
+        self.headers = headers
+
+    def __repr__(self):
+        return "<{} {!r}>".format(self.__class__.__name__, self.status)
+
+
 class DefaultHttpResponse(HttpResponse):
     """
     Default response object
@@ -117,11 +166,42 @@ PATH_NODE_RE = re.compile(r'^{([a-zA-Z]\w*)(?::([a-zA-Z]\w*))?(?::([-^$+*:\w\\\[
 PathTypes = Union['UrlPath', str, PathParam]
 
 
+def _parse_nodes(url_path: str) -> Tuple[Union[str, PathParam], ...]:
+    """
+    Parse a URL path string into a tuple of nodes.
+    """
+    nodes = []
+    for node in url_path.rstrip('/').split('/'):
+        # Identifies a PathNode
+        if '{' in node or '}' in node:
+            m = PATH_NODE_RE.match(node)
+            if not m:
+                raise ValueError("Invalid path param: {}".format(node))
+
+            # Parse out name and type
+            name, param_type, param_arg = m.groups()
+            try:
+                type_ = DataType[param_type] if param_type else DataType.Integer
+            except KeyError:
+                raise ValueError("Unknown param type `{}` in: {}".format(param_type, node))
+
+            nodes.append(PathParam(name, type_, param_arg))
+        else:
+            nodes.append(node)
+
+    return tuple(nodes)
+
+
 class UrlPath:
     """
     Object that represents a URL path.
+
+    URL paths are immutable values, equal paths are interned and share a
+    single instance.
     """
-    __slots__ = ('_nodes',)
+    __slots__ = ('_nodes', '_hash', '_str', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
 
     @classmethod
     def from_object(cls, obj: PathTypes) -> 'UrlPath':
@@ -141,44 +221,46 @@ class UrlPath:
         raise ValueError("Unable to convert object to UrlPath `%r`" % obj)
 
     @classmethod
+    @lru_cache(maxsize=1024)
     def parse(cls, url_path: str) -> 'UrlPath':
         """
         Parse a string into a URL path (simple eg does not support typing of URL parameters)
+
+        Results are memoized, parsing the same string returns the same instance.
         """
         if not url_path:
             return cls()
+        return cls(*_parse_nodes(url_path))
 
-        nodes = []
-        for node in url_path.rstrip('/').split('/'):
-            # Identifies a PathNode
-            if '{' in node or '}' in node:
-                m = PATH_NODE_RE.match(node)
-                if not m:
-                    raise ValueError("Invalid path param: {}".format(node))
-
-                # Parse out name and type
-                name, param_type, param_arg = m.groups()
-                try:
-                    type_ = Type[param_type]
-                except KeyError:
-                    if param_type is not None:
-                        raise ValueError("Unknown param type `{}` in: {}".format(param_type, node))
-                    type_ = DataType.Integer
-
-                nodes.append(PathParam(name, type_, param_arg))
-            else:
-                nodes.append(node)
+    def __new__(cls, *nodes: Union[str, PathParam]) -> 'UrlPath':
+        # Paths are immutable so equal paths are interned to share an instance
+        key = (cls, nodes)
+        try:
+            return cls._interned[key]
+        except KeyError:
+            pass
+
+        instance = super().__new__(cls)
+        object.__setattr__(instance, '_nodes', nodes)
+        object.__setattr__(instance, '_hash', hash(nodes))
+        object.__setattr__(instance, '_str', None)
+        return cls._interned.setdefault(key, instance)
 
-        return cls(*nodes)
+    def __setattr__(self, key, value):
+        raise AttributeError("{} is immutable".format(self.__class__.__name__))
 
-    def __init__(self, *nodes: Union[str, PathParam]):
-        self._nodes = nodes
+    def __reduce__(self):
+        return self.__class__, self._nodes
 
     def __hash__(self):
-        return hash(str(self))
+        return self._hash
 
     def __str__(self):
-        return self.format()
+        value = self._str
+        if value is None:
+            value = self.format()
+            object.__setattr__(self, '_str', value)
+        return value
 
     def __repr__(self):
         return "<{} {}>".format(
@@ -204,6 +286,8 @@ class UrlPath:
         return NotImplemented
 
     def __eq__(self, other: 'UrlPath') -> bool:
+        if self is other:
+            return True
         if isinstance(other, UrlPath):
             return self._nodes == other._nodes  # pylint:disable=protected-access
         return NotImplemented
@@ -258,7 +342,7 @@ class UrlPath:
             args.append(path_node.type_args)
         return "{{{}}}".format(':'.join(args))
 
-    def format(self, node_formatter: Optional[Callable[(PathParam,), str], str]=None) -> str:
+    def format(self, node_formatter: Optional[Callable[(PathParam,), str]]=None) -> str:
         """
         Format a URL path.
 
@@ -355,6 +439,9 @@ class Parameter(SpecificationExtendable):
             return (self.name, self.location) == (other.name, other.location)
         return NotImplemented
 
+    def __hash__(self):
+        return hash((self.name, self.location))
+
     def __and__(self, other: Any) -> 'Parameter':
         """
         Combine parameters. The primary use-case for this method is to extend
@@ -437,60 +524,162 @@ class DefaultResponse(Response):
         super(DefaultResponse, self).__init__('default', description, resource)
 
 
+class _MiddlewarePhase:
+    """
+    Tuple of hook methods for a phase of a :class:`MiddlewareList`.
+
+    Phases are built on first access and stored on the list instance, this
+    descriptor is only used when the cached value is not available.
+    """
+    def __init__(self, name: str, doc: str) -> None:
+        self.name = name
+        self.__doc__ = doc
+
+    def __get__(self, instance: 'MiddlewareList', owner):
+        if instance is None:
+            return self
+        instance.build()
+        return instance.__dict__[self.name]
+
+
+def _middleware_priority(middleware) -> int:
+    return getattr(middleware, 'priority', 10)
+
+
+def _mutator(name: str):
+    """
+    Wrap a list method that mutates the list to check the list is not frozen
+    and to invalidate any cached phases.
+    """
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        if self.frozen:
+            raise TypeError("Middleware list is frozen.")
+        result = method(self, *args, **kwargs)
+        self.invalidate()
+        return result
+    wrapper.__name__ = name
+    wrapper.__doc__ = method.__doc__
+    return wrapper
+
+
 class MiddlewareList(list):
     """
     List of middleware with filtering and sorting builtin.
+
+    The hook methods for each phase are built on first access (with the list
+    sorted once) and are rebuilt if the list is modified. Once startup is
+    complete the list can be frozen to prevent further changes.
     """
-    @lazy_property
-    def pre_request(self) -> Iterable[Callable[(HttpRequestBase,), None]]:
-        """
+    PHASES = (
+        # Phase, Middleware attribute, Reverse priority
+        ('pre_request', 'pre_request', False),
+        ('pre_dispatch', 'pre_dispatch', False),
+        ('post_dispatch', 'post_dispatch', True),
+        ('handle_500', 'handle_500', True),
+        ('post_request', 'post_request', True),
+        ('post_spec', 'post_swagger', False),
+    )
+
+    frozen = False
+
+    version = 0
+    """
+    Incremented each time the list is modified, used to identify merged
+    chains built from a previous version of the list.
+    """
+
+    pre_request = _MiddlewarePhase('pre_request', """
         List of pre-request methods from registered middleware.
-        """
-        middleware = sort_by_priority(self)
-        return tuple(m.pre_request for m in middleware if hasattr(m, 'pre_request'))
+        """)  # type: Tuple[Callable[[HttpRequestBase, Dict[str, Any]], None], ...]
 
-    @lazy_property
-    def pre_dispatch(self) -> Iterable[Callable[(HttpRequestBase,), None]]:
-        """
+    pre_dispatch = _MiddlewarePhase('pre_dispatch', """
         List of pre-dispatch methods from registered middleware.
-        """
-        middleware = sort_by_priority(self)
-        return tuple(m.pre_dispatch for m in middleware if hasattr(m, 'pre_dispatch'))
+        """)  # type: Tuple[Callable[[HttpRequestBase, Dict[str, Any]], None], ...]
 
-    @lazy_property
-    def post_dispatch(self) -> Iterable[Callable[(HttpRequestBase,), HttpResponse]]:
-        """
+    post_dispatch = _MiddlewarePhase('post_dispatch', """
         List of post-dispatch methods from registered middleware.
-        """
-        middleware = sort_by_priority(self, reverse=True)
-        return tuple(m.post_dispatch for m in middleware if hasattr(m, 'post_dispatch'))
+        """)  # type: Tuple[Callable[[HttpRequestBase, Any], Any], ...]
 
-    @lazy_property
-    def handle_500(self) -> Iterable[Callable[(HttpRequestBase, Exception), HttpResponse]]:
-        """
+    handle_500 = _MiddlewarePhase('handle_500', """
         List of handle-error methods from registered middleware.
-        """
-        middleware = sort_by_priority(self, reverse=True)
-        return tuple(m.handle_500 for m in middleware if hasattr(m, 'handle_500'))
+        """)  # type: Tuple[Callable[[HttpRequestBase, Exception], Any], ...]
 
-    @lazy_property
-    def post_request(self) -> Iterable[Callable[(HttpRequestBase,), HttpResponse]]:
-        """
+    post_request = _MiddlewarePhase('post_request', """
         List of post_request methods from registered middleware.
-        """
-        middleware = sort_by_priority(self, reverse=True)
-        return tuple(m.post_request for m in middleware if hasattr(m, 'post_request'))
+        """)  # type: Tuple[Callable[[HttpRequestBase, HttpResponse], HttpResponse], ...]
 
-    @lazy_property
-    def post_spec(self):
-        """
+    post_spec = _MiddlewarePhase('post_spec', """
         List of post-spec methods from registered middleware.
 
         This is used to modify documentation (eg add/remove any extra information, provided by the middleware)
+        """)
+
+    append = _mutator('append')
+    extend = _mutator('extend')
+    insert = _mutator('insert')
+    remove = _mutator('remove')
+    pop = _mutator('pop')
+    clear = _mutator('clear')
+    sort = _mutator('sort')
+    reverse = _mutator('reverse')
+    __setitem__ = _mutator('__setitem__')
+    __delitem__ = _mutator('__delitem__')
+    __iadd__ = _mutator('__iadd__')
+    __imul__ = _mutator('__imul__')
+
+    def build(self) -> None:
+        """
+        Build the hook methods for all phases.
+
+        Middleware is sorted by priority once, post phases are called in
+        reverse priority order (middleware with the same priority is called
+        in the order it was added).
+        """
+        ordered = sort_by_priority(self)
+        groups = [list(group) for _, group in groupby(ordered, key=_middleware_priority)]
+        reverse_ordered = [m for group in reversed(groups) for m in group]
+
+        for phase, attr, reverse in self.PHASES:
+            self.__dict__[phase] = tuple(
+                getattr(m, attr) for m in (reverse_ordered if reverse else ordered) if hasattr(m, attr)
+            )
 
+    def invalidate(self) -> None:
         """
-        middleware = sort_by_priority(self)
-        return tuple(m.post_swagger for m in middleware if hasattr(m, 'post_swagger'))
+        Invalidate cached phases, these will be rebuilt on next access.
+        """
+        for phase, _, _ in self.PHASES:
+            self.__dict__.pop(phase, None)
+        self.version += 1
+
+    def freeze(self) -> None:
+        """
+        Freeze the list, preventing any further modification.
+        """
+        if not self.frozen:
+            self.build()
+            self.frozen = True
+
+
+class MiddlewareChain:
+    """
+    Middleware hooks for an operation, pre-merged from the interface and
+    operation middleware lists.
+
+    Interface middleware wraps operation middleware; pre hooks of the
+    interface are called before those of the operation and post hooks of
+    the operation are called before those of the interface.
+    """
+    __slots__ = ('pre_request', 'pre_dispatch', 'post_dispatch', 'post_request', 'has_dispatch_middleware')
+
+    def __init__(self, interface_middleware: MiddlewareList, operation_middleware: MiddlewareList) -> None:
+        self.pre_request = interface_middleware.pre_request
+        self.pre_dispatch = interface_middleware.pre_dispatch + operation_middleware.pre_dispatch
+        self.post_dispatch = operation_middleware.post_dispatch + interface_middleware.post_dispatch
+        self.post_request = interface_middleware.post_request
+        self.has_dispatch_middleware = bool(self.pre_dispatch or self.post_dispatch)
 
 
 class NotDefined:
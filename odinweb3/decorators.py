@@ -1,14 +1,20 @@
 """
 Decorators
 """
+from inspect import isawaitable
+
 from odin import getmeta
 from odin.utils.collections import force_tuple
-from typing import Callable, Any, Union, Iterable, Dict, Generator, Tuple, Set, Sequence
+from typing import Awaitable, Callable, Any, Union, Iterable, Dict, Iterator, Tuple, Set, Sequence
 
 from odinweb3.helpers import create_response
 from .bases import HttpRequestBase
+from .coalescing import DEFAULT_VARY
 from .constants import Method
-from .data_structures import NoPath, UrlPath, Path, MiddlewareList, DefaultResponse, PathTypes, Parameter
+from .data_structures import (
+    NoPath, UrlPath, Path, MiddlewareList, DefaultResponse, PathTypes, Parameter, ImmediateResponse
+)
+from .limits import Bulkhead
 from .resources import Error
 from .utils import dict_filter
 
@@ -29,20 +35,30 @@ class Operation:
         'middleware', 'summary', 'external_docs', 'parameters',
         'request_body', 'responses', 'deprecated', 'security', 'servers',
         'path', 'operation_id', '_resource', '_binding', '_tags', 'parent',
+        'allow', 'blocking', 'process', 'executor', 'timeout',
+        'bulkhead', 'coalesce', 'vary', 'consumes', 'produces',
     )
 
     def __init__(self, callback: Callback, path: PathTypes=NoPath, methods: Union[Method, Iterable[Method]]=Method.Get,
-                 resource=None, tags: Sequence[str]=None, summary: str=None, middleware: Sequence[Any]=None) -> None:
+                 resource=None, tags: Sequence[str]=None, summary: str=None, middleware: Sequence[Any]=None,
+                 *, blocking: bool=False, process: bool=False, executor: str=None, timeout: float=None,
+                 max_concurrency: int=None, max_queue: int=0, coalesce: bool=False,
+                 vary: Sequence[str]=None, consumes: Union[str, Sequence[str]]=None,
+                 produces: Union[str, Sequence[str]]=None) -> None:
         # Store callback (base is to allow decorators to be applied to callback and still have access to the "base")
         self.base_callback = self.callback = callback
         self.operation_id = "{}.{}".format(callback.__module__, callback.__name__)
 
+        self._resource = resource
+        self._binding = None  # If this operation is bound to a Resource API
+        self.parent = None   # If the operation is bound to a container
+
         # Path + methods define a "unique" operation
         self.url_path = url_path = UrlPath.from_object(path)
         self.path = url_path.apply_args(id=self.key_field_name)
         self.methods = tuple(methods) if isinstance(methods, Iterable) else (methods,)
+        self.allow = ', '.join(m.value.upper() for m in self.methods)  # Allow header value
 
-        self._resource = resource
         self._tags = set(force_tuple(tags))
         self.summary = summary
 
@@ -50,13 +66,29 @@ class Operation:
         self.middleware = MiddlewareList(middleware or [])
         self.middleware.append(self)  # Add self as middleware to obtain pre-dispatch support
 
+        # Execution (used by async interfaces to move blocking callbacks off the event loop)
+        self.blocking = blocking
+        self.process = process
+        self.executor = executor
+        self.timeout = timeout  # Maximum time (in seconds) to complete a request
+
+        # Concurrency limits
+        self.bulkhead = Bulkhead(max_concurrency, max_queue) if max_concurrency else None
+
+        # Coalesce concurrent identical GET requests
+        self.coalesce = coalesce
+        self.vary = DEFAULT_VARY + tuple(
+            header for header in (h.lower() for h in vary or ()) if header not in DEFAULT_VARY
+        )
+
+        # Content types (in order of preference) supported by the operation
+        self.consumes = force_tuple(consumes) if consumes else None
+        self.produces = force_tuple(produces) if produces else None
+
         # Sorting
         self.sort_key = Operation._operation_count
         Operation._operation_count += 1
 
-        self._binding = None  # If this operation is bound to a Resource API
-        self.parent = None   # If the operation is bound to a container
-
         # Documentation
         self.external_docs = None
         self.parameters = set()
@@ -76,18 +108,24 @@ class Operation:
         # Add a default response
         self.responses.add(DefaultResponse('Unhandled error', Error))
 
-    def __call__(self, request: HttpRequestBase, path_args: Dict[Any]):
+    def __call__(self, request: HttpRequestBase, path_args: Dict[str, Any]):
         """
         Main wrapper around the operation callback function.
         """
         # path_args is passed by ref so changes can be made.
         for middleware in self.middleware.pre_dispatch:
-            middleware(request, path_args)
+            result = middleware(request, path_args)
+            if isinstance(result, ImmediateResponse):
+                return result
 
         response = self.execute(request, **path_args)
+        if isinstance(response, ImmediateResponse):
+            return response
 
         for middleware in self.middleware.post_dispatch:
             response = middleware(request, response)
+            if isinstance(response, ImmediateResponse):
+                return response
 
         return response
 
@@ -134,7 +172,7 @@ class Operation:
         """
         self.parent = parent
 
-    def operation_items(self, path_prefix: Path=None) -> Generator[Tuple[UrlPath, 'Operation']]:
+    def operation_items(self, path_prefix: Path=None) -> Iterator[Tuple[UrlPath, 'Operation']]:
         """
         Yield operations paths stored in containers.
         """
@@ -199,14 +237,47 @@ class Operation:
 
 
 def operation(path: PathTypes=NoPath, methods: Union[Method, Iterable[Method]]=Method.Get,
-              resource=None, tags: Sequence[str]=None, summary: str=None, middleware: Sequence[Any]=None) -> Operation:
+              resource=None, tags: Sequence[str]=None, summary: str=None, middleware: Sequence[Any]=None,
+              *, blocking: bool=False, process: bool=False, executor: str=None, timeout: float=None,
+              max_concurrency: int=None, max_queue: int=0, coalesce: bool=False,
+              vary: Sequence[str]=None, consumes: Union[str, Sequence[str]]=None,
+              produces: Union[str, Sequence[str]]=None) -> Operation:
     """
     Decorator for defining an API operation. Usually one of the helpers
     (listing, detail, update, delete) would be used in place of this Operation
     decorator.
+
+    :param blocking: The callback blocks (eg performs IO using a synchronous
+        library); async interfaces run the callback in an executor.
+    :param process: The callback is CPU bound; async interfaces run the
+        callback in a process pool passing a picklable snapshot of the
+        request. The callback must be importable from its module; process
+        operations are rejected by sync interfaces and can not be listings.
+    :param executor: Name of the executor group used to run a blocking
+        callback; defaults to the *default* group (or the *process* group
+        for process callbacks).
+    :param timeout: Maximum time (in seconds) allowed to complete a request.
+    :param max_concurrency: Maximum number of requests to this operation that
+        are processed at once; further requests are rejected with a 503.
+    :param max_queue: Maximum number of requests waiting for the concurrency
+        limit before requests are rejected.
+    :param coalesce: Concurrent identical GET requests share a single
+        execution of the operation, see :mod:`odinweb3.coalescing`.
+    :param vary: Headers that change the response of a coalesced operation,
+        in addition to the credential headers (``Authorization`` and
+        ``Cookie``).
+    :param consumes: Content type(s) of requests accepted by the operation;
+        defaults to all registered codecs.
+    :param produces: Content type(s) of responses generated by the
+        operation; defaults to all registered codecs. An operation that
+        consumes and produces a single content type skips negotiation.
+
     """
     def inner(callback):
-        return Operation(callback, path, methods, resource, tags, summary, middleware)
+        return Operation(callback, path, methods, resource, tags, summary, middleware,
+                         blocking=blocking, process=process, executor=executor, timeout=timeout,
+                         max_concurrency=max_concurrency, max_queue=max_queue, coalesce=coalesce, vary=vary,
+                         consumes=consumes, produces=produces)
     return inner
 
 
@@ -225,6 +296,11 @@ class ListOperation(Operation):
                 return items
 
     """
+    listing_resource = None
+    """
+    Resource returned by the listing.
+    """
+
     default_offset = 0
     """
     Default offset if not specified.
@@ -256,13 +332,13 @@ class ListOperation(Operation):
 
     def execute(self, request, *args, **path_args):
         # Get paging args from query string
-        offset = int(request.GET.get('offset', self.default_offset))
+        offset = int(request.query.get('offset', self.default_offset))
         if offset < 0:
             offset = 0
         path_args['offset'] = offset
 
         max_limit = self.max_limit
-        limit = int(request.GET.get('limit', self.default_limit))
+        limit = int(request.query.get('limit', self.default_limit))
         if limit < 1:
             limit = 1
         elif max_limit and limit > max_limit:
@@ -271,6 +347,16 @@ class ListOperation(Operation):
 
         # Run base execute
         result = super().execute(request, *args, **path_args)
+        if isawaitable(result):
+            # Generate the response once the coroutine callback is awaited
+            return self._paged_response_async(request, result, offset, limit)
+        return self._paged_response(request, result, offset, limit)
+
+    async def _paged_response_async(self, request: HttpRequestBase, result: Awaitable, offset: int, limit: int):
+        return self._paged_response(request, await result, offset, limit)
+
+    @staticmethod
+    def _paged_response(request: HttpRequestBase, result: Any, offset: int, limit: int):
         if result is not None:
             if isinstance(result, tuple) and len(result) == 2:
                 result, total_count = result
@@ -0,0 +1,144 @@
+"""
+Encoders
+~~~~~~~~
+
+Compiled encoders that convert odin resources into plain data structures
+(dicts and lists) prior to being dumped by a codec.
+
+An encoder is built once for each resource type, the fields (including
+calculated fields) are resolved from the resource metadata when the
+encoder is built rather than each time a resource is encoded. Resources
+of composite fields (eg ``DictAs``, ``ArrayOf``) are encoded with the
+encoder of the nested resource type.
+
+Encoded resources match the output of odin codecs, the type field is
+included, eg::
+
+    >>> encode(User(id=1, name='Dave'))
+    {'id': 1, 'name': 'Dave', '$': 'tests.User'}
+
+Encoding is opt-in, resources are only encoded for codecs that define
+``ENCODE_RESOURCES = True`` or are listed in :data:`ENCODING_CODECS` (the
+odin JSON, MessagePack and YAML codecs). Other codecs (eg the odin XML and
+CSV codecs) are passed resource instances.
+
+"""
+from typing import Any, Callable, Dict, Set, Type
+
+from odin import getmeta
+from odin.codecs.json import codec as json_codec
+from odin.resources import ResourceBase
+
+__all__ = ('ENCODING_CODECS', 'encodes_resources', 'compile_encoder', 'get_encoder', 'encode')
+
+Encoder = Callable[[ResourceBase], Dict[str, Any]]
+
+_encoders = {}  # type: Dict[Type[ResourceBase], Encoder]
+
+ENCODING_CODECS = {json_codec}  # type: Set[Any]
+"""
+Codecs that do not define ``ENCODE_RESOURCES`` but are known to dump
+encoded resources the same as resource instances.
+"""
+
+try:
+    from odin.codecs.msgpack import codec as msgpack_codec
+    ENCODING_CODECS.add(msgpack_codec)
+except ImportError:
+    pass
+
+try:
+    from odin.codecs.yaml import codec as yaml_codec
+    ENCODING_CODECS.add(yaml_codec)
+except ImportError:
+    pass
+
+# Values that never contain resources
+_PLAIN_TYPES = frozenset((str, int, float, bool, type(None), bytes))
+
+
+def encodes_resources(codec: Any) -> bool:
+    """
+    Resources are encoded before being dumped by a codec.
+    """
+    encode_resources = getattr(codec, 'ENCODE_RESOURCES', None)
+    if encode_resources is None:
+        return codec in ENCODING_CODECS
+    return encode_resources
+
+
+def compile_encoder(resource_type: Type[ResourceBase]) -> Encoder:
+    """
+    Build an encoder for a resource type.
+    """
+    meta = getmeta(resource_type)
+    fields = tuple(
+        (field.name, field.value_from_object, field.prepare, getattr(field, 'of', None) is not None)
+        for field in meta.all_fields
+    )
+    type_field = meta.type_field
+    resource_name = meta.resource_name
+
+    def encoder(resource: ResourceBase) -> Dict[str, Any]:
+        data = {}
+        for name, value_from_object, prepare, composite in fields:
+            value = prepare(value_from_object(resource))
+            if composite and value is not None:
+                value = encode(value)
+            data[name] = value
+        data[type_field] = resource_name
+        return data
+
+    encoder.__name__ = 'encode_{}'.format(meta.name)
+    return encoder
+
+
+def get_encoder(resource_type: Type[ResourceBase]) -> Encoder:
+    """
+    Get the encoder for a resource type, the encoder is built on first use.
+    """
+    try:
+        return _encoders[resource_type]
+    except KeyError:
+        encoder = _encoders[resource_type] = compile_encoder(resource_type)
+        return encoder
+
+
+def encode(value: Any) -> Any:
+    """
+    Encode any resources (including resources within lists and dicts)
+    into plain data structures.
+
+    Lists and dicts are only copied if they contain a resource, otherwise
+    the value is returned unchanged.
+    """
+    if type(value) in _PLAIN_TYPES:
+        return value
+    if isinstance(value, ResourceBase):
+        return get_encoder(value.__class__)(value)
+
+    if isinstance(value, (list, tuple)):
+        encoded = None
+        for idx, item in enumerate(value):
+            if type(item) in _PLAIN_TYPES:
+                continue
+            new_item = encode(item)
+            if new_item is not item:
+                if encoded is None:
+                    encoded = list(value)
+                encoded[idx] = new_item
+        return value if encoded is None else encoded
+
+    if isinstance(value, dict):
+        encoded = None
+        for key, item in value.items():
+            if type(item) in _PLAIN_TYPES:
+                continue
+            new_item = encode(item)
+            if new_item is not item:
+                if encoded is None:
+                    encoded = dict(value)
+                encoded[key] = new_item
+        return value if encoded is None else encoded
+
+    return value
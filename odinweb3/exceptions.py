@@ -54,6 +54,25 @@ class AccessDenied(HttpError):
         super().__init__(Status.FORBIDDEN, 0, message, developer_method, None, headers)
 
 
+class ServiceUnavailable(OdinWebException):
+    """
+    The service does not have capacity to handle this request.
+
+    :param message: Reason for the error (for logging).
+    :param retry_after: Seconds the client should wait before retrying.
+
+    """
+    def __init__(self, message: str=None, retry_after: int=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(OdinWebException):
+    """
+    The deadline of a request has passed before it could be completed.
+    """
+
+
 class MultiValueDictKeyError(KeyError, OdinWebException):
     """
     Multiple value dictionary KeyError
@@ -0,0 +1,359 @@
+"""
+Executors
+~~~~~~~~~
+
+Bounded executor groups used by an async API interface to run blocking
+operations without blocking the event loop.
+
+Operations declare themselves as blocking and (optionally) the executor
+group they are run in eg::
+
+    >>> @operation('report', blocking=True, executor='reports')
+    ... def generate_report(request):
+    ...     ...
+
+    >>> api = AsyncApiInterfaceBase(
+    ...     ApiVersion(report_api),
+    ...     executors=Executors(
+    ...         ExecutorGroup('default', max_workers=8),
+    ...         ExecutorGroup('reports', max_workers=2, max_queue=10),
+    ...     ),
+    ... )
+
+Each group has its own threads, a slow group can not exhaust the threads
+used by other groups.
+
+CPU bound operations can be run in a pool of processes, the callback is
+called with a :class:`RequestSnapshot` in place of the request eg::
+
+    >>> @operation('report/{report_id}', process=True)
+    ... def render_report(request, report_id):
+    ...     ...
+
+"""
+import asyncio
+import importlib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Executor, Future
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .bases import HttpRequestBase
+from .constants import Method, Status
+from .data_structures import MultiValueDict
+from .decorators import Operation
+from .exceptions import HttpError, ServiceUnavailable
+
+__all__ = (
+    'DEFAULT_EXECUTOR', 'DEFAULT_PROCESS_EXECUTOR', 'ExecutorGroup', 'ProcessExecutorGroup', 'Executors',
+    'RequestSnapshot', 'operation_reference', 'call_operation',
+)
+
+DEFAULT_EXECUTOR = 'default'
+"""
+Name of the executor group used by blocking operations that do not
+specify a group.
+"""
+
+DEFAULT_PROCESS_EXECUTOR = 'process'
+"""
+Name of the executor group used by process operations that do not
+specify a group.
+"""
+
+
+class ExecutorGroup:
+    """
+    Named, bounded pool of worker threads.
+
+    :param name: Name of the group.
+    :param max_workers: Maximum number of worker threads.
+    :param max_queue: Maximum number of calls waiting for a worker; once
+        the queue is full calls are rejected with
+        :class:`odinweb3.exceptions.ServiceUnavailable`. ``None`` for an
+        unbounded queue.
+
+    """
+    __slots__ = (
+        'name', 'max_workers', 'max_queue', '_executor', '_lock',
+        'active', 'queued', 'completed', 'rejected',
+    )
+
+    def __init__(self, name: str, max_workers: int=4, max_queue: int=None) -> None:
+        if max_workers < 1:
+            raise ValueError("max_workers must be greater than 0")
+        if max_queue is not None and max_queue < 0:
+            raise ValueError("max_queue must be 0 or greater")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = None  # type: Optional[Executor]
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.active = 0
+        self.queued = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def __repr__(self):
+        return "<{} {!r} max_workers={}>".format(self.__class__.__name__, self.name, self.max_workers)
+
+    @property
+    def executor(self) -> Executor:
+        """
+        Executor used to run calls (created on first use).
+        """
+        executor = self._executor
+        if executor is None:
+            executor = self._executor = self._create_executor()
+        return executor
+
+    def _create_executor(self) -> Executor:
+        return ThreadPoolExecutor(self.max_workers, thread_name_prefix='odinweb3-{}'.format(self.name))
+
+    def _acquire(self) -> None:
+        with self._lock:
+            max_queue = self.max_queue
+            if max_queue is not None and self.active + self.queued >= self.max_workers + max_queue:
+                self.rejected += 1
+                raise ServiceUnavailable("Executor {!r} is at capacity.".format(self.name))
+            self.queued += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self.queued -= 1
+
+    def _wrap(self, func: Callable[[], Any]) -> Callable[[], Any]:
+        def worker():
+            with self._lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return func()
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+        return worker
+
+    async def run(self, func: Callable[[], Any]) -> Any:
+        """
+        Run a callable in this group and await the result.
+
+        Raises :class:`odinweb3.exceptions.ServiceUnavailable` if the queue
+        for this group is full.
+        """
+        self._acquire()
+        try:
+            future = self.executor.submit(self._wrap(func))
+        except Exception:
+            self._release()
+            raise
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Calls that have not been started are removed from the queue
+            if future.cancel():
+                self._release()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current limits and queue depth metrics of this group.
+        """
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'active': self.active,
+                'queued': self.queued,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self, wait: bool=True) -> None:
+        """
+        Shutdown the executor, a new executor is created if the group is
+        used again.
+        """
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait)
+
+
+class ProcessExecutorGroup(ExecutorGroup):
+    """
+    Named, bounded pool of worker processes for CPU bound operations.
+
+    Calls (and their results) must be picklable. As the state of a worker
+    process can not be observed, calls are counted as active once they
+    have been submitted to the pool.
+    """
+    __slots__ = ()
+
+    def _create_executor(self) -> Executor:
+        return ProcessPoolExecutor(self.max_workers)
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self.active -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    async def run(self, func: Callable[[], Any]) -> Any:
+        """
+        Run a (picklable) callable in this group and await the result.
+
+        Raises :class:`odinweb3.exceptions.ServiceUnavailable` if the queue
+        for this group is full.
+        """
+        self._acquire()
+        try:
+            future = self.executor.submit(func)
+        except Exception:
+            self._release()
+            raise
+
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        future.add_done_callback(self._done)
+        return await asyncio.wrap_future(future)
+
+
+class Executors:
+    """
+    Collection of executor groups.
+
+    Default thread and process groups are created if they are not supplied,
+    executors are only started on first use.
+    """
+    __slots__ = ('groups',)
+
+    def __init__(self, *groups: ExecutorGroup) -> None:
+        self.groups = {group.name: group for group in groups}  # type: Dict[str, ExecutorGroup]
+        if DEFAULT_EXECUTOR not in self.groups:
+            self.groups[DEFAULT_EXECUTOR] = ExecutorGroup(DEFAULT_EXECUTOR)
+        if DEFAULT_PROCESS_EXECUTOR not in self.groups:
+            self.groups[DEFAULT_PROCESS_EXECUTOR] = ProcessExecutorGroup(DEFAULT_PROCESS_EXECUTOR)
+
+    def __getitem__(self, name: Optional[str]) -> ExecutorGroup:
+        return self.groups[name or DEFAULT_EXECUTOR]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.groups
+
+    def add(self, group: ExecutorGroup) -> None:
+        """
+        Add (or replace) an executor group.
+        """
+        self.groups[group.name] = group
+
+    async def run(self, name: Optional[str], func: Callable[[], Any]) -> Any:
+        """
+        Run a callable in a named executor group.
+        """
+        return await self[name].run(func)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Metrics for each executor group.
+        """
+        return {name: group.stats() for name, group in self.groups.items()}
+
+    def shutdown(self, wait: bool=True) -> None:
+        """
+        Shutdown all executor groups.
+        """
+        for group in self.groups.values():
+            group.shutdown(wait)
+
+
+class RequestSnapshot:
+    """
+    Picklable snapshot of a request that is passed to operations run in a
+    process pool in place of the request.
+
+    The body is decoded into a string, a body that is not valid UTF-8 is
+    rejected with a Bad Request.
+    """
+    __slots__ = ('scheme', 'host', 'method', 'path', 'query', 'headers', 'cookies', 'post', 'body')
+
+    @classmethod
+    def from_request(cls, request: HttpRequestBase) -> 'RequestSnapshot':
+        body = request.body
+        if isinstance(body, bytes):
+            try:
+                body = body.decode('UTF8')
+            except UnicodeDecodeError as ude:
+                raise HttpError(Status.BAD_REQUEST, 99, "Unable to decode request body.", str(ude))
+
+        return cls(
+            request.scheme, request.host, request.method, request.path,
+            MultiValueDict(request.query), dict(request.headers.items()), dict(request.cookies.items()),
+            MultiValueDict(request.post), body,
+        )
+
+    def __init__(self, scheme: str, host: str, method: Method, path: str, query: MultiValueDict,
+                 headers: Dict[str, str], cookies: Dict[str, str], post: MultiValueDict, body: str) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.cookies = cookies
+        self.post = post
+        self.body = body
+
+    def __repr__(self):
+        return "<{} {} {}>".format(self.__class__.__name__, self.method.value.upper(), self.path)
+
+    def __getstate__(self):
+        return tuple(getattr(self, attr) for attr in self.__slots__)
+
+    def __setstate__(self, state):
+        for attr, value in zip(self.__slots__, state):
+            setattr(self, attr, value)
+
+
+def operation_reference(operation: Operation) -> Tuple[str, str]:
+    """
+    Get the module and qualified name used to import an operations callback
+    in a worker process.
+
+    Raises a :class:`ValueError` if the callback can not be imported, or if
+    the operation overrides :meth:`Operation.execute` (eg the paging of a
+    :class:`odinweb3.decorators.ListOperation`) as only the callback is
+    called by the worker process.
+    """
+    if type(operation).execute is not Operation.execute:
+        raise ValueError("{} overrides execute so can not be run by a worker process".format(operation))
+
+    callback = operation.base_callback
+    qualname = callback.__qualname__
+    if operation.is_bound or '<locals>' in qualname:
+        raise ValueError("The callback of {} can not be imported by a worker process".format(operation))
+    return callback.__module__, qualname
+
+
+@lru_cache(maxsize=None)
+def _import_callback(module_name: str, qualname: str) -> Callable:
+    obj = importlib.import_module(module_name)
+    for attr in qualname.split('.'):
+        obj = getattr(obj, attr)
+    # The name is bound to the Operation if the decorator was applied.
+    return getattr(obj, 'callback', obj)
+
+
+def call_operation(module_name: str, qualname: str, request: RequestSnapshot,
+                   path_args: Dict[str, Any]) -> Any:
+    """
+    Call an operation callback (in a worker process).
+    """
+    callback = _import_callback(module_name, qualname)
+    return callback(request, **path_args)
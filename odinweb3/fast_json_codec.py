@@ -0,0 +1,121 @@
+"""
+Fast JSON Codec
+~~~~~~~~~~~~~~~
+
+JSON codec backed by a high-performance JSON library, the first available
+of `orjson`_, `ujson`_ or `python-rapidjson`_ is used. Importing this module
+raises an :class:`ImportError` if none are installed.
+
+Resources are encoded the same as the standard JSON codec (the ``default``
+method of :class:`OdinEncoder` is used for any type not natively supported
+by the backend) and responses are generated as UTF-8 encoded bytes.
+
+The codec is registered with an API interface in place of the standard
+JSON codec eg::
+
+    >>> from odinweb3 import fast_json_codec
+    >>> class Api(ApiInterfaceBase):
+    ...     registered_codecs = {**DEFAULT_CODECS, fast_json_codec.CONTENT_TYPE: fast_json_codec}
+
+.. _orjson: https://github.com/ijl/orjson
+.. _ujson: https://github.com/ultrajson/ultrajson
+.. _python-rapidjson: https://github.com/python-rapidjson/python-rapidjson
+
+"""
+from typing import Any, Callable, Union
+
+from odin import resources
+from odin.codecs.json import codec as json_codec
+from odin.exceptions import CodecDecodeError
+
+__all__ = ('BACKEND', 'CONTENT_TYPE', 'content_type', 'ACCEPTS_BYTES', 'ENCODE_RESOURCES', 'loads', 'dumps')
+
+CONTENT_TYPE = content_type = json_codec.CONTENT_TYPE
+
+ACCEPTS_BYTES = True
+"""
+Request bodies are parsed from bytes (or a memoryview) without decoding.
+"""
+
+ENCODE_RESOURCES = True
+"""
+Resources are encoded by compiled encoders (see :mod:`odinweb3.encoders`).
+"""
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+    try:
+        import ujson
+    except ImportError:
+        ujson = None
+
+        try:
+            import rapidjson
+        except ImportError:
+            raise ImportError("The fast JSON codec requires orjson, ujson or python-rapidjson to be installed.")
+
+if orjson is not None:
+    BACKEND = 'orjson'
+
+    # Datetime values are passed to the encoder to match the standard codec
+    ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _dumps(obj: Any, default: Callable[[Any], Any]) -> bytes:
+        return orjson.dumps(obj, default=default, option=ORJSON_OPTIONS)
+
+    _loads = orjson.loads
+
+elif ujson is not None:  # pragma: no cover
+    BACKEND = 'ujson'
+
+    def _dumps(obj: Any, default: Callable[[Any], Any]) -> bytes:
+        return ujson.dumps(obj, default=default, ensure_ascii=False, escape_forward_slashes=False).encode('UTF8')
+
+    def _loads(s: Union[str, bytes, memoryview]) -> Any:
+        if not isinstance(s, (str, bytes)):
+            s = bytes(s)
+        return ujson.loads(s)
+
+else:  # pragma: no cover
+    BACKEND = 'rapidjson'
+
+    def _dumps(obj: Any, default: Callable[[Any], Any]) -> bytes:
+        return rapidjson.dumps(obj, default=default, ensure_ascii=False).encode('UTF8')
+
+    def _loads(s: Union[str, bytes, memoryview]) -> Any:
+        if not isinstance(s, (str, bytes)):
+            s = bytes(s)
+        return rapidjson.loads(s)
+
+
+_default_encoder = json_codec.OdinEncoder()
+
+
+def loads(s: Union[str, bytes, memoryview], resource: resources.ResourceBase=None, full_clean: bool=True,
+          default_to_not_supplied: bool=False):
+    """
+    Load a resource (or resources) from a JSON document, the document can
+    be UTF-8 encoded bytes.
+
+    :raises CodecDecodeError: If the document is not valid JSON.
+
+    """
+    try:
+        return resources.build_object_graph(_loads(s), resource, full_clean, False, default_to_not_supplied)
+    except (ValueError, TypeError) as ex:
+        raise CodecDecodeError(str(ex))
+
+
+def dumps(resource: Any, include_virtual_fields: bool=True, include_type_field: bool=True) -> bytes:
+    """
+    Dump a resource (or any JSON serialisable value) to a UTF-8 encoded JSON
+    document.
+    """
+    if include_virtual_fields and include_type_field:
+        encoder = _default_encoder
+    else:
+        encoder = json_codec.OdinEncoder(include_virtual_fields, include_type_field)
+    return _dumps(resource, encoder.default)
@@ -1,10 +1,14 @@
-from typing import Any, Iterable, Optional
+from time import monotonic
+from typing import Any, Dict, Iterable, Optional, Union
+from urllib.parse import unquote
+
 from odin.exceptions import CodecDecodeError, ResourceException
 
 from .bases import HttpRequestBase
 from .constants import Status
 from .data_structures import HttpResponse
-from .exceptions import HttpError
+from .encoders import encode, encodes_resources
+from .exceptions import HttpError, DeadlineExceeded
 from .typing import StringResolver, StringMap
 
 
@@ -21,6 +25,31 @@ def parse_content_type(value: str) -> str:
     return value.split(';')[0].strip()
 
 
+def parse_cookies(value: str) -> Dict[str, str]:
+    """
+    Parse a cookie header into a dict of cookie values.
+
+    >>> parse_cookies('session=abc123; theme=dark')
+    {'session': 'abc123', 'theme': 'dark'}
+
+    Malformed cookies are ignored, quoted values are unquoted.
+
+    """
+    cookies = {}
+    if value:
+        for chunk in value.split(';'):
+            name, sep, cookie = chunk.partition('=')
+            if not sep:
+                continue
+            name = name.strip()
+            if name:
+                cookie = cookie.strip()
+                if len(cookie) > 1 and cookie[0] == cookie[-1] == '"':
+                    cookie = cookie[1:-1]
+                cookies[name] = unquote(cookie)
+    return cookies
+
+
 def resolve_content_type(type_resolvers: Iterable[StringResolver], request) -> Optional[str]:
     """
     Resolve content types from a request.
@@ -31,6 +60,25 @@ def resolve_content_type(type_resolvers: Iterable[StringResolver], request) -> O
             return content_type
 
 
+def check_deadline(request: HttpRequestBase) -> None:
+    """
+    Check the deadline of a request has not passed.
+
+    :raises DeadlineExceeded: If the deadline has passed.
+
+    """
+    deadline = request.deadline
+    if deadline is not None and monotonic() >= deadline:
+        raise DeadlineExceeded()
+
+
+def _check_utf8(body: Union[bytes, memoryview]) -> None:
+    try:
+        str(body, 'UTF8')
+    except UnicodeDecodeError as ude:
+        raise HttpError(Status.BAD_REQUEST, 99, "Unable to decode request body.", str(ude))
+
+
 def get_resource(request: HttpRequestBase, resource, allow_multiple: bool=False,
                  full_clean: bool=True, default_to_not_supplied: bool=False):
     """
@@ -38,23 +86,37 @@ def get_resource(request: HttpRequestBase, resource, allow_multiple: bool=False,
 
     Note error code 98 is returned in multiple places, this is to prevent leakage of details of defined resources.
 
+    A binary body is passed directly to codecs that define ``ACCEPTS_BYTES``
+    (avoiding a decoded copy of the body), otherwise it is decoded as UTF-8.
+
     """
-    # Decode the request body.
     body = request.body
-    if isinstance(body, bytes):
-        try:
-            body = body.decode('UTF8')
-        except UnicodeDecodeError as ude:
-            raise HttpError(Status.BAD_REQUEST, 99, "Unable to decode request body.", str(ude))
+    request_codec = request.request_codec
+    if isinstance(body, (bytes, memoryview)):
+        if getattr(request_codec, 'ACCEPTS_BYTES', False):
+            # Codec parses bytes directly, avoid a decoded copy of the body.
+            binary_body = body
+        else:
+            # Decode the request body.
+            binary_body = None
+            try:
+                body = str(body, 'UTF8')
+            except UnicodeDecodeError as ude:
+                raise HttpError(Status.BAD_REQUEST, 99, "Unable to decode request body.", str(ude))
+    else:
+        binary_body = None
 
     try:
-        instance = request.request_codec.loads(body, resource=resource, full_clean=full_clean,
-                                               default_to_not_supplied=default_to_not_supplied)
+        instance = request_codec.loads(body, resource=resource, full_clean=full_clean,
+                                       default_to_not_supplied=default_to_not_supplied)
 
     except ResourceException:
         raise HttpError(Status.BAD_REQUEST, 98, "Invalid resource type.")
 
     except CodecDecodeError as cde:
+        if binary_body is not None:
+            # Report invalid UTF-8 the same as if the body had been decoded
+            _check_utf8(binary_body)
         raise HttpError(Status.BAD_REQUEST, 96, "Unable to decode body.", str(cde))
 
     # Check we have the correct resource
@@ -85,7 +147,23 @@ def create_response(request: HttpRequestBase, body: Any=None, status: Status=Non
     if body is None:
         return HttpResponse(None, status or Status.NO_CONTENT, headers)
     else:
-        body = request.response_codec.dumps(body)
-        response = HttpResponse(body, status or Status.OK, headers)
-        response.content_type = request.response_codec.CONTENT_TYPE
-        return response
+        codec = request.response_codec
+        if encodes_resources(codec):
+            # Use compiled encoders rather than per-field reflection in the codec
+            body = encode(body)
+        return encode_response(codec, body, status, headers)
+
+
+def encode_response(codec, body: Any, status: Status=None, headers: StringMap=None) -> HttpResponse:
+    """
+    Generate a HttpResponse with the body encoded by a specific codec.
+
+    :param codec: Codec used to encode the body
+    :param body: Body of the response
+    :param status: HTTP status code
+    :param headers: Any headers.
+
+    """
+    response = HttpResponse(codec.dumps(body), status or Status.OK, headers)
+    response.content_type = codec.CONTENT_TYPE
+    return response
@@ -0,0 +1,405 @@
+"""
+Limits
+~~~~~~
+
+Concurrency limits used to shed load before an operation is dispatched.
+
+A :class:`Bulkhead` limits the number of requests an operation (or all
+operations of a ``ResourceApi``) can process at the same time eg::
+
+    >>> @operation('report', max_concurrency=4, max_queue=8)
+    ... def generate_report(request):
+    ...     ...
+
+    >>> class UserApi(ResourceApi):
+    ...     resource = User
+    ...     max_concurrency = 20
+
+Requests beyond the limit (and queue) are rejected immediately with a
+503 response and a ``Retry-After`` header, an overloaded endpoint can not
+take every worker of the API.
+
+An :class:`AdaptiveLimiter` adjusts the limit of an entire API interface
+based on the measured latency of requests eg::
+
+    >>> api = ApiInterfaceBase(
+    ...     ApiVersion(user_api),
+    ...     limiter=AdaptiveLimiter(initial_limit=50),
+    ... )
+
+Each operation compares the latency of its requests with its own
+baseline (see :meth:`AdaptiveLimiter.bind`) so a slow operation does not
+reduce the limit simply by being slower than the others.
+
+Limiters are acquired before an operation is dispatched; ``acquire``
+returns a token that is passed to ``release`` once the operation has been
+dispatched. Requests waiting in the queue of a bulkhead give up once the
+deadline of the request passes (with a 504 response).
+
+"""
+import asyncio
+import threading
+
+from collections import deque
+from time import monotonic
+from typing import Any, Deque, Dict, List, Optional, Sequence
+
+from .exceptions import DeadlineExceeded, ServiceUnavailable
+
+__all__ = ('Bulkhead', 'AdaptiveLimiter', 'BoundLimiter', 'acquire_all', 'acquire_all_async', 'release_all')
+
+
+class Bulkhead:
+    """
+    Limit on the number of concurrent requests.
+
+    Supports both threaded (:meth:`acquire`) and asyncio
+    (:meth:`acquire_async`) dispatching, a single bulkhead should only be
+    used by one or the other.
+
+    :param max_concurrency: Maximum number of requests processed at once.
+    :param max_queue: Maximum number of requests waiting for a slot, once
+        full requests are rejected.
+    :param retry_after: Value (in seconds) of the ``Retry-After`` header
+        of a rejected request.
+
+    """
+    __slots__ = (
+        'max_concurrency', 'max_queue', 'retry_after',
+        'active', 'queued', 'rejected', '_condition', '_waiters',
+    )
+
+    def __init__(self, max_concurrency: int, max_queue: int=0, retry_after: int=1) -> None:
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be greater than 0")
+        if max_queue < 0:
+            raise ValueError("max_queue must be 0 or greater")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+
+        # Metrics
+        self.active = 0
+        self.queued = 0
+        self.rejected = 0
+
+        self._condition = threading.Condition()
+        self._waiters = deque()  # type: Deque[asyncio.Future]
+
+    def __repr__(self):
+        return "<{} {}/{}>".format(self.__class__.__name__, self.active, self.max_concurrency)
+
+    def _reject(self) -> None:
+        self.rejected += 1
+        raise ServiceUnavailable("Concurrency limit reached.", self.retry_after)
+
+    def acquire(self, timeout: float=None) -> None:
+        """
+        Acquire a slot, waiting (in the queue) for a slot to be released if
+        required.
+
+        :param timeout: Maximum time (in seconds) to wait for a slot.
+        :raises ServiceUnavailable: If the limit and queue are full.
+        :raises DeadlineExceeded: If a slot is not released within the timeout.
+
+        """
+        with self._condition:
+            if self.active < self.max_concurrency:
+                self.active += 1
+                return
+
+            if self.queued >= self.max_queue:
+                self._reject()
+
+            self.queued += 1
+            try:
+                if not self._condition.wait_for(lambda: self.active < self.max_concurrency, timeout):
+                    raise DeadlineExceeded()
+            finally:
+                self.queued -= 1
+            self.active += 1
+
+    async def acquire_async(self, timeout: float=None) -> None:
+        """
+        Acquire a slot, waiting (in the queue) for a slot to be released if
+        required.
+
+        :param timeout: Maximum time (in seconds) to wait for a slot.
+        :raises ServiceUnavailable: If the limit and queue are full.
+        :raises DeadlineExceeded: If a slot is not released within the timeout.
+
+        """
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject()
+
+        waiter = asyncio.get_event_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        try:
+            # The slot of the releasing request is handed to this waiter
+            if timeout is None:
+                await waiter
+            else:
+                await asyncio.wait_for(waiter, timeout)
+        except (asyncio.CancelledError, asyncio.TimeoutError) as ex:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed over before cancellation, pass it on
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            if isinstance(ex, asyncio.TimeoutError):
+                raise DeadlineExceeded()
+            raise
+        finally:
+            self.queued -= 1
+
+    def release(self, token: Any=None) -> None:
+        """
+        Release a slot.
+        """
+        with self._condition:
+            waiters = self._waiters
+            while waiters:
+                waiter = waiters.popleft()
+                if not waiter.done():
+                    waiter.set_result(None)
+                    return
+
+            self.active -= 1
+            self._condition.notify()
+
+
+class AdaptiveLimiter:
+    """
+    Limit on the number of concurrent requests that adapts to the measured
+    latency of requests using an AIMD (additive increase, multiplicative
+    decrease) algorithm.
+
+    The latency of each request is compared with a moving average of
+    previous requests (to the same operation when bound, see :meth:`bind`).
+    If a request takes longer than ``tolerance`` times the average the limit
+    is reduced by ``backoff_ratio``, at most once per ``window``. Otherwise,
+    while the limit is being utilised, it is increased by one. Requests
+    beyond the limit are rejected immediately (there is no queue).
+
+    :param initial_limit: Starting limit.
+    :param min_limit: Lowest value the limit can be reduced to.
+    :param max_limit: Highest value the limit can be increased to.
+    :param backoff_ratio: Ratio the limit is multiplied by when latency
+        exceeds the tolerance.
+    :param tolerance: Multiple of the average latency that is tolerated.
+    :param smoothing: Weight of each new sample in the moving average.
+    :param retry_after: Value (in seconds) of the ``Retry-After`` header
+        of a rejected request.
+    :param window: Minimum time (in seconds) between decreases of the limit;
+        requests slowed by the same event only reduce the limit once.
+
+    """
+    __slots__ = (
+        'min_limit', 'max_limit', 'backoff_ratio', 'tolerance', 'smoothing', 'retry_after', 'window',
+        'limit', 'in_flight', 'rejected', 'average_latency', '_decreased_at', '_lock',
+    )
+
+    def __init__(self, initial_limit: int=20, min_limit: int=1, max_limit: int=1000,
+                 backoff_ratio: float=0.9, tolerance: float=2.0, smoothing: float=0.05,
+                 retry_after: int=1, window: float=1.0) -> None:
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("Limits must satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff_ratio < 1:
+            raise ValueError("backoff_ratio must be between 0 and 1")
+        if tolerance <= 1:
+            raise ValueError("tolerance must be greater than 1")
+        if not 0 < smoothing <= 1:
+            raise ValueError("smoothing must be greater than 0 and no more than 1")
+        if window < 0:
+            raise ValueError("window must not be negative")
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff_ratio = backoff_ratio
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.retry_after = retry_after
+        self.window = window
+
+        self.limit = float(initial_limit)
+        self.in_flight = 0
+        self.rejected = 0
+        self.average_latency = None  # type: Optional[float]
+        self._decreased_at = None  # type: Optional[float]
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return "<{} {}/{}>".format(self.__class__.__name__, self.in_flight, int(self.limit))
+
+    def acquire(self, timeout: float=None) -> float:
+        """
+        Acquire a slot, returns the start time used to measure the latency
+        of the request.
+
+        :param timeout: Ignored, requests are not queued.
+        :raises ServiceUnavailable: If the limit has been reached.
+
+        """
+        with self._lock:
+            if self.in_flight >= int(self.limit):
+                self.rejected += 1
+                raise ServiceUnavailable("Adaptive concurrency limit reached.", self.retry_after)
+            self.in_flight += 1
+        return monotonic()
+
+    async def acquire_async(self, timeout: float=None) -> float:
+        """
+        Acquire a slot, returns the start time used to measure the latency
+        of the request.
+
+        :param timeout: Ignored, requests are not queued.
+        :raises ServiceUnavailable: If the limit has been reached.
+
+        """
+        return self.acquire()
+
+    def release(self, token: float=None, baseline: 'BoundLimiter'=None) -> None:
+        """
+        Release a slot and update the limit from the latency of the request.
+
+        :param token: Start time returned by acquire.
+        :param baseline: Bound limiter holding the latency baseline of the
+            operation; defaults to the baseline of this limiter.
+
+        """
+        with self._lock:
+            in_flight = self.in_flight
+            self.in_flight = in_flight - 1
+            if token is not None:
+                self.update(monotonic() - token, in_flight, baseline)
+
+    def update(self, latency: float, in_flight: int, baseline: 'BoundLimiter'=None) -> None:
+        """
+        Update the limit from a latency sample.
+
+        :param latency: Latency (in seconds) of a request.
+        :param in_flight: Number of requests in flight when the request
+            completed.
+        :param baseline: Bound limiter holding the latency baseline of the
+            operation; defaults to the baseline of this limiter.
+
+        """
+        baseline = baseline or self
+        average = baseline.average_latency
+        if average is None:
+            baseline.average_latency = latency
+            return
+
+        limit = self.limit
+        if latency > average * self.tolerance:
+            now = monotonic()
+            decreased_at = self._decreased_at
+            if decreased_at is None or now - decreased_at >= self.window:
+                limit = max(self.min_limit, limit * self.backoff_ratio)
+                self._decreased_at = now
+        elif in_flight * 2 >= limit:
+            # Only increase the limit while it is being utilised
+            limit = min(self.max_limit, limit + 1)
+        self.limit = limit
+
+        baseline.average_latency = average + self.smoothing * (latency - average)
+
+    def bind(self) -> 'BoundLimiter':
+        """
+        Limiter sharing the limit of this limiter with its own latency
+        baseline, used to limit a single operation.
+        """
+        return BoundLimiter(self)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Current limit and metrics.
+        """
+        return {
+            'limit': int(self.limit),
+            'in_flight': self.in_flight,
+            'rejected': self.rejected,
+            'average_latency': self.average_latency,
+        }
+
+
+class BoundLimiter:
+    """
+    An :class:`AdaptiveLimiter` bound to a single operation.
+
+    Slots are acquired from (and the limit updated on) the adaptive limiter,
+    the latency of requests is compared with a moving average of previous
+    requests to the same operation.
+    """
+    __slots__ = ('limiter', 'average_latency')
+
+    def __init__(self, limiter: AdaptiveLimiter) -> None:
+        self.limiter = limiter
+        self.average_latency = None  # type: Optional[float]
+
+    def __repr__(self):
+        return "<{} {!r}>".format(self.__class__.__name__, self.limiter)
+
+    def acquire(self, timeout: float=None) -> float:
+        return self.limiter.acquire()
+
+    async def acquire_async(self, timeout: float=None) -> float:
+        return self.limiter.acquire()
+
+    def release(self, token: float=None) -> None:
+        self.limiter.release(token, self)
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else deadline - monotonic()
+
+
+def acquire_all(limiters: Sequence[Any], deadline: float=None) -> List[Any]:
+    """
+    Acquire a slot from each limiter, if any limiter is full (or the
+    deadline passes while waiting for a slot) any slots already acquired
+    are released.
+
+    Returns the tokens to pass to :func:`release_all`.
+    """
+    tokens = []
+    for limiter in limiters:
+        try:
+            tokens.append(limiter.acquire(_remaining(deadline)))
+        except Exception:
+            release_all(limiters, tokens)
+            raise
+    return tokens
+
+
+async def acquire_all_async(limiters: Sequence[Any], deadline: float=None) -> List[Any]:
+    """
+    Acquire a slot from each limiter, if any limiter is full (or the
+    deadline passes while waiting for a slot) any slots already acquired
+    are released.
+
+    Returns the tokens to pass to :func:`release_all`.
+    """
+    tokens = []
+    for limiter in limiters:
+        try:
+            tokens.append(await limiter.acquire_async(_remaining(deadline)))
+        except BaseException:
+            release_all(limiters, tokens)
+            raise
+    return tokens
+
+
+def release_all(limiters: Sequence[Any], tokens: Sequence[Any]) -> None:
+    """
+    Release the slots of each limiter (in reverse order); only as many
+    limiters as there are tokens are released.
+    """
+    for limiter, token in reversed(list(zip(limiters, tokens))):
+        limiter.release(token)
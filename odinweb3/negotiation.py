@@ -0,0 +1,270 @@
+"""
+Negotiation
+~~~~~~~~~~~
+
+Content negotiation, selecting the content type of a response from an
+``Accept`` header (:rfc:`7231#section-5.3.2`).
+
+An ``Accept`` header is a list of media ranges with optional quality
+values eg::
+
+    text/html, application/json;q=0.9, */*;q=0.1
+
+Each available content type is given the quality of the most specific
+media range that matches it, the available content type with the highest
+(non zero) quality is selected. Ties are resolved by the order of the
+available content types (ie the preference of the server).
+
+Operations can declare the content types they consume and produce eg::
+
+    >>> @operation('report', consumes='application/json', produces=('application/json', 'text/csv'))
+    ... def generate_report(request):
+    ...     ...
+
+The API interface builds a :class:`CodecTable` for each operation that
+maps the resolved request and response type values to codecs.
+
+"""
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import takewhile
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .helpers import parse_content_type
+from .typing import StringResolver
+
+__all__ = ('parse_accept', 'best_match', 'is_excluded', 'available_codecs', 'CodecTable')
+
+MediaRange = Tuple[str, str, float]
+
+
+def parse_accept(value: str) -> List[MediaRange]:
+    """
+    Parse an accept header into a list of media ranges (type, subtype and
+    quality). Invalid media ranges are ignored.
+
+    >>> parse_accept('text/html, application/*;q=0.5')
+    [('text', 'html', 1.0), ('application', '*', 0.5)]
+
+    """
+    media_ranges = []
+    for item in value.split(','):
+        media_type, *params = item.split(';')
+        main_type, _, sub_type = media_type.strip().lower().partition('/')
+        if not main_type or not sub_type or (main_type == '*' and sub_type != '*'):
+            continue
+
+        quality = 1.0
+        for param in params:
+            name, _, param_value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(param_value)
+                except ValueError:
+                    quality = -1.0
+                break
+        if 0 <= quality <= 1:
+            media_ranges.append((main_type, sub_type, quality))
+
+    return media_ranges
+
+
+def _match(media_ranges: Sequence[MediaRange], content_type: str) -> Optional[float]:
+    """
+    Quality of the most specific media range that matches a content type,
+    ``None`` if no media range matches.
+    """
+    main_type, _, sub_type = content_type.lower().partition('/')
+    quality = None
+    specificity = -1
+    for range_type, range_sub_type, range_quality in media_ranges:
+        if range_type == main_type:
+            if range_sub_type == sub_type:
+                return range_quality
+            if range_sub_type == '*' and specificity < 1:
+                quality, specificity = range_quality, 1
+        elif range_type == '*' and specificity < 0:
+            quality, specificity = range_quality, 0
+    return quality
+
+
+def _quality(media_ranges: Sequence[MediaRange], content_type: str) -> float:
+    """
+    Quality of the most specific media range that matches a content type.
+    """
+    return _match(media_ranges, content_type) or 0.0
+
+
+def is_excluded(value: Optional[str], content_type: str) -> bool:
+    """
+    A content type is explicitly excluded by an accept header (the most
+    specific media range that matches has a quality of 0).
+
+    >>> is_excluded('application/json;q=0, */*', 'application/json')
+    True
+
+    """
+    return bool(value) and _match(parse_accept(value), content_type) == 0
+
+
+def best_match(value: str, available: Sequence[str]) -> Optional[str]:
+    """
+    Select the best available content type for an accept header.
+
+    If no available content type is acceptable the most preferred content
+    type of the header is returned (so a *Not Acceptable* response can be
+    generated); ``None`` is returned for an empty or invalid header.
+
+    >>> best_match('text/html;q=0.5, application/*', ['text/html', 'application/json'])
+    'application/json'
+
+    """
+    if not value:
+        return None
+
+    media_ranges = parse_accept(value)
+    if not media_ranges:
+        return None
+
+    best, best_quality = None, 0.0
+    for content_type in available:
+        quality = _quality(media_ranges, content_type)
+        if quality > best_quality:
+            best, best_quality = content_type, quality
+
+    if best is None:
+        # Nothing acceptable; fall back to the most preferred concrete type
+        main_type, sub_type, _ = max(media_ranges, key=lambda r: r[2])
+        best = '{}/{}'.format(main_type, sub_type)
+    return best
+
+
+def available_codecs(registered_codecs: Mapping[str, Any], content_types: Sequence[str]=None) -> Dict[str, Any]:
+    """
+    Codecs available for a set of content types (defaults to all registered
+    codecs) in order of preference.
+
+    :raises ValueError: If a content type does not have a registered codec.
+
+    """
+    codecs = OrderedDict()
+    for content_type in content_types or registered_codecs:
+        try:
+            codecs[content_type] = registered_codecs[content_type]
+        except KeyError:
+            raise ValueError("No codec registered for content type {!r}".format(content_type))
+    return codecs
+
+
+def _default_type(resolvers: Sequence[StringResolver], codecs: Mapping[str, Any]) -> Optional[str]:
+    """
+    Default content type from the resolvers, or the preferred codec if the
+    default is not available.
+    """
+    for resolver in resolvers:
+        default_type = getattr(resolver, 'default_type', None)
+        if default_type in codecs:
+            return default_type
+    return next(iter(codecs), None)
+
+
+def _resolve_value(resolvers: Sequence[StringResolver], request) -> Optional[str]:
+    for resolver in resolvers:
+        value = resolver(request)
+        if value:
+            return value
+
+
+class CodecTable:
+    """
+    Lookup table of the request and response codecs of an operation.
+
+    The values of the request and response type resolvers (up to any
+    default resolver) are resolved into a pair of codecs, results are
+    memoized so a request with previously seen values (eg the same
+    content-type and accept headers) is a single dictionary lookup.
+
+    A codec of ``None`` indicates the content type is not supported.
+
+    Remapped content types (eg ``text/plain`` commonly used in place of
+    ``application/json``) are not negotiated, a resolved type without a
+    codec is replaced by its remapped type (unless the remapped type is
+    excluded by the accept header).
+
+    :param request_codecs: Codecs for decoding requests (see :func:`available_codecs`).
+    :param response_codecs: Codecs for encoding responses.
+    :param request_type_resolvers: Resolvers of the request type.
+    :param response_type_resolvers: Resolvers of the response type.
+    :param request_type: Default request type; defaults to that of the
+        resolvers.
+    :param response_type: Default response type; defaults to that of the
+        resolvers.
+    :param skip_single: Skip negotiation if there is only a single codec
+        for both requests and responses.
+    :param maxsize: Maximum number of values to memoize.
+    :param remap_codecs: Content types remapped to the content type of a
+        codec.
+
+    """
+    __slots__ = (
+        'request_codecs', 'response_codecs', 'request_type_resolvers', 'response_type_resolvers',
+        'request_type', 'response_type', 'remap_codecs', 'single', '_lookup',
+    )
+
+    def __init__(self, request_codecs: Mapping[str, Any], response_codecs: Mapping[str, Any],
+                 request_type_resolvers: Sequence[StringResolver], response_type_resolvers: Sequence[StringResolver],
+                 request_type: str=None, response_type: str=None, skip_single: bool=False, maxsize: int=256,
+                 remap_codecs: Mapping[str, str]=None) -> None:
+        self.request_codecs = request_codecs
+        self.response_codecs = response_codecs
+        self.remap_codecs = remap_codecs or {}
+
+        # Values of default resolvers are replaced by the default type
+        def is_resolver(r):
+            return not hasattr(r, 'default_type')
+        self.request_type_resolvers = tuple(takewhile(is_resolver, request_type_resolvers))
+        self.response_type_resolvers = tuple(takewhile(is_resolver, response_type_resolvers))
+        self.request_type = request_type or _default_type(request_type_resolvers, request_codecs)
+        self.response_type = response_type or _default_type(response_type_resolvers, response_codecs)
+
+        self.single = None  # type: Optional[Tuple[Any, Any]]
+        if skip_single and len(set(request_codecs.values())) == len(set(response_codecs.values())) == 1:
+            self.single = self.request_codecs[self.request_type], self.response_codecs[self.response_type]
+
+        self._lookup = lru_cache(maxsize=maxsize)(self.lookup)
+
+    def __call__(self, request) -> Tuple[Any, Any]:
+        """
+        Request and response codecs of a request.
+        """
+        if self.single:
+            return self.single
+        return self._lookup(
+            _resolve_value(self.request_type_resolvers, request),
+            _resolve_value(self.response_type_resolvers, request),
+        )
+
+    def lookup(self, request_value: Optional[str], response_value: Optional[str]) -> Tuple[Any, Any]:
+        """
+        Request and response codecs of resolved request and response type
+        values (eg the content-type and accept headers).
+        """
+        remap_codecs = self.remap_codecs
+
+        request_type = parse_content_type(request_value) or self.request_type
+        if request_type not in self.request_codecs:
+            request_type = remap_codecs.get(request_type, request_type)
+
+        response_type = best_match(response_value, self.response_codecs) or self.response_type
+        if response_type not in self.response_codecs:
+            remapped_type = remap_codecs.get(response_type)
+            if remapped_type and not is_excluded(response_value, remapped_type):
+                response_type = remapped_type
+
+        return self.request_codecs.get(request_type), self.response_codecs.get(response_type)
+
+    def cache_info(self):
+        """
+        Statistics of the memoized results (see :func:`functools.lru_cache`).
+        """
+        return self._lookup.cache_info()
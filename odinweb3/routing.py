@@ -0,0 +1,349 @@
+"""
+Routing
+~~~~~~~
+
+Compiled router that resolves a request method and path into an operation.
+
+Paths are compiled into a tree of path segments once, resolving a request
+then only requires a single walk of the tree (proportional to the depth of
+the path rather than the number of routes).
+
+"""
+import re
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from .constants import Method, DataType, Status
+from .data_structures import UrlPath, PathParam, HttpResponse
+
+__all__ = ('compile_converter', 'dump_path', 'load_path', 'UrlTemplate', 'RouteNode', 'Router')
+
+Converter = Callable[[str], Any]
+
+INTEGER_RE = re.compile(r'[-+]?\d+')
+NUMBER_RE = re.compile(r'[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?')
+
+BOOLEAN_VALUES = {
+    'true': True, '1': True, 'yes': True, 'y': True, 'on': True,
+    'false': False, '0': False, 'no': False, 'n': False, 'off': False,
+}
+
+
+def _to_integer(value: str) -> int:
+    if INTEGER_RE.fullmatch(value):
+        return int(value)
+    raise ValueError("Invalid integer value: {!r}".format(value))
+
+
+def _to_number(value: str) -> float:
+    if NUMBER_RE.fullmatch(value):
+        return float(value)
+    raise ValueError("Invalid number value: {!r}".format(value))
+
+
+def _to_string(value: str) -> str:
+    return value
+
+
+def _to_boolean(value: str) -> bool:
+    try:
+        return BOOLEAN_VALUES[value.lower()]
+    except KeyError:
+        raise ValueError("Invalid boolean value: {!r}".format(value))
+
+
+PATH_PARAM_CONVERTERS = {
+    DataType.Integer: _to_integer,
+    DataType.Number: _to_number,
+    DataType.String: _to_string,
+    DataType.Boolean: _to_boolean,
+}
+"""
+Converters from a path segment into the Python type of a path parameter.
+"""
+
+
+def compile_converter(param: PathParam) -> Converter:
+    """
+    Compile a path parameter into a converter that validates a path segment
+    and converts it into the parameters type.
+
+    The converter raises a :class:`ValueError` if the value is not valid.
+    """
+    try:
+        converter = PATH_PARAM_CONVERTERS[param.type]
+    except KeyError:
+        raise ValueError("Unsupported path param type `{}` for: {}".format(param.type, param.name))
+
+    if not param.type_args:
+        return converter
+
+    match = re.compile(param.type_args).fullmatch
+
+    def regex_converter(value: str) -> Any:
+        if match(value) is None:
+            raise ValueError("Value {!r} does not match: {}".format(value, param.type_args))
+        return converter(value)
+    return regex_converter
+
+
+def dump_path(url_path: UrlPath) -> List[Any]:
+    """
+    Dump a URL path into a list of JSON serialisable nodes. Path params are
+    stored as a ``[name, type, type_args]`` list.
+    """
+    return [
+        [node.name, node.type.name, node.type_args] if isinstance(node, PathParam) else node
+        for node in url_path._nodes  # pylint:disable=protected-access
+    ]
+
+
+def load_path(nodes: Iterable[Any]) -> UrlPath:
+    """
+    Load a URL path from a list of nodes generated by :func:`dump_path`.
+    """
+    return UrlPath(*(
+        node if isinstance(node, str) else PathParam(node[0], DataType[node[1]], node[2])
+        for node in nodes
+    ))
+
+
+def _format_value(value: Any) -> str:
+    return quote(str(value), safe='')
+
+
+def _format_boolean(value: Any) -> str:
+    return 'true' if value else 'false'
+
+
+PATH_PARAM_FORMATTERS = {
+    DataType.Boolean: _format_boolean,
+}
+"""
+Formatters from a Python value into a path segment, types not defined use
+a URL quoted string of the value.
+"""
+
+
+class UrlTemplate:
+    """
+    URL path precompiled into literal and parameter segments for building
+    URLs. eg::
+
+        >>> template = UrlTemplate(UrlPath.parse('/api/user/{resource_id}'))
+        >>> template.format(resource_id=1)
+        '/api/user/1'
+
+    """
+    __slots__ = ('url_path', 'literals', 'params')
+
+    def __init__(self, url_path: UrlPath) -> None:
+        self.url_path = url_path
+
+        nodes = url_path._nodes  # pylint:disable=protected-access
+        if nodes == ('',):
+            nodes = ('', '')
+
+        literals = []
+        params = []
+        literal = ''
+        for idx, node in enumerate(nodes):
+            if idx:
+                literal += '/'
+            if isinstance(node, PathParam):
+                literals.append(literal)
+                params.append((node.name, PATH_PARAM_FORMATTERS.get(node.type, _format_value)))
+                literal = ''
+            else:
+                literal += node
+        literals.append(literal)
+
+        self.literals = tuple(literals)
+        self.params = tuple(params)
+
+    def __repr__(self):
+        return "<{} {}>".format(self.__class__.__name__, self.url_path)
+
+    def format(self, **path_args: Any) -> str:
+        """
+        Build a URL from path arguments.
+
+        Raises a :class:`KeyError` if a path argument is not supplied.
+        """
+        literals = self.literals
+        if not self.params:
+            return literals[0]
+
+        parts = [literals[0]]
+        for (name, formatter), literal in zip(self.params, literals[1:]):
+            parts.append(formatter(path_args[name]))
+            parts.append(literal)
+        return ''.join(parts)
+
+
+class RouteNode:
+    """
+    Node within the routing tree.
+
+    Each node represents a single path segment, static segments are stored
+    in a dict keyed by the segment value, path parameters are stored in the
+    order they were added.
+    """
+    __slots__ = (
+        'static', 'params', 'operations', 'url_path',
+        'allow', 'options_response', 'not_allowed_response',
+    )
+
+    def __init__(self) -> None:
+        self.static = {}  # type: Dict[str, RouteNode]
+        self.params = []  # type: List[Tuple[PathParam, Converter, RouteNode]]
+        self.operations = {}  # type: Dict[Method, Any]
+        self.url_path = None  # type: Optional[UrlPath]
+
+        # Precomputed responses
+        self.allow = None  # type: Optional[str]
+        self.options_response = None  # type: Optional[HttpResponse]
+        self.not_allowed_response = None  # type: Optional[HttpResponse]
+
+    def __repr__(self):
+        return "<{} {}>".format(self.__class__.__name__, self.url_path)
+
+    def prepare_responses(self, options: bool) -> None:
+        """
+        Precompute the allowed methods header and the responses for OPTIONS
+        and method not allowed requests.
+
+        :param options: Generate OPTIONS responses for paths that do not
+            define an OPTIONS operation.
+
+        """
+        methods = list(self.operations)
+        generate_options = options and Method.Options not in self.operations
+        if generate_options:
+            methods.append(Method.Options)
+        self.allow = allow = ', '.join(m.value.upper() for m in methods)
+
+        self.options_response = HttpResponse(None, Status.NO_CONTENT, {'Allow': allow}) if generate_options else None
+        self.not_allowed_response = HttpResponse.from_status(Status.METHOD_NOT_ALLOWED, {'Allow': allow})
+
+    def child(self, node) -> 'RouteNode':
+        """
+        Get (or create) the child node for a path node.
+        """
+        if isinstance(node, PathParam):
+            for param, _, child in self.params:
+                if param == node:
+                    return child
+            child = RouteNode()
+            self.params.append((node, compile_converter(node), child))
+            return child
+
+        try:
+            return self.static[node]
+        except KeyError:
+            child = self.static[node] = RouteNode()
+            return child
+
+
+class Router:
+    """
+    Router that resolves a method and path into an operation and path
+    arguments. eg::
+
+        >>> router = Router(api.operation_items())
+        >>> operation, path_args = router.resolve(Method.Get, '/api/v1/user/1')
+
+    Static path segments take priority over path parameters. Path parameters
+    are converted into their declared type while routing, a segment that
+    cannot be converted does not match.
+
+    :param operation_items: Path and operation pairs to add to the router.
+    :param options: Respond to OPTIONS requests for paths that do not
+        define an OPTIONS operation.
+
+    """
+    __slots__ = ('root', 'options')
+
+    def __init__(self, operation_items: Iterable[Tuple[UrlPath, Any]]=None, options: bool=True) -> None:
+        self.root = RouteNode()
+        self.options = options
+        if operation_items:
+            for url_path, operation in operation_items:
+                self.add(url_path, operation)
+
+    def add(self, url_path: UrlPath, operation) -> RouteNode:
+        """
+        Add an operation into the routing tree.
+        """
+        node = self.root
+        for path_node in url_path._nodes:  # pylint:disable=protected-access
+            node = node.child(path_node)
+
+        node.url_path = url_path
+        for method in operation.methods:
+            node.operations[method] = operation
+        node.prepare_responses(self.options)
+        return node
+
+    def match(self, path: str) -> Optional[Tuple[RouteNode, Dict[str, Any]]]:
+        """
+        Match a path to a node in the routing tree.
+
+        Returns a tuple of the node and path arguments or ``None`` if the
+        path could not be matched.
+        """
+        segments = path.rstrip('/').split('/')
+        path_args = {}
+        node = self._match(self.root, segments, 0, path_args)
+        if node is not None:
+            return node, path_args
+
+    def _match(self, node: RouteNode, segments: List[str], idx: int,
+               path_args: Dict[str, Any]) -> Optional[RouteNode]:
+        if idx == len(segments):
+            return node if node.operations else None
+
+        segment = segments[idx]
+
+        child = node.static.get(segment)
+        if child is not None:
+            result = self._match(child, segments, idx + 1, path_args)
+            if result is not None:
+                return result
+
+        if segment:
+            for param, converter, child in node.params:
+                try:
+                    value = converter(segment)
+                except ValueError:
+                    continue
+                result = self._match(child, segments, idx + 1, path_args)
+                if result is not None:
+                    path_args[param.name] = value
+                    return result
+
+    def resolve(self, method: Method, path: str) -> Optional[Tuple[Any, Dict[str, Any]]]:
+        """
+        Resolve a method and path into an operation and the path arguments.
+
+        Returns ``None`` if no operation could be resolved.
+        """
+        match = self.match(path)
+        if match is not None:
+            node, path_args = match
+            operation = node.operations.get(method)
+            if operation is not None:
+                return operation, path_args
+
+    def nodes(self) -> Iterable[RouteNode]:
+        """
+        Iterate all nodes (depth first) that have operations assigned.
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if node.operations:
+                yield node
+            stack.extend(child for _, _, child in reversed(node.params))
+            stack.extend(reversed(list(node.static.values())))
@@ -5,7 +5,7 @@ Testing Helpers
 Collection of Mocks and Tools for testing APIs.
 
 """
-from collections import MutableMapping
+from collections.abc import MutableMapping
 from typing import AnyStr, Union
 
 from odin.codecs import json_codec
@@ -47,6 +47,8 @@ class MockRequest(HttpRequestBase):
         self._body = body
         self._request_codec = request_codec or json_codec
         self._response_codec = response_codec or json_codec
+        self._current_operation = None
+        self._deadline = None
 
     @lazy_property
     def scheme(self):
@@ -68,6 +70,10 @@ class MockRequest(HttpRequestBase):
     def headers(self):
         return MultiValueDict(self._headers or {})
 
+    @lazy_property
+    def cookies(self):
+        return {}
+
     @lazy_property
     def method(self):
         return self._method
@@ -0,0 +1,183 @@
+"""
+WSGI
+~~~~
+
+WSGI application adapter allowing an API interface to be served directly
+by a WSGI server (eg gunicorn, uWSGI, waitress) without a framework. eg::
+
+    >>> api = ApiInterfaceBase(
+    ...     ApiVersion(user_api),
+    ...     path_prefix='/api',
+    ... )
+    >>> application = WsgiApplication(api)
+
+"""
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+from urllib.parse import parse_qsl
+
+from .bases import HttpRequestBase
+from .constants import Method, Status
+from .containers import ApiInterfaceBase
+from .data_structures import HttpResponse, MultiValueDict
+from .helpers import parse_content_type, parse_cookies
+
+__all__ = ('WsgiRequest', 'WsgiApplication')
+
+Environ = Dict[str, Any]
+StartResponse = Callable[[str, List[Tuple[str, str]]], Any]
+
+FORM_CONTENT_TYPE = 'application/x-www-form-urlencoded'
+
+# Headers that are not prefixed with HTTP_ in the WSGI environ
+UNPREFIXED_HEADERS = {
+    'CONTENT_TYPE': 'content-type',
+    'CONTENT_LENGTH': 'content-length',
+}
+
+
+class WsgiRequest(HttpRequestBase):
+    """
+    Request proxy for a WSGI environ.
+
+    Values are only parsed from the environ on first access and cached, a
+    request that never reads the body or query does not pay to parse them.
+    """
+    __slots__ = ('environ', '_method', '_query', '_headers', '_cookies', '_post', '_body')
+
+    def __init__(self, environ: Environ) -> None:
+        super().__init__()
+        self.environ = environ
+        self._method = None
+        self._query = None
+        self._headers = None
+        self._cookies = None
+        self._post = None
+        self._body = None
+
+    @property
+    def scheme(self) -> str:
+        return self.environ.get('wsgi.url_scheme', 'http')
+
+    @property
+    def host(self) -> str:
+        environ = self.environ
+        host = environ.get('HTTP_HOST')
+        if host:
+            return host
+        return '{}:{}'.format(environ.get('SERVER_NAME', ''), environ.get('SERVER_PORT', ''))
+
+    @property
+    def method(self) -> Method:
+        method = self._method
+        if method is None:
+            method = self._method = Method(self.environ['REQUEST_METHOD'].lower())
+        return method
+
+    @property
+    def path(self) -> str:
+        environ = self.environ
+        return environ.get('SCRIPT_NAME', '') + environ.get('PATH_INFO', '')
+
+    @property
+    def query(self) -> MultiValueDict:
+        query = self._query
+        if query is None:
+            query_string = self.environ.get('QUERY_STRING')
+            query = self._query = MultiValueDict(
+                parse_qsl(query_string, keep_blank_values=True) if query_string else None
+            )
+        return query
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        headers = self._headers
+        if headers is None:
+            headers = self._headers = {}
+            for key, value in self.environ.items():
+                if key.startswith('HTTP_'):
+                    headers[key[5:].replace('_', '-').lower()] = value
+                elif key in UNPREFIXED_HEADERS and value:
+                    headers[UNPREFIXED_HEADERS[key]] = value
+        return headers
+
+    @property
+    def cookies(self) -> Dict[str, str]:
+        cookies = self._cookies
+        if cookies is None:
+            cookies = self._cookies = parse_cookies(self.environ.get('HTTP_COOKIE'))
+        return cookies
+
+    @property
+    def post(self) -> MultiValueDict:
+        post = self._post
+        if post is None:
+            if parse_content_type(self.environ.get('CONTENT_TYPE')) == FORM_CONTENT_TYPE:
+                post = MultiValueDict(parse_qsl(self.body.decode('latin-1'), keep_blank_values=True))
+            else:
+                post = MultiValueDict()
+            self._post = post
+        return post
+
+    @property
+    def body(self) -> bytes:
+        body = self._body
+        if body is None:
+            try:
+                content_length = int(self.environ.get('CONTENT_LENGTH') or 0)
+            except ValueError:
+                content_length = 0
+            body = self._body = self.environ['wsgi.input'].read(content_length) if content_length > 0 else b''
+        return body
+
+
+def response_status(status: int) -> str:
+    """
+    Generate a WSGI status line from a status code.
+    """
+    try:
+        return '{} {}'.format(status, Status(status).phrase)
+    except ValueError:
+        return str(status)
+
+
+class WsgiApplication:
+    """
+    WSGI application that dispatches requests to an API interface.
+
+    :param api_interface: The API interface to dispatch requests to.
+
+    """
+    __slots__ = ('api_interface',)
+
+    request_class = WsgiRequest
+
+    def __init__(self, api_interface: ApiInterfaceBase) -> None:
+        self.api_interface = api_interface
+
+    def __repr__(self):
+        return "<{} {!r}>".format(self.__class__.__name__, self.api_interface)
+
+    def __call__(self, environ: Environ, start_response: StartResponse) -> Iterable[bytes]:
+        request = self.request_class(environ)
+        try:
+            method = request.method
+        except ValueError:
+            # Not a method known to the API (eg PROPFIND)
+            method, response = None, self.api_interface.canned_response('not_implemented')
+        else:
+            response = self.api_interface.dispatch_request(request)  # type: HttpResponse
+
+        body = response.body
+        if body is None:
+            body = b''
+        elif isinstance(body, str):
+            body = body.encode('UTF8')
+
+        headers = [(name, str(value)) for name, value in response.headers.items()]
+        if 'Content-Length' not in response.headers:
+            headers.append(('Content-Length', str(len(body))))
+
+        start_response(response_status(response.status), headers)
+        if not body or method is Method.Head:
+            return []
+        return [body]
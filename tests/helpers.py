@@ -0,0 +1,29 @@
+import asyncio
+
+from odinweb3.async_containers import AsyncApiInterfaceBase
+from odinweb3.containers import ApiInterfaceBase, ApiContainer
+
+
+def run(coroutine):
+    """
+    Run a coroutine to completion on a new event loop.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_api(*operations, **kwargs):
+    """
+    API interface (with a path prefix of ``/api``) containing operations.
+    """
+    return ApiInterfaceBase(ApiContainer(*operations), path_prefix='/api', **kwargs)
+
+
+def make_async_api(*operations, **kwargs):
+    """
+    Async API interface (with a path prefix of ``/api``) containing operations.
+    """
+    return AsyncApiInterfaceBase(ApiContainer(*operations), path_prefix='/api', **kwargs)
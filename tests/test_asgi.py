@@ -0,0 +1,174 @@
+import pytest
+
+from odinweb3.asgi import AsgiApplication, AsgiRequest, read_body
+from odinweb3.async_containers import AsyncApiInterfaceBase
+from odinweb3.constants import Method, HTTPStatus
+from odinweb3.containers import ApiInterfaceBase, ApiContainer
+from odinweb3.decorators import Operation
+from odinweb3.testing import check_request_proxy
+
+from .helpers import run, make_async_api
+
+
+def make_scope(path='/api/item', method='GET', query_string=b'', headers=()):
+    return {
+        'type': 'http',
+        'scheme': 'http',
+        'server': ('127.0.0.1', 8000),
+        'method': method,
+        'path': path,
+        'query_string': query_string,
+        'headers': list(headers),
+    }
+
+
+def make_receive(*messages):
+    messages = list(messages)
+
+    async def receive():
+        return messages.pop(0)
+    return receive
+
+
+def call_app(app, scope, *messages):
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    run(app(scope, make_receive(*messages or ({'type': 'http.request'},)), send))
+    return sent
+
+
+class TestAsgiRequest(object):
+    def test_request_proxy(self):
+        target = AsgiRequest(make_scope(query_string=b'a=1&b=2', headers=[(b'host', b'example.com')]))
+
+        check_request_proxy(target)
+
+    def test_values(self):
+        target = AsgiRequest(make_scope(
+            method='POST',
+            query_string=b'a=1&a=2&b=',
+            headers=[
+                (b'host', b'example.com'),
+                (b'content-type', b'application/x-www-form-urlencoded'),
+                (b'cookie', b'session=abc'),
+                (b'cookie', b'theme=dark'),
+            ],
+        ), b'name=value')
+
+        assert target.scheme == 'http'
+        assert target.host == 'example.com'
+        assert target.method == Method.Post
+        assert target.path == '/api/item'
+        assert target.query.getlist('a') == ['1', '2']
+        assert target.query['b'] == ''
+        assert target.cookies == {'session': 'abc', 'theme': 'dark'}
+        assert target.post['name'] == 'value'
+        assert target.body == b'name=value'
+
+    def test_lazy_values(self):
+        target = AsgiRequest(make_scope(headers=[(b'x-value', b'1')]))
+
+        assert target.headers is target.headers
+        assert target.query is target.query
+
+    def test_host_from_server(self):
+        target = AsgiRequest(make_scope())
+
+        assert target.host == '127.0.0.1:8000'
+
+
+@pytest.mark.parametrize('messages, expected', (
+    (({'type': 'http.request'},), b''),
+    (({'type': 'http.request', 'body': b'abc'},), b'abc'),
+    (({'type': 'http.request', 'body': b'ab', 'more_body': True},
+      {'type': 'http.request', 'body': b'c', 'more_body': True},
+      {'type': 'http.request', 'body': b'd'}), b'abcd'),
+    (({'type': 'http.request', 'body': b'ab', 'more_body': True},
+      {'type': 'http.disconnect'}), None),
+    (({'type': 'http.disconnect'},), None),
+))
+def test_read_body(messages, expected):
+    assert run(read_body(make_receive(*messages))) == expected
+
+
+class TestAsgiApplication(object):
+    @pytest.mark.parametrize('api_class', (ApiInterfaceBase, AsyncApiInterfaceBase))
+    def test_dispatch(self, api_class):
+        def callback(request, resource_id):
+            return {'id': resource_id}
+        app = AsgiApplication(api_class(ApiContainer(Operation(callback, 'item/{resource_id}')), path_prefix='/api'))
+
+        start, body = call_app(app, make_scope('/api/item/1'))
+
+        assert start['type'] == 'http.response.start'
+        assert start['status'] == 200
+        assert (b'content-type', b'application/json') in start['headers']
+        assert (b'content-length', b'9') in start['headers']
+        assert body == {'type': 'http.response.body', 'body': b'{"id": 1}'}
+
+    def test_dispatch__body(self):
+        def callback(request):
+            return {'body': request.body.decode()}
+        app = AsgiApplication(make_async_api(Operation(callback, 'item', methods=Method.Post)))
+
+        _, body = call_app(
+            app, make_scope(method='POST'),
+            {'type': 'http.request', 'body': b'a', 'more_body': True},
+            {'type': 'http.request', 'body': b'b'},
+        )
+
+        assert body['body'] == b'{"body": "ab"}'
+
+    @pytest.mark.parametrize('messages', (
+        ({'type': 'http.request', 'body': b'{"a": ', 'more_body': True}, {'type': 'http.disconnect'}),
+        ({'type': 'http.disconnect'},),
+    ))
+    def test_disconnect(self, messages):
+        calls = []
+        app = AsgiApplication(make_async_api(Operation(lambda request: calls.append(request), 'item', methods=Method.Post)))
+
+        sent = call_app(app, make_scope(method='POST'), *messages)
+
+        assert sent == []
+        assert calls == []
+
+    def test_not_found(self):
+        app = AsgiApplication(make_async_api())
+
+        start, _ = call_app(app, make_scope('/api/missing'))
+
+        assert start['status'] == HTTPStatus.NOT_FOUND
+
+    def test_unknown_method(self):
+        app = AsgiApplication(make_async_api(Operation(lambda request: {}, 'item')))
+
+        start, body = call_app(app, make_scope(method='PROPFIND'))
+
+        assert start['status'] == HTTPStatus.NOT_IMPLEMENTED
+        assert b'"code": 50100' in body['body']
+
+    def test_lifespan(self):
+        api = make_async_api(Operation(lambda request: {}, 'item'))
+        app = AsgiApplication(api)
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        run(app({'type': 'lifespan'}, make_receive(
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ), send))
+
+        assert sent == [{'type': 'lifespan.startup.complete'}, {'type': 'lifespan.shutdown.complete'}]
+        assert 'router' in api.__dict__
+
+    def test_unsupported_scope(self):
+        app = AsgiApplication(make_async_api())
+
+        with pytest.raises(ValueError):
+            call_app(app, {'type': 'websocket'})
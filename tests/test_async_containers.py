@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+
+from odinweb3.constants import Method, HTTPStatus
+from odinweb3.data_structures import ImmediateResponse
+from odinweb3.decorators import Operation, ListOperation
+from odinweb3.testing import MockRequest
+
+from .helpers import run, make_async_api
+from .resources import User
+
+
+class AsyncRecordingMiddleware(object):
+    def __init__(self, calls):
+        self.calls = calls
+
+    async def pre_request(self, request, path_args):
+        self.calls.append('pre_request')
+
+    async def pre_dispatch(self, request, path_args):
+        self.calls.append('pre_dispatch')
+
+    def post_dispatch(self, request, response):
+        self.calls.append('post_dispatch')
+        return response
+
+    async def post_request(self, request, response):
+        self.calls.append('post_request')
+        return response
+
+
+class TestAsyncApiInterfaceBase(object):
+    def test_coroutine_operation(self):
+        async def callback(request, resource_id):
+            await asyncio.sleep(0)
+            return {'id': resource_id}
+        api = make_async_api(Operation(callback, 'item/{resource_id}'))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item/1')))
+
+        assert actual.status == HTTPStatus.OK
+        assert actual.body == '{"id": 1}'
+
+    def test_coroutine_listing(self):
+        async def callback(request, offset, limit):
+            await asyncio.sleep(0)
+            return [{'id': 1}], 5
+        api = make_async_api(ListOperation(callback, 'item', listing_resource=User))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item', query={'offset': '2', 'limit': '1'})))
+
+        assert actual.status == HTTPStatus.OK
+        assert actual.body == '[{"id": 1}]'
+        assert actual.headers['X-Page-Offset'] == '2'
+        assert actual.headers['X-Page-Limit'] == '1'
+        assert actual.headers['X-Total-Count'] == '5'
+
+    def test_sync_operation(self):
+        api = make_async_api(Operation(lambda request: {'sync': True}, 'item'))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert actual.status == HTTPStatus.OK
+        assert actual.body == '{"sync": true}'
+
+    def test_async_middleware(self):
+        calls = []
+
+        async def callback(request):
+            calls.append('execute')
+            return {}
+        api = make_async_api(Operation(callback, 'item'), middleware=[AsyncRecordingMiddleware(calls)])
+
+        run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert calls == ['pre_request', 'pre_dispatch', 'execute', 'post_dispatch', 'post_request']
+
+    def test_immediate_response(self):
+        async def callback(request):
+            return ImmediateResponse.from_status(HTTPStatus.UNAUTHORIZED)
+        api = make_async_api(Operation(callback, 'item'))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert actual.status == HTTPStatus.UNAUTHORIZED
+
+    def test_concurrent_requests(self):
+        async def callback(request, resource_id):
+            await asyncio.sleep(0.01)
+            return {'id': resource_id}
+        api = make_async_api(Operation(callback, 'item/{resource_id}'))
+
+        async def dispatch_all():
+            return await asyncio.gather(*(
+                api.dispatch_request(MockRequest(path='/api/item/{}'.format(idx)))
+                for idx in range(5)
+            ))
+
+        actual = run(dispatch_all())
+
+        assert [r.body for r in actual] == ['{{"id": {}}}'.format(idx) for idx in range(5)]
+
+    @pytest.mark.parametrize('path, method, expected', (
+        ('/api/missing', Method.Get, HTTPStatus.NOT_FOUND),
+        ('/api/item', Method.Delete, HTTPStatus.METHOD_NOT_ALLOWED),
+    ))
+    def test_routing_errors(self, path, method, expected):
+        api = make_async_api(Operation(lambda request: {}, 'item'))
+
+        actual = run(api.dispatch_request(MockRequest(path=path, method=method)))
+
+        assert actual.status == expected
+
+    def test_server_error(self):
+        async def callback(request):
+            raise KeyError()
+        api = make_async_api(Operation(callback, 'item'))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert actual.status == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert '"code": 50000' in actual.body
+
+    def test_not_implemented(self):
+        async def callback(request):
+            raise NotImplementedError()
+        api = make_async_api(Operation(callback, 'item'))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert actual.status == HTTPStatus.NOT_IMPLEMENTED
+
+
+class TestDeadlines(object):
+    def test_operation_cancelled(self):
+        calls = []
+
+        async def callback(request):
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                calls.append('cancelled')
+                raise
+            return {}
+        api = make_async_api(Operation(callback, 'item', timeout=0.01))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert actual.status == HTTPStatus.GATEWAY_TIMEOUT
+        assert calls == ['cancelled']
+
+    def test_client_timeout(self):
+        async def callback(request):
+            await asyncio.sleep(1)
+        api = make_async_api(Operation(callback, 'item'))
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item', headers={'x-request-timeout': '0.01'})))
+
+        assert actual.status == HTTPStatus.GATEWAY_TIMEOUT
+
+    def test_within_deadline(self):
+        async def callback(request):
+            return {'ok': True}
+        api = make_async_api(Operation(callback, 'item'), timeout=5)
+
+        actual = run(api.dispatch_request(MockRequest(path='/api/item')))
+
+        assert actual.status == HTTPStatus.OK
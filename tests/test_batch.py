@@ -0,0 +1,196 @@
+import json
+import threading
+
+import pytest
+
+from odinweb3.async_containers import AsyncApiInterfaceBase
+from odinweb3.batch import SubRequest, PassthroughCodec, parse_batch, batch_groups
+from odinweb3.constants import Method, HTTPStatus
+from odinweb3.containers import ApiInterfaceBase, ApiContainer
+from odinweb3.data_structures import HttpResponse
+from odinweb3.decorators import Operation
+from odinweb3.exceptions import HttpError, PermissionDenied
+from odinweb3.testing import MockRequest
+
+from .helpers import run, make_api
+
+
+def batch_request(items, **kwargs):
+    return MockRequest(path='/api/batch', method=Method.Post, body=json.dumps(items), **kwargs)
+
+
+class AuthMiddleware(object):
+    def pre_dispatch(self, request, path_args):
+        if request.headers.get('authorization') != 'secret':
+            raise PermissionDenied()
+
+
+def get_item(request, resource_id):
+    return {'id': resource_id, 'page': request.query.get('page')}
+
+
+def create_item(request):
+    return {'created': json.loads(request.body)}
+
+
+class TestSubRequest(object):
+    def test_values(self):
+        parent = MockRequest(headers={'authorization': 'secret', 'content-length': '10', 'x-a': '1'})
+
+        target = SubRequest(parent, Method.Get, '/api/item/1?page=2', {'X-A': '2'}, '')
+
+        assert target.method == Method.Get
+        assert target.path == '/api/item/1'
+        assert target.query['page'] == '2'
+        assert target.headers == {'authorization': 'secret', 'x-a': '2'}
+        assert target.host == parent.host
+
+    def test_response_codec(self):
+        target = SubRequest(MockRequest(), Method.Get, '/')
+
+        target.response_codec = object()
+
+        assert target.response_codec is PassthroughCodec
+
+
+class TestParseBatch(object):
+    @pytest.mark.parametrize('body', (
+        'not json',
+        '{"method": "GET"}',
+        json.dumps([{'path': '/a'}] * 3),
+    ))
+    def test_invalid_batch(self, body):
+        with pytest.raises(HttpError):
+            parse_batch(MockRequest(body=body), 2)
+
+    @pytest.mark.parametrize('item', (
+        'item',
+        {'method': 'GET'},
+        {'method': 'GET', 'path': 'relative'},
+        {'method': 'FETCH', 'path': '/a'},
+        {'method': 'GET', 'path': '/a', 'headers': ['a']},
+    ))
+    def test_invalid_item(self, item):
+        actual, = parse_batch(MockRequest(body=json.dumps([item])), 10)
+
+        assert isinstance(actual, HttpResponse)
+        assert actual.status == HTTPStatus.BAD_REQUEST
+
+    def test_items(self):
+        actual = parse_batch(MockRequest(body=json.dumps([
+            {'method': 'get', 'path': '/a'},
+            {'method': 'POST', 'path': '/b', 'body': {'name': 'c'}},
+        ])), 10)
+
+        assert [r.method for r in actual] == [Method.Get, Method.Post]
+        assert actual[1].body == '{"name": "c"}'
+
+    @pytest.mark.parametrize('body', (b'[{"path": "/a"}]', memoryview(b'[{"path": "/a"}]')))
+    def test_binary_body(self, body):
+        actual, = parse_batch(MockRequest(body=body), 10)
+
+        assert actual.path == '/a'
+
+    def test_undecodable_body(self):
+        with pytest.raises(HttpError) as result:
+            parse_batch(MockRequest(body=b'[\xff]'), 10)
+
+        assert result.value.status == HTTPStatus.BAD_REQUEST
+
+
+def test_batch_groups():
+    parent = MockRequest()
+    requests = [
+        SubRequest(parent, Method.Get, '/'),
+        SubRequest(parent, Method.Get, '/'),
+        HttpResponse('error', HTTPStatus.BAD_REQUEST),
+        SubRequest(parent, Method.Post, '/'),
+        SubRequest(parent, Method.Delete, '/'),
+        SubRequest(parent, Method.Get, '/'),
+    ]
+
+    assert list(batch_groups(requests)) == [[0, 1], [3], [4], [5]]
+
+
+ITEMS = [
+    {'method': 'GET', 'path': '/api/item/1?page=3'},
+    {'method': 'GET', 'path': '/api/item/2'},
+    {'method': 'POST', 'path': '/api/item', 'body': {'name': 'new'}},
+    {'method': 'GET', 'path': '/api/missing'},
+    {'method': 'POST', 'path': '/api/batch', 'body': []},
+]
+
+
+def check_envelope(response):
+    assert response.status == HTTPStatus.MULTI_STATUS
+    actual = json.loads(response.body)
+    assert [item['status'] for item in actual] == [200, 200, 200, 404, 400]
+    assert actual[0]['body'] == {'id': 1, 'page': '3'}
+    assert actual[1]['body'] == {'id': 2, 'page': None}
+    assert actual[2]['body'] == {'created': {'name': 'new'}}
+
+
+class TestBatchOperation(object):
+    def make_api(self, api_class, **kwargs):
+        return api_class(
+            ApiContainer(
+                Operation(get_item, 'item/{resource_id}'),
+                Operation(create_item, 'item', methods=Method.Post),
+            ),
+            path_prefix='/api', batch_path='batch', **kwargs
+        )
+
+    def test_disabled(self):
+        api = make_api(Operation(get_item, 'item/{resource_id}'))
+
+        actual = api.dispatch_request(batch_request([]))
+
+        assert api.batch_operation is None
+        assert actual.status == HTTPStatus.NOT_FOUND
+
+    def test_sync(self):
+        api = self.make_api(ApiInterfaceBase)
+
+        check_envelope(api.dispatch_request(batch_request(ITEMS)))
+
+    def test_async(self):
+        api = self.make_api(AsyncApiInterfaceBase)
+
+        check_envelope(run(api.dispatch_request(batch_request(ITEMS))))
+
+    def test_invalid_batch(self):
+        api = self.make_api(ApiInterfaceBase)
+
+        actual = api.dispatch_request(MockRequest(path='/api/batch', method=Method.Post, body='{}'))
+
+        assert actual.status == HTTPStatus.BAD_REQUEST
+
+    def test_middleware_applied(self):
+        api = self.make_api(ApiInterfaceBase, middleware=[AuthMiddleware()])
+        items = [
+            {'method': 'GET', 'path': '/api/item/1'},
+            {'method': 'GET', 'path': '/api/item/2', 'headers': {'Authorization': 'wrong'}},
+        ]
+
+        actual = api.dispatch_request(batch_request(items, headers={'authorization': 'secret'}))
+
+        assert [item['status'] for item in json.loads(actual.body)] == [200, 401]
+
+    def test_middleware_applied__batch(self):
+        api = self.make_api(ApiInterfaceBase, middleware=[AuthMiddleware()])
+
+        actual = api.dispatch_request(batch_request(ITEMS[:2]))
+
+        assert actual.status == HTTPStatus.UNAUTHORIZED
+
+    def test_concurrent(self):
+        barrier = threading.Barrier(2, timeout=1)
+
+        def callback(request, resource_id):
+            barrier.wait()
+            return {'id': resource_id}
+        api = make_api(Operation(callback, 'item/{resource_id}'), batch_path='batch')
+
+        actual = api.dispatch_request(batch_request(ITEMS[:2]))
+
+        assert [item['status'] for item in json.loads(actual.body)] == [200, 200]
@@ -0,0 +1,312 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from odinweb3.coalescing import SingleFlight, AsyncSingleFlight, coalesce_key
+from odinweb3.constants import Method, HTTPStatus
+from odinweb3.data_structures import ImmediateResponse
+from odinweb3.decorators import Operation
+from odinweb3.exceptions import DeadlineExceeded
+from odinweb3.testing import MockRequest
+
+from .helpers import run, make_api, make_async_api
+
+
+class TestCoalesceKey(object):
+    operation = Operation(lambda request, resource_id: None, 'item/{resource_id}', coalesce=True, vary=('X-Tenant',))
+
+    @pytest.mark.parametrize('a, b', (
+        (MockRequest(query={'a': '1', 'b': '2'}), MockRequest(query={'b': '2', 'a': '1'})),
+        (MockRequest(headers={'x-tenant': '1', 'x-other': '1'}), MockRequest(headers={'x-tenant': '1'})),
+    ))
+    def test_same(self, a, b):
+        assert coalesce_key(self.operation, a, {'resource_id': 1}) == coalesce_key(self.operation, b, {'resource_id': 1})
+
+    @pytest.mark.parametrize('a, b', (
+        (MockRequest(query={'a': '1'}), MockRequest(query={'a': '2'})),
+        (MockRequest(query={'a': ['1', '2']}), MockRequest(query={'a': ['2', '1']})),
+        (MockRequest(headers={'x-tenant': '1'}), MockRequest(headers={'x-tenant': '2'})),
+        (MockRequest(), MockRequest(response_codec=object())),
+    ))
+    def test_different(self, a, b):
+        assert coalesce_key(self.operation, a, {'resource_id': 1}) != coalesce_key(self.operation, b, {'resource_id': 1})
+
+    @pytest.mark.parametrize('header', ('Authorization', 'Cookie'))
+    def test_default_vary(self, header):
+        operation = Operation(lambda request: None, 'item', coalesce=True)
+        a = MockRequest(headers={header.lower(): 'a'})
+        b = MockRequest(headers={header.lower(): 'b'})
+
+        assert operation.vary == ('authorization', 'cookie')
+        assert coalesce_key(operation, a, {}) != coalesce_key(operation, b, {})
+
+    def test_different_path_args(self):
+        request = MockRequest()
+
+        assert coalesce_key(self.operation, request, {'resource_id': 1}) != \
+            coalesce_key(self.operation, request, {'resource_id': 2})
+
+
+class TestSingleFlight(object):
+    def test_do(self):
+        target = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def func():
+            calls.append(1)
+            release.wait(1)
+            return 'result'
+
+        def call():
+            results.append(target.do('key', func))
+
+        threads = [threading.Thread(target=call) for _ in range(5)]
+        threads[0].start()
+        while not calls:
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1]
+        assert sorted(results) == [('result', False)] + [('result', True)] * 4
+        assert len(target) == 0
+
+    def test_do__exception(self):
+        target = SingleFlight()
+
+        def func():
+            raise KeyError()
+
+        with pytest.raises(KeyError):
+            target.do('key', func)
+        assert len(target) == 0
+
+    def test_do__timeout(self):
+        target = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+
+        def func():
+            started.set()
+            release.wait(1)
+            return 'result'
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(target.do('key', func)))
+        thread.start()
+        started.wait(1)
+
+        with pytest.raises(DeadlineExceeded):
+            target.do('key', func, 0.01)
+        release.set()
+        thread.join()
+
+        assert results == [('result', False)]
+
+
+class TestAsyncSingleFlight(object):
+    def test_do(self):
+        target = AsyncSingleFlight()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        async def main():
+            return await asyncio.gather(*(target.do('key', func) for _ in range(5)))
+
+        actual = run(main())
+
+        assert calls == [1]
+        assert actual == [('result', False)] + [('result', True)] * 4
+        assert len(target) == 0
+
+    def test_do__leader_cancelled(self):
+        target = AsyncSingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.01)
+            return 'result'
+
+        async def main():
+            leader = asyncio.ensure_future(target.do('key', func))
+            await asyncio.sleep(0)
+            follower = asyncio.ensure_future(target.do('key', func))
+            await asyncio.sleep(0)
+            leader.cancel()
+            return await follower
+
+        assert run(main()) == ('result', True)
+
+    def test_do__timeout(self):
+        target = AsyncSingleFlight()
+
+        async def func():
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        async def main():
+            leader = asyncio.ensure_future(target.do('key', func))
+            await asyncio.sleep(0)
+            with pytest.raises(DeadlineExceeded):
+                await target.do('key', func, 0.01)
+            return await leader
+
+        assert run(main()) == ('result', False)
+
+
+class ApiKeyMiddleware(object):
+    def pre_dispatch(self, request, path_args):
+        if request.headers.get('x-api-key') != 'valid':
+            return ImmediateResponse.from_status(HTTPStatus.UNAUTHORIZED)
+
+
+class TestCoalescedOperations(object):
+    def test_sync(self):
+        release = threading.Event()
+        calls = []
+
+        def callback(request, resource_id):
+            calls.append(resource_id)
+            release.wait(1)
+            return {'id': resource_id}
+        api = make_api(Operation(callback, 'item/{resource_id}', coalesce=True))
+        results = []
+
+        def dispatch():
+            results.append(api.dispatch_request(MockRequest(path='/api/item/1')))
+
+        threads = [threading.Thread(target=dispatch) for _ in range(3)]
+        threads[0].start()
+        while not calls:
+            time.sleep(0.001)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert calls == [1]
+        assert [r.status for r in results] == [HTTPStatus.OK] * 3
+        assert len({id(r.headers) for r in results}) == 3
+        assert all(r.body == '{"id": 1}' for r in results)
+
+    def test_async(self):
+        calls = []
+
+        async def callback(request, resource_id):
+            calls.append(resource_id)
+            await asyncio.sleep(0.01)
+            return {'id': resource_id}
+        api = make_async_api(Operation(callback, 'item/{resource_id}', coalesce=True))
+
+        async def main():
+            return await asyncio.gather(
+                api.dispatch_request(MockRequest(path='/api/item/1')),
+                api.dispatch_request(MockRequest(path='/api/item/1')),
+                api.dispatch_request(MockRequest(path='/api/item/2')),
+            )
+
+        actual = run(main())
+
+        assert sorted(calls) == [1, 2]
+        assert [r.body for r in actual] == ['{"id": 1}', '{"id": 1}', '{"id": 2}']
+        assert actual[0].body is actual[1].body
+        assert actual[0].headers is not actual[1].headers
+
+    def test_async__pre_dispatch(self):
+        calls = []
+
+        async def callback(request):
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {}
+        api = make_async_api(Operation(callback, 'item', coalesce=True), middleware=[ApiKeyMiddleware()])
+
+        async def main():
+            return await asyncio.gather(
+                api.dispatch_request(MockRequest(path='/api/item', headers={'x-api-key': 'valid'})),
+                api.dispatch_request(MockRequest(path='/api/item', headers={'x-api-key': 'invalid'})),
+            )
+
+        actual = run(main())
+
+        assert calls == [1]
+        assert [r.status for r in actual] == [HTTPStatus.OK, HTTPStatus.UNAUTHORIZED]
+
+    def test_sync__pre_dispatch(self):
+        calls = []
+        api = make_api(Operation(lambda request: calls.append(1), 'item', coalesce=True),
+                       middleware=[ApiKeyMiddleware()])
+
+        actual = api.dispatch_request(MockRequest(path='/api/item', headers={'x-api-key': 'invalid'}))
+
+        assert actual.status == HTTPStatus.UNAUTHORIZED
+        assert calls == []
+
+    def test_async__follower_deadline(self):
+        async def callback(request):
+            await asyncio.sleep(0.05)
+            return {}
+        api = make_async_api(Operation(callback, 'item', coalesce=True))
+
+        async def main():
+            leader = asyncio.ensure_future(api.dispatch_request(MockRequest(path='/api/item')))
+            await asyncio.sleep(0)
+            follower = await api.dispatch_request(MockRequest(path='/api/item', headers={'x-request-timeout': '0.01'}))
+            return await leader, follower
+
+        leader, follower = run(main())
+
+        assert leader.status == HTTPStatus.OK
+        assert follower.status == HTTPStatus.GATEWAY_TIMEOUT
+
+    def test_sync__follower_deadline(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def callback(request):
+            started.set()
+            release.wait(1)
+            return {}
+        api = make_api(Operation(callback, 'item', coalesce=True))
+        results = []
+        thread = threading.Thread(target=lambda: results.append(api.dispatch_request(MockRequest(path='/api/item'))))
+        thread.start()
+        started.wait(1)
+
+        actual = api.dispatch_request(MockRequest(path='/api/item', headers={'x-request-timeout': '0.01'}))
+        release.set()
+        thread.join()
+
+        assert actual.status == HTTPStatus.GATEWAY_TIMEOUT
+        assert results[0].status == HTTPStatus.OK
+
+    def test_not_get(self):
+        calls = []
+
+        async def callback(request):
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {}
+        api = make_async_api(Operation(callback, 'item', methods=Method.Post, coalesce=True))
+
+        async def main():
+            return await asyncio.gather(*(
+                api.dispatch_request(MockRequest(path='/api/item', method=Method.Post)) for _ in range(2)
+            ))
+
+        run(main())
+
+        assert calls == [1, 1]
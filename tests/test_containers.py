@@ -0,0 +1,363 @@
+import pytest
+
+from odinweb3.async_containers import AsyncApiInterfaceBase
+from odinweb3.constants import Method, HTTPStatus
+from odinweb3.containers import ApiInterfaceBase, ApiContainer, ResourceApi
+from odinweb3.data_structures import ImmediateResponse
+from odinweb3.decorators import Operation, ListOperation
+from odinweb3.exceptions import PermissionDenied
+from odinweb3.testing import MockRequest
+
+from .helpers import make_api, run
+from .resources import User
+
+
+class RecordingMiddleware(object):
+    def __init__(self, name, calls, priority=10):
+        self.name = name
+        self.calls = calls
+        self.priority = priority
+
+    def pre_request(self, request, path_args):
+        self.calls.append((self.name, 'pre_request'))
+
+    def pre_dispatch(self, request, path_args):
+        self.calls.append((self.name, 'pre_dispatch'))
+
+    def post_dispatch(self, request, response):
+        self.calls.append((self.name, 'post_dispatch'))
+        return response
+
+    def post_request(self, request, response):
+        self.calls.append((self.name, 'post_request'))
+        return response
+
+
+class TestMiddlewareChain(object):
+    def test_no_middleware(self):
+        def callback(request, resource_id):
+            return {'id': resource_id}
+        api = make_api(Operation(callback, 'item/{resource_id}'))
+
+        actual = api.dispatch_request(MockRequest(path='/api/item/1'))
+
+        assert actual.status == HTTPStatus.OK
+        assert actual.body == '{"id": 1}'
+
+    def test_middleware_order(self):
+        calls = []
+
+        def callback(request):
+            calls.append(('operation', 'execute'))
+            return {}
+        operation = Operation(callback, 'item', middleware=[
+            RecordingMiddleware('op_late', calls, 20),
+            RecordingMiddleware('op_early', calls, 5),
+        ])
+        api = make_api(operation, middleware=[RecordingMiddleware('api', calls)])
+
+        api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert calls == [
+            ('api', 'pre_request'),
+            ('api', 'pre_dispatch'),
+            ('op_early', 'pre_dispatch'),
+            ('op_late', 'pre_dispatch'),
+            ('operation', 'execute'),
+            ('op_late', 'post_dispatch'),
+            ('op_early', 'post_dispatch'),
+            ('api', 'post_dispatch'),
+            ('api', 'post_request'),
+        ]
+
+    def test_prepared_with_router(self):
+        operation = Operation(lambda request: {}, 'item')
+        api = make_api(operation)
+
+        assert api.router
+        assert api.prepared(operation).chain.has_dispatch_middleware is False
+
+    def test_prepared_on_dispatch(self):
+        operation = Operation(lambda request: {}, 'item', methods=Method.Get)
+        api = make_api(operation)
+
+        actual = api.dispatch(operation, MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.OK
+        assert api.prepared(operation).operation is operation
+
+    @pytest.mark.parametrize('api_class, coalesce', (
+        (ApiInterfaceBase, False),
+        (ApiInterfaceBase, True),
+        (AsyncApiInterfaceBase, False),
+        (AsyncApiInterfaceBase, True),
+    ))
+    def test_prepared_once_per_dispatch(self, api_class, coalesce):
+        calls = []
+
+        class CountingApi(api_class):
+            def prepared(self, operation):
+                calls.append(operation)
+                return super().prepared(operation)
+
+        operation = Operation(lambda request: {}, 'item', max_concurrency=2, coalesce=coalesce,
+                              middleware=[RecordingMiddleware('op', [])])
+        api = CountingApi(ApiContainer(operation), path_prefix='/api')
+        assert api.router
+        del calls[:]
+
+        actual = api.dispatch(operation, MockRequest(path='/api/item'))
+        if api_class is AsyncApiInterfaceBase:
+            actual = run(actual)
+
+        assert actual.status == HTTPStatus.OK
+        assert calls == [operation]
+
+    def test_prepared_per_interface(self):
+        calls = []
+        operation = Operation(lambda request: {}, 'item')
+        first = make_api(operation,
+                                 middleware=[RecordingMiddleware('first', calls)])
+        second = make_api(operation,
+                                  middleware=[RecordingMiddleware('second', calls)])
+        assert first.router and second.router
+
+        first.dispatch_request(MockRequest(path='/api/item'))
+        second.dispatch_request(MockRequest(path='/api/item'))
+
+        assert [name for name, phase in calls if phase == 'pre_dispatch'] == ['first', 'second']
+        assert first.prepared(operation) is not second.prepared(operation)
+
+    def test_middleware_changed_after_dispatch(self):
+        calls = []
+        operation = Operation(lambda request: {}, 'item')
+        api = make_api(operation, middleware=[RecordingMiddleware('first', calls)])
+        api.dispatch_request(MockRequest(path='/api/item'))
+
+        api.middleware.append(RecordingMiddleware('second', calls))
+        operation.middleware.append(RecordingMiddleware('third', calls))
+        del calls[:]
+        api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert [name for name, phase in calls if phase == 'pre_dispatch'] == ['first', 'second', 'third']
+
+    def test_operation_shared_by_interfaces(self):
+        operation = Operation(lambda request: {}, 'item')
+        first = make_api(operation)
+        first.dispatch_request(MockRequest(path='/api/item'))
+
+        second = make_api(operation, middleware=[RecordingMiddleware('second', [])])
+        actual = second.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.OK
+
+    def test_resource_api_instantiated_after_dispatch(self):
+        class UserApi(ResourceApi):
+            resource = User
+
+            @Operation
+            def ping(self, request):
+                return {}
+
+        api = ApiInterfaceBase(UserApi(), path_prefix='/api')
+        api.dispatch_request(MockRequest(path='/api/user'))
+
+        other = ApiInterfaceBase(UserApi(), path_prefix='/api')
+
+        assert other.dispatch_request(MockRequest(path='/api/user')).status == HTTPStatus.OK
+
+    def test_freeze(self):
+        operation = Operation(lambda request: {}, 'item')
+        api = make_api(operation)
+        api.freeze()
+
+        with pytest.raises(TypeError):
+            api.middleware.append(RecordingMiddleware('late', []))
+        with pytest.raises(TypeError):
+            operation.middleware.append(RecordingMiddleware('late', []))
+        assert api.dispatch_request(MockRequest(path='/api/item')).status == HTTPStatus.OK
+
+    def test_freeze__after_dispatch(self):
+        calls = []
+        operation = Operation(lambda request: {}, 'item')
+        api = make_api(operation)
+        api.dispatch_request(MockRequest(path='/api/item'))
+        api.middleware.append(RecordingMiddleware('late', calls))
+
+        api.freeze()
+        prepared = api.prepared(operation)
+        api.dispatch_request(MockRequest(path='/api/item'))
+
+        # Frozen middleware can not change so versions are not checked
+        assert prepared.middleware_versions is None
+        assert api.prepared(operation) is prepared
+        assert ('late', 'pre_dispatch') in calls
+
+
+class TestApiContainer(object):
+    def test_operation(self):
+        container = ApiContainer()
+
+        @container.operation('item', blocking=True, timeout=5, max_concurrency=2, coalesce=True,
+                             vary=['Accept-Language'], consumes='application/json', produces='application/json')
+        def callback(request):
+            return {}
+
+        assert container.children == [callback]
+        assert callback.blocking is True
+        assert callback.timeout == 5
+        assert callback.bulkhead is not None
+        assert callback.coalesce is True
+        assert 'accept-language' in callback.vary
+        assert callback.consumes == callback.produces == ('application/json',)
+
+    def test_operation__keyword_only(self):
+        with pytest.raises(TypeError):
+            Operation(lambda request: {}, 'item', Method.Get, None, None, None, None, True)
+
+
+class TestListOperation(object):
+    def test_paging(self):
+        calls = []
+
+        def callback(request, offset, limit):
+            calls.append((offset, limit))
+            return [{'id': 1}], 5
+        api = make_api(ListOperation(callback, 'item', listing_resource=User, max_limit=10))
+
+        actual = api.dispatch_request(MockRequest(path='/api/item', query={'offset': '-1', 'limit': '20'}))
+
+        assert actual.status == HTTPStatus.OK
+        assert calls == [(0, 10)]
+        assert actual.headers['X-Page-Offset'] == '0'
+        assert actual.headers['X-Page-Limit'] == '10'
+        assert actual.headers['X-Total-Count'] == '5'
+
+
+class AuthMiddleware(object):
+    def __init__(self, raise_exception=False):
+        self.raise_exception = raise_exception
+
+    def pre_dispatch(self, request, path_args):
+        if 'authorization' not in request.headers:
+            if self.raise_exception:
+                raise PermissionDenied()
+            return ImmediateResponse.from_status(HTTPStatus.UNAUTHORIZED)
+
+
+class TestImmediateResponse(object):
+    @pytest.mark.parametrize('raise_exception', (True, False))
+    def test_pre_dispatch(self, raise_exception):
+        calls = []
+        operation = Operation(lambda request: calls.append(request), 'item')
+        api = make_api(operation, middleware=[AuthMiddleware(raise_exception)])
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.UNAUTHORIZED
+        assert '"code": 40100' in actual.body
+        assert calls == []
+
+    def test_pre_dispatch__allowed(self):
+        operation = Operation(lambda request: {'ok': True}, 'item')
+        api = make_api(operation, middleware=[AuthMiddleware()])
+
+        actual = api.dispatch_request(MockRequest(path='/api/item', headers={'authorization': 'x'}))
+
+        assert actual.status == HTTPStatus.OK
+
+    def test_operation(self):
+        def callback(request):
+            return ImmediateResponse({'accepted': True}, HTTPStatus.ACCEPTED, {'X-Job': '1'})
+        api = make_api(Operation(callback, 'item'))
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.ACCEPTED
+        assert actual['X-Job'] == '1'
+
+
+class TestCannedResponses(object):
+    def test_not_implemented(self):
+        def callback(request):
+            raise NotImplementedError()
+        api = make_api(Operation(callback, 'item'))
+
+        first = api.dispatch_request(MockRequest(path='/api/item'))
+        second = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert first.status == HTTPStatus.NOT_IMPLEMENTED
+        assert '"code": 50100' in first.body
+        assert first.body is second.body
+        assert first.headers is not second.headers
+
+    def test_server_error(self):
+        def callback(request):
+            raise KeyError()
+        api = make_api(Operation(callback, 'item'))
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert '"code": 50000' in actual.body
+
+    def test_unregistered_codec(self):
+        class TextCodec(object):
+            CONTENT_TYPE = 'text/plain'
+
+            @staticmethod
+            def dumps(resource):
+                return str(resource.code)
+
+        api = make_api()
+
+        actual = api.canned_response('server_error', TextCodec)
+
+        assert actual.status == HTTPStatus.INTERNAL_SERVER_ERROR
+        assert actual.body == '50000'
+        assert actual.content_type == 'text/plain'
+
+
+class ExpireDeadlineMiddleware(object):
+    def pre_dispatch(self, request, path_args):
+        request.deadline = 0
+
+
+class TestDeadlines(object):
+    @pytest.mark.parametrize('api_timeout, operation_timeout, header, expected', (
+        (None, None, None, None),
+        (10, None, None, 10),
+        (None, 5, None, 5),
+        (10, 5, None, 5),
+        (5, 10, None, 5),
+        (10, 0, None, 0),
+        (5, 10, '2', 2),
+        (10, None, '2.5', 2.5),
+        (10, None, '20', 10),
+        (None, None, '2', 2),
+        (10, None, 'abc', 10),
+        (10, None, '-1', 10),
+    ))
+    def test_request_timeout(self, api_timeout, operation_timeout, header, expected):
+        operation = Operation(lambda request: {}, 'item', timeout=operation_timeout)
+        api = make_api(operation, timeout=api_timeout)
+        headers = {'x-request-timeout': header} if header else {}
+
+        assert api.request_timeout(operation, MockRequest(headers=headers)) == expected
+
+    def test_deadline_set(self):
+        requests = []
+        api = make_api(Operation(lambda request: requests.append(request), 'item', timeout=10))
+
+        api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert requests[0].deadline is not None
+
+    def test_deadline_exceeded(self):
+        calls = []
+        api = make_api(Operation(lambda request: calls.append(request), 'item'), middleware=[ExpireDeadlineMiddleware()])
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.GATEWAY_TIMEOUT
+        assert calls == []
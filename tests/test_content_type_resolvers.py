@@ -5,6 +5,9 @@ from odinweb3.testing import MockRequest
 
 
 @pytest.mark.parametrize('resolver, args, http_request, expected', (
+    # Accept Header
+    (content_type_resolvers.accept_header, (), MockRequest(headers={'accept': 'text/html, */*;q=0.1'}), 'text/html, */*;q=0.1'),
+    (content_type_resolvers.accept_header, (), MockRequest(headers={'accepts': 'application/json'}), None),
     # Accepts Header
     (content_type_resolvers.accepts_header, (), MockRequest(headers={'accepts': 'application/json'}), 'application/json'),
     (content_type_resolvers.accepts_header, (), MockRequest(headers={'content-type': 'application/json'}), None),
@@ -1,9 +1,13 @@
 import pytest
 
+from odinweb3.constants import DataType
 from odinweb3.data_structures import (
     Status,
     DefaultResource,
-    HttpResponse
+    HttpResponse,
+    UrlPath,
+    PathParam,
+    MiddlewareList,
 )
 
 
@@ -54,3 +58,107 @@ class TestHttpResponse(object):
         target.content_type = 'text/html'
 
         assert target.headers == {'Content-Type': 'text/html'}
+
+
+class TestUrlPath(object):
+    @pytest.mark.parametrize('value, expected', (
+        ('{id}', PathParam('id', DataType.Integer)),
+        ('{id:Integer}', PathParam('id', DataType.Integer)),
+        ('{name:String}', PathParam('name', DataType.String)),
+        ('{slug:String:[a-z]+}', PathParam('slug', DataType.String, '[a-z]+')),
+    ))
+    def test_parse__path_param(self, value, expected):
+        target = UrlPath.parse('foo/' + value)
+
+        assert target == UrlPath('foo', expected)
+
+    def test_parse__unknown_type(self):
+        with pytest.raises(ValueError):
+            UrlPath.parse('foo/{id:Unknown}')
+
+    def test_interned(self):
+        a = UrlPath('foo', PathParam('id'), 'bar')
+        b = UrlPath.parse('foo/{id}') + 'bar'
+
+        assert a is b
+        assert hash(a) == hash(b)
+
+    def test_parse__memoized(self):
+        assert UrlPath.parse('foo/{id}/bar') is UrlPath.parse('foo/{id}/bar')
+
+    def test_immutable(self):
+        target = UrlPath('foo')
+
+        with pytest.raises(AttributeError):
+            target._nodes = ('bar',)
+
+    def test_copy(self):
+        import copy
+        import pickle
+
+        target = UrlPath('', 'foo', PathParam('id'))
+
+        assert copy.copy(target) is target
+        assert pickle.loads(pickle.dumps(target)) is target
+        assert str(target) == '/foo/{id:Integer}'
+
+
+def test_http_response_copy():
+    target = HttpResponse('foo', Status.CREATED, {'foo': '1'})
+
+    actual = target.copy()
+    actual['foo'] = '2'
+
+    assert actual.body == 'foo'
+    assert actual.status == 201
+    assert target.headers == {'foo': '1'}
+
+
+class Middleware(object):
+    def __init__(self, name, priority=10):
+        self.name = name
+        self.priority = priority
+
+    def pre_dispatch(self, request, path_args):
+        pass
+
+    def post_dispatch(self, request, response):
+        return response
+
+
+class TestMiddlewareList(object):
+    def test_phases(self):
+        a, b, c = Middleware('a'), Middleware('b', 5), Middleware('c')
+        target = MiddlewareList([a, b, c])
+
+        assert [m.__self__ for m in target.pre_dispatch] == [b, a, c]
+        assert [m.__self__ for m in target.post_dispatch] == [a, c, b]
+        assert target.pre_request == ()
+
+    def test_invalidate_on_append(self):
+        a, b = Middleware('a'), Middleware('b', 5)
+        target = MiddlewareList([a])
+        assert len(target.pre_dispatch) == 1
+
+        target.append(b)
+
+        assert [m.__self__ for m in target.pre_dispatch] == [b, a]
+
+    def test_invalidate_on_remove(self):
+        a = Middleware('a')
+        target = MiddlewareList([a])
+        assert len(target.post_dispatch) == 1
+
+        target.remove(a)
+
+        assert target.post_dispatch == ()
+
+    def test_freeze(self):
+        target = MiddlewareList([Middleware('a')])
+        target.freeze()
+
+        assert len(target.pre_dispatch) == 1
+        with pytest.raises(TypeError):
+            target.append(Middleware('b'))
+        with pytest.raises(TypeError):
+            target += [Middleware('b')]
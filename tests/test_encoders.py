@@ -0,0 +1,103 @@
+import json
+
+import odin
+import pytest
+
+from odin.codecs.json import codec as json_codec
+
+from odinweb3 import encoders
+from odinweb3 import helpers
+from odinweb3.testing import MockRequest
+
+from .resources import User, Group
+
+
+class Team(odin.Resource):
+    class Meta:
+        namespace = 'tests'
+
+    name = odin.StringField()
+    owner = odin.DictAs(User, null=True)
+    groups = odin.ArrayOf(Group)
+
+
+@pytest.mark.parametrize('value', (
+    User(1, 'Dave', 'dave@example.com', 'admin'),
+    Group(2, 'admins'),
+    Team('a-team', User(1, 'Dave'), [Group(1, 'a'), Group(2, 'b')]),
+    Team('b-team', None, []),
+    [User(1, 'Dave'), User(2, 'Eve')],
+    {'items': (User(1, 'Dave'),), 'count': 1},
+    'plain',
+))
+def test_encode(value):
+    actual = encoders.encode(value)
+
+    assert actual == json.loads(json_codec.dumps(value))
+
+
+def test_encode__calculated_fields():
+    actual = encoders.encode(Group(2, 'admins'))
+
+    assert actual == {'group_id': 2, 'name': 'admins', 'title': 'Admins', '$': 'tests.Group'}
+
+
+def test_encode__unchanged():
+    value = {'items': [{'id': 1, 'tags': ['a', 'b']}, (1, 2.5, None)], 'count': 2}
+
+    actual = encoders.encode(value)
+
+    assert actual is value
+    assert actual['items'][0] is value['items'][0]
+
+
+def test_encode__copy_on_resource():
+    items = [{'id': 1}, User(2, 'Eve')]
+    value = {'items': items, 'meta': {'count': 2}}
+
+    actual = encoders.encode(value)
+
+    assert actual is not value
+    assert actual['items'][0] is items[0]
+    assert actual['items'][1]['name'] == 'Eve'
+    assert actual['meta'] is value['meta']
+    assert isinstance(items[1], User)
+
+
+def test_get_encoder():
+    target = encoders.get_encoder(User)
+
+    assert encoders.get_encoder(User) is target
+    assert target.__name__ == 'encode_User'
+    assert target(User(1, 'Dave'))['name'] == 'Dave'
+
+
+class ResourceCodec(object):
+    CONTENT_TYPE = 'application/x-resource'
+
+    @staticmethod
+    def dumps(resource):
+        return resource
+
+
+class OptOutCodec(ResourceCodec):
+    ENCODE_RESOURCES = False
+
+
+class OptInCodec(ResourceCodec):
+    ENCODE_RESOURCES = True
+
+
+@pytest.mark.parametrize('codec, expected_type', (
+    (json_codec, str),
+    (ResourceCodec, User),
+    (OptOutCodec, User),
+    (OptInCodec, dict),
+))
+def test_create_response(codec, expected_type):
+    request = MockRequest()
+    request.response_codec = codec
+
+    actual = helpers.create_response(request, User(1, 'Dave'))
+
+    assert isinstance(actual.body, expected_type)
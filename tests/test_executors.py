@@ -0,0 +1,209 @@
+import asyncio
+import os
+import pickle
+import threading
+
+import pytest
+
+from odinweb3.constants import Method, HTTPStatus
+from odinweb3.decorators import Operation, ListOperation, operation
+from odinweb3.exceptions import HttpError, ServiceUnavailable
+from odinweb3.executors import (
+    ExecutorGroup, ProcessExecutorGroup, Executors, RequestSnapshot, call_operation, operation_reference
+)
+from odinweb3.testing import MockRequest
+
+from .helpers import run, make_api, make_async_api
+
+
+@operation('render/{item_id}', methods=Method.Post, process=True)
+def render(request, item_id):
+    return {
+        'pid': os.getpid(),
+        'item_id': item_id,
+        'body': request.body,
+        'page': request.query['page'],
+        'snapshot': isinstance(request, RequestSnapshot),
+    }
+
+
+class TestExecutorGroup(object):
+    @pytest.mark.parametrize('kwargs', (
+        {'max_workers': 0},
+        {'max_queue': -1},
+    ))
+    def test_invalid_limits(self, kwargs):
+        with pytest.raises(ValueError):
+            ExecutorGroup('test', **kwargs)
+
+    def test_run(self):
+        target = ExecutorGroup('test', max_workers=1)
+
+        actual = run(target.run(threading.current_thread))
+
+        assert actual is not threading.current_thread()
+        assert actual.name.startswith('odinweb3-test')
+        assert target.stats() == {
+            'max_workers': 1, 'max_queue': None,
+            'active': 0, 'queued': 0, 'completed': 1, 'rejected': 0,
+        }
+        target.shutdown()
+
+    def test_queue_full(self):
+        target = ExecutorGroup('test', max_workers=1, max_queue=1)
+        release = threading.Event()
+
+        async def main():
+            first = asyncio.ensure_future(target.run(release.wait))
+            second = asyncio.ensure_future(target.run(release.wait))
+            await asyncio.sleep(0.01)
+
+            stats = target.stats()
+            with pytest.raises(ServiceUnavailable):
+                await target.run(release.wait)
+
+            release.set()
+            await asyncio.gather(first, second)
+            return stats
+
+        stats = run(main())
+
+        assert stats['active'] == 1
+        assert stats['queued'] == 1
+        assert target.stats()['rejected'] == 1
+        assert target.stats()['completed'] == 2
+        target.shutdown()
+
+
+class TestExecutors(object):
+    def test_default_group(self):
+        target = Executors(ExecutorGroup('reports', max_workers=1))
+
+        assert target[None].name == 'default'
+        assert target['reports'].max_workers == 1
+        assert set(target.stats()) == {'default', 'process', 'reports'}
+        assert isinstance(target['process'], ProcessExecutorGroup)
+
+
+class TestBlockingOperations(object):
+    def test_blocking_operation(self):
+        loop_thread = []
+
+        def callback(request):
+            return {'offloaded': threading.current_thread() is not loop_thread[0]}
+        executors = Executors(ExecutorGroup('reports', max_workers=1))
+        api = make_async_api(Operation(callback, 'report', blocking=True, executor='reports'), executors=executors)
+
+        async def main():
+            loop_thread.append(threading.current_thread())
+            return await api.dispatch_request(MockRequest(path='/api/report'))
+
+        actual = run(main())
+
+        assert actual.body == '{"offloaded": true}'
+        assert executors['reports'].stats()['completed'] == 1
+        assert executors['default'].stats()['completed'] == 0
+        executors.shutdown()
+
+    def test_at_capacity(self):
+        release = threading.Event()
+
+        def callback(request):
+            release.wait()
+            return {}
+        executors = Executors(ExecutorGroup('default', max_workers=1, max_queue=0))
+        api = make_async_api(Operation(callback, 'report', blocking=True), executors=executors)
+
+        async def main():
+            first = asyncio.ensure_future(api.dispatch_request(MockRequest(path='/api/report')))
+            await asyncio.sleep(0.01)
+            second = await api.dispatch_request(MockRequest(path='/api/report'))
+            release.set()
+            return await first, second
+
+        first, second = run(main())
+
+        assert first.status == HTTPStatus.OK
+        assert second.status == HTTPStatus.SERVICE_UNAVAILABLE
+        executors.shutdown()
+
+    def test_undefined_group(self):
+        api = make_async_api(Operation(lambda request: {}, 'report', blocking=True, executor='missing'))
+
+        with pytest.raises(ValueError):
+            api.router
+
+
+class TestRequestSnapshot(object):
+    def test_from_request(self):
+        target = RequestSnapshot.from_request(MockRequest(
+            path='/api/render/1', query={'page': '2'}, headers={'x-value': '1'}, body=b'{"a": 1}'
+        ))
+
+        actual = pickle.loads(pickle.dumps(target))
+
+        assert actual.method == Method.Get
+        assert actual.path == '/api/render/1'
+        assert actual.query['page'] == '2'
+        assert actual.query.getlist('page') == ['2']
+        assert actual.headers == {'x-value': '1'}
+        assert actual.body == '{"a": 1}'
+
+    def test_from_request__invalid_body(self):
+        with pytest.raises(HttpError) as result:
+            RequestSnapshot.from_request(MockRequest(body=b'\xff'))
+
+        assert result.value.status == HTTPStatus.BAD_REQUEST
+
+
+class TestProcessOperations(object):
+    def test_operation_reference(self):
+        assert operation_reference(render) == (__name__, 'render')
+
+    def test_operation_reference__local(self):
+        def callback(request):
+            pass
+
+        with pytest.raises(ValueError):
+            operation_reference(Operation(callback, 'local'))
+
+    def test_operation_reference__list_operation(self):
+        with pytest.raises(ValueError):
+            operation_reference(ListOperation(render.callback, 'render', process=True))
+
+    def test_call_operation(self):
+        snapshot = RequestSnapshot.from_request(MockRequest(query={'page': '1'}, body='abc'))
+
+        actual = call_operation(__name__, 'render', snapshot, {'item_id': 1})
+
+        assert actual['item_id'] == 1
+        assert actual['body'] == 'abc'
+
+    def test_process_operation(self):
+        executors = Executors(ProcessExecutorGroup('process', max_workers=1))
+        api = make_async_api(render, executors=executors)
+
+        actual = run(api.dispatch_request(MockRequest(
+            path='/api/render/3', method=Method.Post, query={'page': '2'}, body=b'data'
+        )))
+
+        assert actual.status == HTTPStatus.OK
+        assert '"item_id": 3' in actual.body
+        assert '"body": "data"' in actual.body
+        assert '"page": "2"' in actual.body
+        assert '"snapshot": true' in actual.body
+        assert '"pid": {}'.format(os.getpid()) not in actual.body
+        assert executors['process'].stats()['completed'] == 1
+        executors.shutdown()
+
+    def test_not_a_process_group(self):
+        api = make_async_api(Operation(render.callback, 'render', process=True, executor='default'))
+
+        with pytest.raises(ValueError):
+            api.router
+
+    def test_sync_interface(self):
+        api = make_api(render)
+
+        with pytest.raises(ValueError):
+            api.router
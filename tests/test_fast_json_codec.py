@@ -0,0 +1,92 @@
+import datetime
+import json
+
+import pytest
+
+from odin.codecs.json import codec as json_codec
+from odin.exceptions import CodecDecodeError
+
+from odinweb3 import helpers
+from odinweb3.containers import ApiInterfaceBase, ApiContainer, DEFAULT_CODECS
+from odinweb3.decorators import Operation
+from odinweb3.constants import HTTPStatus
+from odinweb3.exceptions import HttpError
+from odinweb3.testing import MockRequest
+
+from .resources import User, Group
+
+fast_json_codec = pytest.importorskip('odinweb3.fast_json_codec')
+
+
+@pytest.mark.parametrize('value', (
+    User(1, 'Dave', 'dave@example.com'),
+    Group(2, 'admins'),
+    [User(1, 'Dave'), User(2, 'Eve')],
+    {'a': 1, 'b': [1.5, None, True], 'c': 'é'},
+    {1: 'int key'},
+    {'when': datetime.datetime(2018, 1, 2, 3, 4, 5), 'day': datetime.date(2018, 1, 2)},
+))
+def test_dumps(value):
+    actual = fast_json_codec.dumps(value)
+
+    assert isinstance(actual, bytes)
+    assert json.loads(actual.decode('UTF8')) == json.loads(json_codec.dumps(value))
+
+
+def test_dumps__unsupported():
+    with pytest.raises(TypeError):
+        fast_json_codec.dumps(object())
+
+
+@pytest.mark.parametrize('value', (
+    '{"$": "tests.User", "id": 10, "name": "Dave"}',
+    b'{"$": "tests.User", "id": 10, "name": "Dave"}',
+))
+def test_loads(value):
+    actual = fast_json_codec.loads(value, resource=User)
+
+    assert isinstance(actual, User)
+    assert actual.id == 10
+    assert actual.name == 'Dave'
+
+
+def test_loads__memoryview():
+    actual = fast_json_codec.loads(memoryview(b'{"$": "tests.User", "id": 10, "name": "Dave"}'), resource=User)
+
+    assert actual.name == 'Dave'
+
+
+def test_loads__invalid():
+    with pytest.raises(CodecDecodeError):
+        fast_json_codec.loads('{"$": "tests.User", ', resource=User)
+
+
+@pytest.mark.parametrize('body, error_code', (
+    ('{"$": "tests.User", ', 96),
+    ('{"$": "tests.Group", "group_id": 1, "name": "a"}', 98),
+    ('[{"$": "tests.User", "id": 10, "name": "Dave"}]', 97),
+    (b'{"$": "tests.User", "name": "\xFF"}', 99),
+    (b'{"$": "tests.User", ', 96),
+))
+def test_get_resource__errors(body, error_code):
+    request = MockRequest(body=body)
+    request.request_codec = fast_json_codec
+
+    with pytest.raises(HttpError) as result:
+        helpers.get_resource(request, User)
+
+    assert result.value.resource.code == 40000 + error_code
+
+
+def test_interface():
+    class Api(ApiInterfaceBase):
+        registered_codecs = dict(DEFAULT_CODECS)
+        registered_codecs[fast_json_codec.CONTENT_TYPE] = fast_json_codec
+
+    api = Api(ApiContainer(Operation(lambda request: User(1, 'Dave'), 'user')), path_prefix='/api')
+
+    actual = api.dispatch_request(MockRequest(path='/api/user'))
+
+    assert actual.status == HTTPStatus.OK
+    assert actual['Content-Type'].startswith('application/json')
+    assert json.loads(actual.body.decode('UTF8'))['name'] == 'Dave'
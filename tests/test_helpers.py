@@ -85,6 +85,47 @@ def test_get_resource__codec_exceptions(body, error_code):
     assert exc_info.value.resource.code == error_code
 
 
+class BytesCodec(object):
+    """
+    JSON codec that accepts a binary body.
+    """
+    ACCEPTS_BYTES = True
+    received = None
+
+    @classmethod
+    def loads(cls, s, **kwargs):
+        cls.received = s
+        return json_codec.loads(bytes(s).decode('UTF8', 'replace'), **kwargs)
+
+
+@pytest.mark.parametrize('body', (
+    b'{"$": "tests.User", "id":10, "name": "Dave"}',
+    memoryview(b'{"$": "tests.User", "id":10, "name": "Dave"}'),
+))
+def test_get_resource__accepts_bytes(body):
+    request = MockRequest(body=body)
+    request.request_codec = BytesCodec
+
+    user = helpers.get_resource(request, User)
+
+    assert BytesCodec.received is body
+    assert user.name == 'Dave'
+
+
+@pytest.mark.parametrize('body, error_code', (
+    (b'{"name": "\xFF"', 40099),  # Invalid UTF-8
+    (b'{"name": "Dave"', 40096),
+))
+def test_get_resource__accepts_bytes_exceptions(body, error_code):
+    request = MockRequest(body=body)
+    request.request_codec = BytesCodec
+
+    with pytest.raises(HttpError) as exc_info:
+        helpers.get_resource(request, User)
+
+    assert exc_info.value.resource.code == error_code
+
+
 class TestCreateResponse(object):
     def test_no_body(self):
         request = MockRequest()
@@ -121,3 +162,15 @@ class TestCreateResponse(object):
         assert actual.status == HTTPStatus.CREATED
         assert actual.headers['Content-Type'] == json_codec.CONTENT_TYPE
         assert json_codec.json.loads(actual.body) == {"foo": "bar"}
+
+
+@pytest.mark.parametrize('value, expected', (
+    (None, {}),
+    ('', {}),
+    ('session=abc', {'session': 'abc'}),
+    ('session=abc; theme=dark', {'session': 'abc', 'theme': 'dark'}),
+    ('session="a b"; =x; invalid; empty=', {'session': 'a b', 'empty': ''}),
+    ('name=a%20b', {'name': 'a b'}),
+))
+def test_parse_cookies(value, expected):
+    assert helpers.parse_cookies(value) == expected
@@ -0,0 +1,364 @@
+import asyncio
+import threading
+
+import pytest
+
+from odinweb3.async_containers import AsyncApiInterfaceBase
+from odinweb3.constants import HTTPStatus
+from odinweb3.containers import ApiContainer
+from odinweb3.decorators import Operation
+from odinweb3.exceptions import DeadlineExceeded, ServiceUnavailable
+from odinweb3.limits import Bulkhead, AdaptiveLimiter, acquire_all, release_all
+from odinweb3.testing import MockRequest
+
+from .helpers import run, make_api
+
+
+class TestBulkhead(object):
+    @pytest.mark.parametrize('kwargs', (
+        {'max_concurrency': 0},
+        {'max_concurrency': 1, 'max_queue': -1},
+    ))
+    def test_invalid_limits(self, kwargs):
+        with pytest.raises(ValueError):
+            Bulkhead(**kwargs)
+
+    def test_acquire(self):
+        target = Bulkhead(2)
+
+        target.acquire()
+        target.acquire()
+        with pytest.raises(ServiceUnavailable) as result:
+            target.acquire()
+
+        assert result.value.retry_after == 1
+        assert target.active == 2
+        assert target.rejected == 1
+
+        target.release()
+        target.acquire()
+        assert target.active == 2
+
+    def test_acquire__queued(self):
+        target = Bulkhead(1, max_queue=1)
+        target.acquire()
+        acquired = threading.Event()
+
+        def waiter():
+            target.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=waiter)
+        thread.start()
+        while not target.queued:
+            pass
+
+        with pytest.raises(ServiceUnavailable):
+            target.acquire()
+
+        target.release()
+        assert acquired.wait(1)
+        thread.join()
+        assert target.active == 1
+        assert target.queued == 0
+
+    def test_acquire_async__queued(self):
+        target = Bulkhead(1, max_queue=1)
+
+        async def main():
+            await target.acquire_async()
+            waiter = asyncio.ensure_future(target.acquire_async())
+            await asyncio.sleep(0)
+            queued = target.queued
+
+            with pytest.raises(ServiceUnavailable):
+                await target.acquire_async()
+
+            target.release()
+            await waiter
+            return queued
+
+        assert run(main()) == 1
+        assert target.active == 1
+        assert target.queued == 0
+
+    def test_acquire__timeout(self):
+        target = Bulkhead(1, max_queue=1)
+        target.acquire()
+
+        with pytest.raises(DeadlineExceeded):
+            target.acquire(0.01)
+
+        assert target.active == 1
+        assert target.queued == 0
+        assert target.rejected == 0
+
+    def test_acquire_async__timeout(self):
+        target = Bulkhead(1, max_queue=1)
+
+        async def main():
+            await target.acquire_async()
+            with pytest.raises(DeadlineExceeded):
+                await target.acquire_async(0.01)
+            target.release()
+
+        run(main())
+
+        assert target.active == 0
+        assert target.queued == 0
+        assert not target._waiters
+
+    def test_acquire_async__cancelled(self):
+        target = Bulkhead(1, max_queue=1)
+
+        async def main():
+            await target.acquire_async()
+            waiter = asyncio.ensure_future(target.acquire_async())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            await asyncio.sleep(0)
+            target.release()
+
+        run(main())
+
+        assert target.active == 0
+        assert target.queued == 0
+
+    def test_acquire_all(self):
+        first = Bulkhead(1)
+        second = Bulkhead(1)
+        second.acquire()
+
+        with pytest.raises(ServiceUnavailable):
+            acquire_all((first, second))
+
+        assert first.active == 0
+
+        second.release()
+        tokens = acquire_all((first, second))
+        release_all((first, second), tokens)
+        assert first.active == second.active == 0
+
+
+class TestAdaptiveLimiter(object):
+    @pytest.mark.parametrize('kwargs', (
+        {'initial_limit': 0},
+        {'initial_limit': 5, 'min_limit': 10},
+        {'initial_limit': 5, 'max_limit': 2},
+        {'backoff_ratio': 1},
+        {'tolerance': 1},
+        {'smoothing': 0},
+        {'window': -1},
+    ))
+    def test_invalid_arguments(self, kwargs):
+        with pytest.raises(ValueError):
+            AdaptiveLimiter(**kwargs)
+
+    def test_acquire(self):
+        target = AdaptiveLimiter(initial_limit=2)
+
+        first = target.acquire()
+        target.acquire()
+        with pytest.raises(ServiceUnavailable):
+            target.acquire()
+
+        target.release(first)
+        assert target.stats()['in_flight'] == 1
+        assert target.stats()['rejected'] == 1
+
+    def test_update__increase(self):
+        target = AdaptiveLimiter(initial_limit=10)
+        target.update(0.1, 10)
+
+        target.update(0.1, 10)
+
+        assert target.limit == 11
+
+    def test_update__not_utilised(self):
+        target = AdaptiveLimiter(initial_limit=10)
+        target.update(0.1, 1)
+
+        target.update(0.1, 1)
+
+        assert target.limit == 10
+
+    def test_update__decrease(self):
+        target = AdaptiveLimiter(initial_limit=10, min_limit=8, window=0)
+        target.update(0.1, 10)
+
+        target.update(1, 10)
+        assert target.limit == 9
+
+        target.update(1, 10)
+        target.update(1, 10)
+        assert target.limit == 8
+
+    def test_update__decrease_once_per_window(self):
+        target = AdaptiveLimiter(initial_limit=10, window=60)
+        target.update(0.1, 10)
+
+        target.update(1, 10)
+        target.update(1, 10)
+        target.update(1, 10)
+
+        assert target.limit == 9
+
+    def test_update__operation_baseline(self):
+        target = AdaptiveLimiter(initial_limit=10, window=0)
+        fast, slow = target.bind(), target.bind()
+        target.update(0.01, 1, fast)
+
+        # A slow operation is compared with its own baseline
+        target.update(1, 1, slow)
+        target.update(1, 1, slow)
+        assert target.limit == 10
+
+        target.update(1, 1, fast)
+        assert target.limit == 9
+        assert fast.average_latency > 0.01
+        assert slow.average_latency == 1
+
+    def test_bind(self):
+        target = AdaptiveLimiter(initial_limit=1)
+        bound = target.bind()
+
+        token = bound.acquire()
+        with pytest.raises(ServiceUnavailable):
+            target.acquire()
+        bound.release(token)
+
+        assert target.in_flight == 0
+        assert bound.average_latency is not None
+        assert target.average_latency is None
+
+    def test_update__average(self):
+        target = AdaptiveLimiter(smoothing=0.5)
+
+        target.update(1.0, 1)
+        target.update(2.0, 1)
+
+        assert target.average_latency == 1.5
+
+    def test_interface(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        operation = Operation(lambda request: {}, 'item', max_concurrency=5)
+        api = make_api(operation, limiter=limiter)
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.OK
+        bound, bulkhead = api.prepared(operation).bulkheads
+        assert bound.limiter is limiter
+        assert bulkhead is operation.bulkhead
+        assert limiter.in_flight == 0
+        assert bound.average_latency is not None
+
+    def test_interface__per_interface(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        operation = Operation(lambda request: {}, 'item')
+        limited = make_api(operation, limiter=limiter)
+        unlimited = make_api(operation)
+        limiter.acquire()
+
+        assert limited.dispatch_request(MockRequest(path='/api/item')).status == HTTPStatus.SERVICE_UNAVAILABLE
+        assert unlimited.dispatch_request(MockRequest(path='/api/item')).status == HTTPStatus.OK
+        assert limited.dispatch_request(MockRequest(path='/api/item')).status == HTTPStatus.SERVICE_UNAVAILABLE
+
+    def test_interface__shed(self):
+        limiter = AdaptiveLimiter(initial_limit=1)
+        api = make_api(Operation(lambda request: {}, 'item'), limiter=limiter)
+        limiter.acquire()
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.SERVICE_UNAVAILABLE
+        assert actual['Retry-After'] == '1'
+
+
+class TestLoadShedding(object):
+    def test_sync(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def callback(request):
+            started.set()
+            release.wait(1)
+            return {}
+        api = make_api(Operation(callback, 'item', max_concurrency=1))
+        results = []
+        thread = threading.Thread(target=lambda: results.append(api.dispatch_request(MockRequest(path='/api/item'))))
+        thread.start()
+        started.wait(1)
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+        release.set()
+        thread.join()
+
+        assert actual.status == HTTPStatus.SERVICE_UNAVAILABLE
+        assert actual['Retry-After'] == '1'
+        assert '"code": 50300' in actual.body
+        assert results[0].status == HTTPStatus.OK
+
+    def test_sync__deadline_while_queued(self):
+        release = threading.Event()
+        started = threading.Event()
+
+        def callback(request):
+            started.set()
+            release.wait(1)
+            return {}
+        api = make_api(Operation(callback, 'item', max_concurrency=1, max_queue=1))
+        thread = threading.Thread(target=lambda: api.dispatch_request(MockRequest(path='/api/item')))
+        thread.start()
+        started.wait(1)
+
+        actual = api.dispatch_request(MockRequest(path='/api/item', headers={'x-request-timeout': '0.01'}))
+        release.set()
+        thread.join()
+
+        assert actual.status == HTTPStatus.GATEWAY_TIMEOUT
+
+    def test_async__deadline_while_queued(self):
+        async def callback(request):
+            await asyncio.sleep(0.05)
+            return {}
+        api = AsyncApiInterfaceBase(
+            ApiContainer(Operation(callback, 'item', max_concurrency=1, max_queue=1)), path_prefix='/api'
+        )
+
+        async def main():
+            return await asyncio.gather(
+                api.dispatch_request(MockRequest(path='/api/item')),
+                api.dispatch_request(MockRequest(path='/api/item', headers={'x-request-timeout': '0.01'})),
+            )
+
+        actual = run(main())
+
+        assert [r.status for r in actual] == [HTTPStatus.OK, HTTPStatus.GATEWAY_TIMEOUT]
+
+    def test_async(self):
+        async def callback(request):
+            await asyncio.sleep(0.01)
+            return {}
+        api = AsyncApiInterfaceBase(
+            ApiContainer(Operation(callback, 'item', max_concurrency=2, max_queue=1)), path_prefix='/api'
+        )
+
+        async def main():
+            return await asyncio.gather(*(
+                api.dispatch_request(MockRequest(path='/api/item')) for _ in range(5)
+            ))
+
+        actual = run(main())
+
+        assert [r.status for r in actual].count(HTTPStatus.OK) == 3
+        assert [r.status for r in actual].count(HTTPStatus.SERVICE_UNAVAILABLE) == 2
+
+    def test_no_limit(self):
+        operation = Operation(lambda request: {}, 'item')
+        api = make_api(operation)
+
+        actual = api.dispatch_request(MockRequest(path='/api/item'))
+
+        assert actual.status == HTTPStatus.OK
+        assert api.prepared(operation).bulkheads == ()
@@ -0,0 +1,184 @@
+import pytest
+
+from odinweb3.constants import HTTPStatus
+from odinweb3.containers import ApiInterfaceBase, ApiContainer
+from odinweb3.decorators import Operation
+from odinweb3.negotiation import parse_accept, best_match, available_codecs, CodecTable
+from odinweb3.testing import MockRequest
+
+from .helpers import make_api
+
+AVAILABLE = ('application/json', 'application/x-msgpack', 'text/plain')
+
+
+@pytest.mark.parametrize('value, expected', (
+    ('', []),
+    ('application/json', [('application', 'json', 1.0)]),
+    ('Application/JSON; charset=utf-8', [('application', 'json', 1.0)]),
+    ('text/html, application/*;q=0.5', [('text', 'html', 1.0), ('application', '*', 0.5)]),
+    ('*/*; q=0', [('*', '*', 0.0)]),
+    ('text/html;level=1;q=0.2', [('text', 'html', 0.2)]),
+    # Invalid ranges
+    ('json, */json, text/html;q=x, text/plain;q=2', []),
+))
+def test_parse_accept(value, expected):
+    assert parse_accept(value) == expected
+
+
+@pytest.mark.parametrize('value, expected', (
+    (None, None),
+    ('', None),
+    ('application/json', 'application/json'),
+    ('application/x-msgpack', 'application/x-msgpack'),
+    ('application/json; charset=utf-8', 'application/json'),
+    ('*/*', 'application/json'),
+    ('application/*', 'application/json'),
+    ('application/json;q=0.5, application/x-msgpack', 'application/x-msgpack'),
+    ('application/*;q=0.5, application/x-msgpack;q=0.4', 'application/json'),
+    ('application/*, application/json;q=0', 'application/x-msgpack'),
+    ('text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8', 'application/json'),
+    ('text/*', 'text/plain'),
+    # Not acceptable
+    ('text/html', 'text/html'),
+    ('text/html;q=0.5, image/png', 'image/png'),
+    ('*/*;q=0', '*/*'),
+))
+def test_best_match(value, expected):
+    assert best_match(value, AVAILABLE) == expected
+
+
+@pytest.mark.parametrize('headers, expected_status, expected_type', (
+    ({}, HTTPStatus.OK, 'application/json'),
+    ({'accept': 'text/html;q=0.9, */*;q=0.8'}, HTTPStatus.OK, 'application/json'),
+    ({'accept': 'text/plain'}, HTTPStatus.OK, 'application/json'),
+    ({'accept': 'text/html'}, HTTPStatus.NOT_ACCEPTABLE, None),
+    # Remapped types are not offered when the remapped type is excluded
+    ({'accept': 'application/json;q=0, */*'}, HTTPStatus.NOT_ACCEPTABLE, None),
+    ({'accept': 'application/json;q=0, text/plain'}, HTTPStatus.NOT_ACCEPTABLE, None),
+    ({'accepts': 'application/json'}, HTTPStatus.OK, 'application/json'),
+))
+def test_interface(headers, expected_status, expected_type):
+    api = make_api(Operation(lambda request: {}, 'item'))
+
+    actual = api.dispatch_request(MockRequest(path='/api/item', headers=headers))
+
+    assert actual.status == expected_status
+    if expected_type:
+        assert actual['Content-Type'].startswith(expected_type)
+
+
+class CsvCodec(object):
+    CONTENT_TYPE = 'text/csv'
+
+    @staticmethod
+    def dumps(resource):
+        if isinstance(resource, dict):
+            return ','.join('{}={}'.format(k, v) for k, v in sorted(resource.items()))
+        return str(resource)
+
+
+class CsvApiInterface(ApiInterfaceBase):
+    registered_codecs = dict(ApiInterfaceBase.registered_codecs, **{'text/csv': CsvCodec})
+
+
+class TestAvailableCodecs(object):
+    def test_all(self):
+        actual = available_codecs({'a/a': 1, 'b/b': 2})
+
+        assert list(actual.items()) == [('a/a', 1), ('b/b', 2)]
+
+    def test_declared(self):
+        actual = available_codecs({'a/a': 1, 'b/b': 2}, ('b/b',))
+
+        assert list(actual.items()) == [('b/b', 2)]
+
+    def test_not_registered(self):
+        with pytest.raises(ValueError):
+            available_codecs({'a/a': 1}, ('x/x',))
+
+
+class TestCodecTable(object):
+    def make_table(self, **kwargs):
+        codecs = available_codecs({'application/json': 'json', 'text/csv': 'csv'})
+        return CodecTable(
+            codecs, codecs,
+            CsvApiInterface.request_type_resolvers,
+            CsvApiInterface.response_type_resolvers,
+            remap_codecs={'text/plain': 'application/json'},
+            **kwargs
+        )
+
+    @pytest.mark.parametrize('headers, expected', (
+        ({}, ('json', 'json')),
+        ({'content-type': 'text/csv'}, ('csv', 'csv')),
+        ({'content-type': 'text/plain; charset=utf-8'}, ('json', 'json')),
+        ({'content-type': 'text/csv', 'accept': 'application/json'}, ('csv', 'json')),
+        ({'accept': 'text/*;q=0.5, application/json;q=0.1'}, ('json', 'csv')),
+        ({'content-type': 'text/html'}, (None, None)),
+        ({'accept': 'image/png'}, ('json', None)),
+        ({'accept': 'text/plain'}, ('json', 'json')),
+        ({'accept': 'application/json;q=0, */*'}, ('json', 'csv')),
+        ({'accept': 'application/json;q=0, text/plain'}, ('json', None)),
+    ))
+    def test_call(self, headers, expected):
+        target = self.make_table()
+
+        assert target(MockRequest(headers=headers)) == expected
+
+    def test_default_types(self):
+        target = self.make_table(request_type='text/csv', response_type='text/csv')
+
+        assert target(MockRequest()) == ('csv', 'csv')
+
+    def test_memoized(self):
+        target = self.make_table()
+
+        target(MockRequest(headers={'accept': '*/*'}))
+        target(MockRequest(headers={'accept': '*/*'}))
+        target(MockRequest(headers={'accept': '*/*', 'x-other': '1'}))
+
+        info = target.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+    @pytest.mark.parametrize('skip_single, expected', (
+        (True, ('json', 'json')),
+        (False, (None, None)),
+    ))
+    def test_single(self, skip_single, expected):
+        codecs = available_codecs({'application/json': 'json'})
+        target = CodecTable(
+            codecs, codecs,
+            ApiInterfaceBase.request_type_resolvers,
+            ApiInterfaceBase.response_type_resolvers,
+            skip_single=skip_single
+        )
+
+        assert target(MockRequest(headers={'content-type': 'text/html'})) == expected
+
+
+class TestDeclaredTypes(object):
+    @pytest.mark.parametrize('kwargs, headers, expected_status, expected_type', (
+        ({}, {'accept': 'text/csv'}, HTTPStatus.OK, 'text/csv'),
+        ({'produces': 'text/csv'}, {}, HTTPStatus.OK, 'text/csv'),
+        ({'produces': 'text/csv'}, {'accept': 'application/json'}, HTTPStatus.NOT_ACCEPTABLE, None),
+        ({'produces': ('text/csv', 'application/json')}, {'accept': 'application/*'}, HTTPStatus.OK, 'application/json'),
+        ({'consumes': 'application/json'}, {'content-type': 'text/csv'}, HTTPStatus.UNPROCESSABLE_ENTITY, None),
+        # Single codec operations skip negotiation
+        ({'consumes': 'application/json', 'produces': 'text/csv'}, {'accept': 'application/json'}, HTTPStatus.OK, 'text/csv'),
+    ))
+    def test_dispatch(self, kwargs, headers, expected_status, expected_type):
+        operation = Operation(lambda request: {'a': 1}, 'item', **kwargs)
+        api = CsvApiInterface(ApiContainer(operation), path_prefix='/api')
+
+        actual = api.dispatch_request(MockRequest(path='/api/item', headers=headers))
+
+        assert actual.status == expected_status
+        if expected_type:
+            assert actual['Content-Type'].startswith(expected_type)
+        assert api.prepared(operation).codecs is not None
+
+    def test_not_registered(self):
+        api = make_api(Operation(lambda request: {}, 'item', produces='text/csv'))
+
+        with pytest.raises(ValueError):
+            api.dispatch_request(MockRequest(path='/api/item'))
@@ -0,0 +1,285 @@
+import io
+
+import pytest
+
+from odinweb3.constants import Method, HTTPStatus, DataType
+from odinweb3.containers import ApiInterfaceBase, ApiVersion, ApiContainer
+from odinweb3.data_structures import PathParam, UrlPath
+from odinweb3.decorators import Operation, operation
+from odinweb3.routing import Router, UrlTemplate, compile_converter
+from odinweb3.testing import MockRequest
+
+
+@operation('user', methods=(Method.Get, Method.Post))
+def user_list(request):
+    return 'user_list'
+
+
+@operation('user/{resource_id}')
+def user_detail(request, resource_id):
+    return resource_id
+
+
+@operation('user/me')
+def user_me(request):
+    return 'me'
+
+
+@operation('group/{group_id}/user/{resource_id}', methods=Method.Delete)
+def group_user(request, group_id, resource_id):
+    return group_id, resource_id
+
+
+@operation('tag/{slug:String:[a-z]+}')
+def tag_detail(request, slug):
+    return slug
+
+
+def detail(request):
+    return 'detail'
+
+
+def duplicate_api():
+    # Operations sharing an operation ID (eg a detail method of multiple resource APIs in a module)
+    return ApiInterfaceBase(
+        ApiContainer(Operation(detail, 'a'), Operation(detail, 'b', methods=Method.Post)),
+        path_prefix='/api',
+    )
+
+
+@pytest.fixture
+def api():
+    return ApiInterfaceBase(
+        ApiVersion(
+            ApiContainer(user_list, user_detail, user_me, group_user, tag_detail),
+        ),
+        path_prefix='/api',
+    )
+
+
+@pytest.mark.parametrize('param, value, expected', (
+    (PathParam('a'), '123', 123),
+    (PathParam('a'), '-1', -1),
+    (PathParam('a', DataType.Number), '1.5', 1.5),
+    (PathParam('a', DataType.Number), '2', 2.0),
+    (PathParam('a', DataType.String), 'abc', 'abc'),
+    (PathParam('a', DataType.Boolean), 'True', True),
+    (PathParam('a', DataType.Boolean), '0', False),
+    (PathParam('a', DataType.Integer, r'\d{2}'), '12', 12),
+))
+def test_compile_converter(param, value, expected):
+    converter = compile_converter(param)
+
+    assert converter(value) == expected
+
+
+@pytest.mark.parametrize('param, value', (
+    (PathParam('a'), 'abc'),
+    (PathParam('a'), '1.5'),
+    (PathParam('a'), ' 1'),
+    (PathParam('a', DataType.Number), 'nan'),
+    (PathParam('a', DataType.Boolean), 'maybe'),
+    (PathParam('a', DataType.Integer, r'\d{2}'), '123'),
+))
+def test_compile_converter__invalid_value(param, value):
+    converter = compile_converter(param)
+
+    with pytest.raises(ValueError):
+        converter(value)
+
+
+def test_compile_converter__unsupported_type():
+    with pytest.raises(ValueError):
+        compile_converter(PathParam('a', DataType.Array))
+
+
+class TestRouter(object):
+    @pytest.mark.parametrize('method, path, expected, path_args', (
+        (Method.Get, '/api/v1/user', user_list, {}),
+        (Method.Post, '/api/v1/user', user_list, {}),
+        (Method.Get, '/api/v1/user/', user_list, {}),
+        (Method.Get, '/api/v1/user/me', user_me, {}),
+        (Method.Get, '/api/v1/user/123', user_detail, {'resource_id': 123}),
+        (Method.Delete, '/api/v1/group/1/user/2', group_user, {'group_id': 1, 'resource_id': 2}),
+        (Method.Get, '/api/v1/tag/python', tag_detail, {'slug': 'python'}),
+    ))
+    def test_resolve(self, api, method, path, expected, path_args):
+        target = Router(api.operation_items())
+
+        actual, actual_path_args = target.resolve(method, path)
+
+        assert actual is expected
+        assert actual_path_args == path_args
+
+    @pytest.mark.parametrize('method, path', (
+        (Method.Get, '/api/v1'),
+        (Method.Get, '/api/v2/user'),
+        (Method.Get, '/api/v1/user/123/foo'),
+        (Method.Put, '/api/v1/user'),
+        (Method.Get, '/api/v1/group/1/user/2'),
+        (Method.Delete, '/api/v1/group//user/2'),
+        (Method.Get, '/api/v1/user/abc'),
+        (Method.Delete, '/api/v1/group/1.5/user/2'),
+        (Method.Get, '/api/v1/tag/Python'),
+    ))
+    def test_resolve__no_match(self, api, method, path):
+        target = Router(api.operation_items())
+
+        assert target.resolve(method, path) is None
+
+
+class TestDispatchRequest(object):
+    def test_not_found(self, api):
+        actual = api.dispatch_request(MockRequest(path='/api/v1/missing'))
+
+        assert actual.status == HTTPStatus.NOT_FOUND
+
+    def test_method_not_allowed(self, api):
+        actual = api.dispatch_request(MockRequest(path='/api/v1/user', method=Method.Delete))
+
+        assert actual.status == HTTPStatus.METHOD_NOT_ALLOWED
+        assert actual['Allow'] == 'GET, POST, OPTIONS'
+
+    def test_options(self, api):
+        actual = api.dispatch_request(MockRequest(path='/api/v1/user/1', method=Method.Options))
+
+        assert actual.status == HTTPStatus.NO_CONTENT
+        assert actual['Allow'] == 'GET, OPTIONS'
+
+    def test_options__response_not_shared(self, api):
+        first = api.dispatch_request(MockRequest(path='/api/v1/user/1', method=Method.Options))
+        first['X-Custom'] = 'value'
+
+        second = api.dispatch_request(MockRequest(path='/api/v1/user/1', method=Method.Options))
+
+        assert 'X-Custom' not in second.headers
+
+    def test_options__disabled(self):
+        api = ApiInterfaceBase(ApiContainer(user_list), path_prefix='/api', options=False)
+
+        actual = api.dispatch_request(MockRequest(path='/api/user', method=Method.Options))
+
+        assert actual.status == HTTPStatus.METHOD_NOT_ALLOWED
+        assert actual['Allow'] == 'GET, POST'
+
+    def test_invalid_path_param(self, api):
+        actual = api.dispatch_request(MockRequest(path='/api/v1/user/abc'))
+
+        assert actual.status == HTTPStatus.NOT_FOUND
+
+
+class TestUrlTemplate(object):
+    @pytest.mark.parametrize('path, path_args, expected', (
+        ('/', {}, '/'),
+        ('/api/user', {}, '/api/user'),
+        ('/api/user/{id}', {'id': 1}, '/api/user/1'),
+        ('/api/user/{id}/', {'id': 1}, '/api/user/1'),
+        ('/api/{group_id}/{id}/detail', {'group_id': 2, 'id': 1}, '/api/2/1/detail'),
+        ('/api/{name:String}', {'name': 'a b/c'}, '/api/a%20b%2Fc'),
+        ('/api/{flag:Boolean}', {'flag': True}, '/api/true'),
+    ))
+    def test_format(self, path, path_args, expected):
+        target = UrlTemplate(UrlPath.parse(path))
+
+        assert target.format(**path_args) == expected
+
+    def test_format__missing_arg(self):
+        target = UrlTemplate(UrlPath.parse('/api/user/{id}'))
+
+        with pytest.raises(KeyError):
+            target.format()
+
+
+class TestUrlFor(object):
+    def test_url_for(self, api):
+        assert api.url_for(user_detail.operation_id, resource_id=12) == '/api/v1/user/12'
+        assert api.url_for(user_list.operation_id) == '/api/v1/user'
+
+    def test_url_for__round_trip(self, api):
+        url = api.url_for(group_user.operation_id, group_id=1, resource_id=2)
+
+        assert api.router.resolve(Method.Delete, url) == (group_user, {'group_id': 1, 'resource_id': 2})
+
+    def test_unknown_operation(self, api):
+        with pytest.raises(KeyError):
+            api.url_for('unknown')
+
+    def test_duplicate_operation_id(self):
+        api = duplicate_api()
+
+        with pytest.raises(ValueError):
+            api.url_for('tests.test_routing.detail')
+
+
+class TestRoutesSnapshot(object):
+    def test_round_trip(self, api):
+        fp = io.StringIO()
+        api.dump_routes(fp)
+        fp.seek(0)
+
+        target = ApiInterfaceBase(
+            ApiVersion(
+                ApiContainer(user_list, user_detail, user_me, group_user, tag_detail),
+            ),
+            path_prefix='/api',
+        )
+
+        assert target.load_routes(fp) is True
+        assert target.router.resolve(Method.Get, '/api/v1/user/1') == (user_detail, {'resource_id': 1})
+        assert target.router.resolve(Method.Get, '/api/v1/tag/python') == (tag_detail, {'slug': 'python'})
+        assert target.url_for(user_detail.operation_id, resource_id=1) == '/api/v1/user/1'
+
+    def test_round_trip__batch(self):
+        def make_api(batch_path):
+            return ApiInterfaceBase(
+                ApiVersion(
+                    ApiContainer(user_list, user_detail),
+                ),
+                path_prefix='/api', batch_path=batch_path,
+            )
+        fp = io.StringIO()
+        make_api('batch').dump_routes(fp)
+
+        fp.seek(0)
+        target = make_api('batch')
+        assert target.load_routes(fp) is True
+        assert target.router.resolve(Method.Post, '/api/batch') == (target.batch_operation, {})
+
+        fp.seek(0)
+        target = make_api('bulk')
+        assert target.load_routes(fp) is False
+        assert target.router.resolve(Method.Post, '/api/bulk') == (target.batch_operation, {})
+
+    def test_changed_api(self, api):
+        fp = io.StringIO()
+        api.dump_routes(fp)
+        fp.seek(0)
+
+        target = ApiInterfaceBase(
+            ApiVersion(
+                ApiContainer(user_list, user_detail),
+                version=2,
+            ),
+            path_prefix='/api',
+        )
+
+        assert target.load_routes(fp) is False
+        assert target.router.resolve(Method.Get, '/api/v2/user/1') == (user_detail, {'resource_id': 1})
+
+    def test_round_trip__duplicate_operation_id(self):
+        fp = io.StringIO()
+        duplicate_api().dump_routes(fp)
+        fp.seek(0)
+
+        target = duplicate_api()
+        a, b = target.children[0].children
+
+        assert target.load_routes(fp) is True
+        assert target.router.resolve(Method.Get, '/api/a') == (a, {})
+        assert target.router.resolve(Method.Post, '/api/b') == (b, {})
+        with pytest.raises(ValueError):
+            target.url_for(a.operation_id)
+
+    def test_invalid_snapshot(self, api):
+        assert api.load_routes(io.StringIO('not json')) is False
+        assert api.router.resolve(Method.Get, '/api/v1/user/me') == (user_me, {})
@@ -0,0 +1,137 @@
+import io
+
+import pytest
+
+from odinweb3.constants import Method
+from odinweb3.decorators import Operation
+from odinweb3.testing import check_request_proxy
+from odinweb3.wsgi import WsgiApplication, WsgiRequest, response_status
+
+from .helpers import make_api
+
+
+class ExplodingInput(object):
+    def read(self, *args):
+        raise AssertionError("Body should not be read")
+
+
+def make_environ(path='/api/item', method='GET', query_string='', body=b'', **extra):
+    environ = {
+        'REQUEST_METHOD': method,
+        'SCRIPT_NAME': '',
+        'PATH_INFO': path,
+        'QUERY_STRING': query_string,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '8000',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(body),
+    }
+    if body:
+        environ['CONTENT_LENGTH'] = str(len(body))
+    environ.update(extra)
+    return environ
+
+
+class TestWsgiRequest(object):
+    def test_request_proxy(self):
+        target = WsgiRequest(make_environ(query_string='a=1'))
+
+        check_request_proxy(target)
+
+    def test_values(self):
+        target = WsgiRequest(make_environ(
+            method='POST',
+            query_string='a=1&a=2&b=',
+            body=b'name=value',
+            CONTENT_TYPE='application/x-www-form-urlencoded',
+            HTTP_HOST='example.com',
+            HTTP_X_CUSTOM_HEADER='custom',
+            HTTP_COOKIE='session=abc; theme=dark',
+        ))
+
+        assert target.scheme == 'http'
+        assert target.host == 'example.com'
+        assert target.method == Method.Post
+        assert target.path == '/api/item'
+        assert target.query.getlist('a') == ['1', '2']
+        assert target.headers['x-custom-header'] == 'custom'
+        assert target.headers['content-type'] == 'application/x-www-form-urlencoded'
+        assert target.cookies == {'session': 'abc', 'theme': 'dark'}
+        assert target.post['name'] == 'value'
+        assert target.body == b'name=value'
+
+    def test_lazy_values(self):
+        target = WsgiRequest(make_environ(**{'wsgi.input': ExplodingInput()}))
+
+        assert target.method == Method.Get
+        assert target.query is target.query
+        assert target.headers is target.headers
+
+    def test_host_from_server(self):
+        target = WsgiRequest(make_environ())
+
+        assert target.host == 'localhost:8000'
+
+    @pytest.mark.parametrize('content_length', ('', 'abc', '-1'))
+    def test_invalid_content_length(self, content_length):
+        target = WsgiRequest(make_environ(CONTENT_LENGTH=content_length))
+
+        assert target.body == b''
+
+
+@pytest.mark.parametrize('status, expected', (
+    (200, '200 OK'),
+    (404, '404 Not Found'),
+    (599, '599'),
+))
+def test_response_status(status, expected):
+    assert response_status(status) == expected
+
+
+class TestWsgiApplication(object):
+    def call(self, app, environ):
+        calls = []
+
+        def start_response(status, headers):
+            calls.append((status, headers))
+
+        body = app(environ, start_response)
+        status, headers = calls[0]
+        return status, dict(headers), b''.join(body)
+
+    def test_dispatch(self):
+        def callback(request, resource_id):
+            return {'id': resource_id}
+        app = WsgiApplication(make_api(Operation(callback, 'item/{resource_id}')))
+
+        status, headers, body = self.call(app, make_environ('/api/item/1', **{'wsgi.input': ExplodingInput()}))
+
+        assert status == '200 OK'
+        assert headers['Content-Type'] == 'application/json'
+        assert headers['Content-Length'] == '9'
+        assert body == b'{"id": 1}'
+
+    def test_dispatch__body(self):
+        def callback(request):
+            return {'body': request.body.decode()}
+        app = WsgiApplication(make_api(Operation(callback, 'item', methods=Method.Post)))
+
+        status, _, body = self.call(app, make_environ(method='POST', body=b'abc'))
+
+        assert status == '200 OK'
+        assert body == b'{"body": "abc"}'
+
+    def test_not_found(self):
+        app = WsgiApplication(make_api())
+
+        status, _, _ = self.call(app, make_environ('/api/missing'))
+
+        assert status == '404 Not Found'
+
+    def test_unknown_method(self):
+        app = WsgiApplication(make_api(Operation(lambda request: {}, 'item')))
+
+        status, _, body = self.call(app, make_environ(method='PROPFIND'))
+
+        assert status == '501 Not Implemented'
+        assert b'"code": 50100' in body